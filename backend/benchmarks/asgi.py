@@ -0,0 +1,62 @@
+import json
+import orjson
+
+# Minimal in-process ASGI client: requests go straight into the app's ASGI
+# callable, without sockets or an HTTP client library, so what is timed is the
+# application itself (routing, validation, computation, serialization, gzip).
+
+
+async def request(app, method, path, body=None, headers=()):
+    """Sends one request to `app`. Returns (status, headers dict, body bytes)."""
+    path, _, query = path.partition("?")
+    payload = b"" if body is None else orjson.dumps(body)
+    raw_headers = [(b"host", b"testserver"), (b"content-length", str(len(payload)).encode())]
+    if body is not None:
+        raw_headers.append((b"content-type", b"application/json"))
+    raw_headers += [(name.lower().encode(), value.encode()) for name, value in headers]
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("testserver", 80),
+    }
+
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    response = {"status": None, "headers": {}, "body": []}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"].append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], b"".join(response["body"])
+
+
+def error_of(status, body):
+    """The error a response reports (the API answers some errors with 200 and {"error": ...}), or None."""
+    if status >= 400:
+        return f"HTTP {status}"
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    return data.get("error") if isinstance(data, dict) else None
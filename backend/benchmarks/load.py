@@ -0,0 +1,418 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import string
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+import numpy as np
+import orjson
+import pandas as pd
+
+# Load generator for the API.
+#
+#   python -m benchmarks.load [--users 200 | --rate 50] [--duration 30] [--mix portfolio=0.65,ticker_chart=0.35]
+#                             [--url http://host:port | --spawn-workers N] [--synthetic 100x20] [--out FILE]
+#
+# Targets: by default main.app is driven in-process through its ASGI callable
+# (DATA_DIR as configured, or a synthetic universe from benchmarks/synthetic.py
+# with --synthetic TICKERSxYEARS). --url sends real HTTP/1.1 to a running
+# server and --spawn-workers N first starts `uvicorn main:app --workers N` on a
+# free local port, which is how worker counts are sized before a deploy.
+#
+# Arrival models:
+#
+#   closed loop (--users N)  N virtual users, each sending a request, waiting for
+#                            the answer and thinking for an exponential pause
+#                            (--think seconds on average) before the next one
+#   open loop (--rate R)     Poisson arrivals at R requests per second whatever
+#                            the server does, at most --concurrency in flight
+#
+# Every request records when it was due, when it was sent and when it was
+# answered. Latency is due -> answered, so time spent waiting for a free
+# connection is not hidden (coordinated omission); queueing delay is due ->
+# sent. In-process runs also sample the compute pool's pending computations.
+#
+# Requests are drawn from the ticker universe the server reports on /tickers:
+# tickers by Zipf-like popularity, portfolios of a few tickers with round
+# weights, date ranges of common lengths ending on the latest data, so repeated
+# requests (and result cache hits) occur about as often as with real users.
+ENDPOINTS = ("portfolio", "ticker_chart", "ticker_stats", "tickers")
+DEFAULT_MIX = {"portfolio": 0.65, "ticker_chart": 0.35}
+SPANS = [(1, 0.25), (3, 0.2), (5, 0.25), (10, 0.15), (20, 0.05), (None, 0.1)]  # years (None = all), probability
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Workload:
+    """Draws (endpoint, method, path, body) requests over a ticker universe."""
+
+    def __init__(self, universe, mix, seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.entries = [entry for entry in universe if entry.get("first_date") and entry.get("last_date")]
+        if not self.entries:
+            raise ValueError("The server reports no tickers with known dates.")
+        order = self.rng.permutation(len(self.entries))
+        popularity = 1 / np.arange(1, len(self.entries) + 1) ** 1.1
+        self.popularity = np.empty(len(self.entries))
+        self.popularity[order] = popularity / popularity.sum()
+        self.endpoints = list(mix)
+        self.mix = np.array([mix[name] for name in self.endpoints], dtype=float)
+        self.mix /= self.mix.sum()
+
+    def next(self):
+        endpoint = self.endpoints[self.rng.choice(len(self.endpoints), p=self.mix)]
+        if endpoint == "tickers":
+            ticker = self._tickers(1)[0]["ticker"]
+            return endpoint, "GET", f"/tickers?prefix={ticker[:self.rng.integers(1, 3)]}&limit=20", None
+
+        count = min(int(self.rng.geometric(0.35)), 10) if endpoint == "portfolio" else int(self.rng.integers(1, 6))
+        entries = self._tickers(count)
+        start, end = self._dates(entries)
+        tickers = [entry["ticker"] for entry in entries]
+        if endpoint != "portfolio":
+            body = {"tickers": tickers, "start_date": start, "end_date": end}
+            if endpoint == "ticker_chart":
+                body["max_points"] = 500
+            return endpoint, "POST", f"/{endpoint}", body
+        return endpoint, "POST", "/portfolio", {
+            "portfolio": dict(zip(tickers, self._weights(len(tickers)))),
+            "start_date": start,
+            "end_date": end,
+            "initial": float(self.rng.choice([1000, 10000, 10000, 100000])),
+            "addition": float(self.rng.choice([0, 0, 100, 500, 1000])),
+            "frequency": str(self.rng.choice(["monthly", "monthly", "weekly", "quarterly", "yearly"])),
+            "max_points": 500,
+        }
+
+    def _tickers(self, count):
+        count = min(count, len(self.entries))
+        picks = self.rng.choice(len(self.entries), size=count, replace=False, p=self.popularity)
+        return [self.entries[i] for i in picks]
+
+    def _dates(self, entries):
+        first = max(pd.Timestamp(entry["first_date"]) for entry in entries)
+        end = min(pd.Timestamp(entry["last_date"]) for entry in entries)
+        years = SPANS[self.rng.choice(len(SPANS), p=[p for _, p in SPANS])][0]
+        start = first if years is None else max(first, (end - pd.DateOffset(years=years)).replace(day=1))
+        return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+    def _weights(self, count):
+        if count == 1 or self.rng.random() < 0.5:
+            return [round(1 / count, 4)] * count
+        weights = np.maximum(np.round(self.rng.dirichlet(np.ones(count)) * 20), 1)  # multiples of 5%
+        return [float(w) for w in weights / weights.sum()]
+
+
+class InProcessTarget:
+    """main.app called through its ASGI interface in this process."""
+
+    def __init__(self):
+        import main
+
+        self.main = main
+        self.lifespan = None
+
+    async def start(self):
+        self.lifespan = self.main.app.router.lifespan_context(self.main.app)
+        await self.lifespan.__aenter__()
+
+    async def stop(self):
+        await self.lifespan.__aexit__(None, None, None)
+
+    async def request(self, method, path, body):
+        from benchmarks.asgi import request
+
+        status, _, content = await request(self.main.app, method, path, body)
+        return status, content
+
+    def pending(self):
+        return self.main.compute_pool.stats()["pending"]
+
+
+class HttpTarget:
+    """A server at `url`, reached over keep-alive HTTP/1.1 connections (one per request in flight)."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.idle = []
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle = []
+
+    async def request(self, method, path, body):
+        reader, writer = self.idle.pop() if self.idle else await asyncio.open_connection(self.host, self.port)
+        try:
+            payload = b"" if body is None else orjson.dumps(body)
+            head = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(payload)}"]
+            if body is not None:
+                head.append("Content-Type: application/json")
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + payload)
+            await writer.drain()
+
+            status = int((await reader.readline()).split()[1])
+            headers = {}
+            while (line := await reader.readline()) not in (b"\r\n", b""):
+                name, _, value = line.decode().partition(":")
+                headers[name.strip().lower()] = value.strip()
+            if "content-length" not in headers:
+                raise ValueError("Response without Content-Length")
+            content = await reader.readexactly(int(headers["content-length"]))
+        except BaseException:
+            writer.close()
+            raise
+        if headers.get("connection", "").lower() == "close":
+            writer.close()
+        else:
+            self.idle.append((reader, writer))
+        return status, content
+
+    def pending(self):
+        return None
+
+
+async def closed_loop(target, workload, users, think, duration, records):
+    deadline = time.perf_counter() + duration
+    rng = np.random.default_rng(workload.rng.integers(2**63))
+
+    async def user():
+        await asyncio.sleep(rng.exponential(think) if think else 0)
+        while time.perf_counter() < deadline:
+            await send(target, workload.next(), time.perf_counter(), records)
+            if think:
+                await asyncio.sleep(rng.exponential(think))
+
+    await asyncio.gather(*(user() for _ in range(users)))
+
+
+async def open_loop(target, workload, rate, concurrency, duration, records):
+    slots = asyncio.Semaphore(concurrency)
+    rng = np.random.default_rng(workload.rng.integers(2**63))
+    started = time.perf_counter()
+    due, tasks = started, []
+
+    async def arrival(request, due):
+        async with slots:
+            await send(target, request, due, records)
+
+    while True:
+        due += rng.exponential(1 / rate)
+        if due - started > duration:
+            break
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        tasks.append(asyncio.create_task(arrival(workload.next(), due)))
+    await asyncio.gather(*tasks)
+
+
+async def send(target, request, due, records):
+    from benchmarks.asgi import error_of
+
+    endpoint, method, path, body = request
+    sent = time.perf_counter()
+    try:
+        status, content = await target.request(method, path, body)
+        error = error_of(status, content)
+    except Exception as e:
+        status, error = None, f"{type(e).__name__}: {e}"
+    records.append((endpoint, due, sent, time.perf_counter(), status, error))
+
+
+async def sample_pending(target, interval, samples):
+    while True:
+        pending = target.pending()
+        if pending is None:
+            return
+        samples.append(pending)
+        await asyncio.sleep(interval)
+
+
+async def run(target, args):
+    await target.start()
+    try:
+        universe = await discover(target)
+        workload = Workload(universe, args.mix, args.seed)
+        records, samples = [], []
+        sampler = asyncio.create_task(sample_pending(target, 0.05, samples))
+        started = time.perf_counter()
+        if args.rate:
+            await open_loop(target, workload, args.rate, args.concurrency, args.duration, records)
+        else:
+            await closed_loop(target, workload, args.users, args.think, args.duration, records)
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+    finally:
+        await target.stop()
+    warm = [r for r in records if r[1] - started >= args.warmup]
+    return report(warm, elapsed - args.warmup, samples, args)
+
+
+async def discover(target):
+    """Every ticker the server lists on /tickers with its first and last date."""
+    universe = []
+    for prefix in string.ascii_uppercase + string.digits:
+        status, content = await target.request("GET", f"/tickers?prefix={prefix}&limit=500", None)
+        if status != 200:
+            raise RuntimeError(f"/tickers answered HTTP {status}")
+        universe += json.loads(content)["tickers"]
+    return universe
+
+
+def report(records, elapsed, pending, args):
+    def summary(rows):
+        latency = np.array([answered - due for _, due, _, answered, _, _ in rows]) * 1000
+        queueing = np.array([sent - due for _, due, sent, _, _, _ in rows]) * 1000
+        errors = {}
+        for *_, status, error in rows:
+            if error:
+                kind = f"HTTP {status}" if status and status >= 400 else ("error response" if status else error.split(":")[0])
+                errors[kind] = errors.get(kind, 0) + 1
+        failed = sum(errors.values())
+        return {
+            "requests": len(rows),
+            "throughput_per_s": round(len(rows) / elapsed, 2) if elapsed > 0 else None,
+            "error_rate": round(failed / len(rows), 4) if rows else None,
+            "errors": errors,
+            "latency_ms": _percentiles(latency),
+            "queueing_ms": _percentiles(queueing),
+        }
+
+    result = {
+        "config": {
+            "target": "uvicorn" if args.spawn_workers else args.url or "in-process",
+            "workers": args.spawn_workers,
+            "arrival": "open" if args.rate else "closed",
+            "rate": args.rate,
+            "users": None if args.rate else args.users,
+            "think_s": None if args.rate else args.think,
+            "concurrency": args.concurrency if args.rate else args.users,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "overall": summary(records),
+        "endpoints": {name: summary([r for r in records if r[0] == name]) for name in sorted({r[0] for r in records})},
+    }
+    if pending:
+        result["compute_pending"] = {"mean": round(float(np.mean(pending)), 2), "max": int(np.max(pending))}
+    return result
+
+
+def _percentiles(values):
+    if not len(values):
+        return {}
+    out = {f"p{p}": round(float(np.percentile(values, p)), 3) for p in PERCENTILES}
+    out["max"] = round(float(values.max()), 3)
+    return out
+
+
+def print_report(result):
+    config = result["config"]
+    print(f"{config['target']}, {config['arrival']} loop, {config['concurrency']} concurrent, {config['duration_s']:g}s")
+    for name, stats in [("overall", result["overall"]), *result["endpoints"].items()]:
+        latency, queueing = stats["latency_ms"], stats["queueing_ms"]
+        if not stats["requests"]:
+            continue
+        print(f"  {name:<14} {stats['requests']:>7} req  {stats['throughput_per_s']:>8.1f}/s  "
+              f"errors {stats['error_rate']:>7.2%}  latency p50 {latency['p50']:>9.1f}  p95 {latency['p95']:>9.1f}  "
+              f"p99 {latency['p99']:>9.1f} ms  queueing p95 {queueing['p95']:>8.1f} ms")
+        for kind, count in stats["errors"].items():
+            print(f"  {'':<14} {count:>7} x {kind}")
+    if "compute_pending" in result:
+        print(f"  compute pool pending: mean {result['compute_pending']['mean']}, max {result['compute_pending']['max']}")
+
+
+def spawn_server(workers):
+    """Starts `uvicorn main:app --workers N` on a free port; returns (process, url) once it answers."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=backend, stdout=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 60s")
+
+
+def _mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name!r}; choose from {', '.join(ENDPOINTS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description="Load test for the API.")
+    arrival = parser.add_mutually_exclusive_group()
+    arrival.add_argument("--users", type=int, default=50, help="closed loop: concurrent virtual users")
+    arrival.add_argument("--rate", type=float, help="open loop: Poisson arrivals per second")
+    parser.add_argument("--think", type=float, default=1.0, help="closed loop: mean think time (s) between requests")
+    parser.add_argument("--concurrency", type=int, default=1000, help="open loop: most requests in flight")
+    parser.add_argument("--duration", type=float, default=30, help="seconds of load")
+    parser.add_argument("--warmup", type=float, default=0, help="leading seconds left out of the report")
+    parser.add_argument("--mix", type=_mix, default=DEFAULT_MIX, help="e.g. portfolio=0.65,ticker_chart=0.35")
+    parser.add_argument("--seed", type=int, default=0)
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="load a running server instead of the in-process app")
+    target.add_argument("--spawn-workers", type=int, help="start a local uvicorn with this many workers and load it")
+    parser.add_argument("--synthetic", help="TICKERSxYEARS: serve a synthetic universe (see benchmarks/synthetic.py)")
+    parser.add_argument("--out", help="also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    if args.synthetic:
+        from benchmarks.synthetic import universe_dir
+        from benchmarks.suite import DATA_ROOT
+
+        tickers, years = args.synthetic.lower().split("x")
+        data_dir = universe_dir(DATA_ROOT, int(tickers), float(years))
+        # Set before config is first imported, here and in a spawned server.
+        os.environ["DATA_DIR"] = data_dir
+        os.environ["COLUMNAR_DIR"] = os.path.join(data_dir, "columnar")
+        from benchmarks.synthetic import write_universe
+
+        write_universe(data_dir, int(tickers), float(years))
+
+    server = None
+    if args.spawn_workers:
+        server, args.url = spawn_server(args.spawn_workers)
+    try:
+        target = HttpTarget(args.url) if args.url else InProcessTarget()
+        result = asyncio.run(run(target, args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_report(result)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+import argparse
+import asyncio
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+
+# Benchmark suite over synthetic price histories (see benchmarks/synthetic.py).
+#
+#   python -m benchmarks.suite run [--tickers 1,10,100,500] [--years 1,10,55] [--out FILE] [--baseline FILE]
+#   python -m benchmarks.suite compare BASELINE CURRENT [--threshold 0.2]
+#
+# `run` generates (or reuses) one universe holding the largest ticker count and
+# year span, points DATA_DIR at it and times every case for every (tickers,
+# years) pair of the grid: the library calls directly, the endpoints in-process
+# through the ASGI app. Each case is warmed up, then timed `repeat` times; one
+# further call runs under tracemalloc for its peak allocation. Results go to a
+# JSON file that `compare` (or `run --baseline`) checks against a saved run,
+# flagging cases whose p50 got slower by more than the threshold.
+#
+# Endpoint cases come in two flavours: "cold" drops the result cache before
+# every call so the computation is timed, "cached" times the cache hit path.
+DEFAULT_TICKERS = [1, 10, 100, 500]
+DEFAULT_YEARS = [1, 10, 55]
+DATA_ROOT = os.path.join(tempfile.gettempdir(), "stock-site-bench")
+
+# Timings shorter than this many milliseconds are never reported as regressions;
+# their run-to-run noise exceeds any threshold.
+MIN_REGRESSION_MS = 0.05
+
+
+def measure(fn, repeat, warmup=2):
+    """Latency percentiles (ms), throughput (calls/s) and peak traced allocation (bytes) of fn()."""
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(times, peak)
+
+
+def summarize(times, peak):
+    times = np.asarray(times) * 1000
+    return {
+        "runs": len(times),
+        "p50_ms": round(float(np.percentile(times, 50)), 4),
+        "p95_ms": round(float(np.percentile(times, 95)), 4),
+        "mean_ms": round(float(times.mean()), 4),
+        "throughput_per_s": round(float(1000 * len(times) / times.sum()), 2),
+        "peak_bytes": int(peak),
+    }
+
+
+def date_range(years):
+    from benchmarks.synthetic import END_DATE
+    import pandas as pd
+
+    end = pd.Timestamp(END_DATE)
+    start = end - pd.DateOffset(days=int(round(years * 365.25)))
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def library_cases(names, ticker_counts, years_grid):
+    """(name, tickers, years, fn) for the direct library calls."""
+    from classes.portfolio import Portfolio
+    from functions.data import get_info
+    from functions.ticker_values import get_ticker_values, get_stats
+
+    cases = []
+    for years in years_grid:
+        start, end = date_range(years)
+        cases.append(("get_info", 1, years, lambda s=start, e=end: get_info(names[0], s, e)))
+        for count in ticker_counts:
+            tickers = names[:count]
+            weights = {ticker: 1 / count for ticker in tickers}
+            base = Portfolio.get_portfolio(weights, start, end)
+
+            def contributed(base=base):
+                portfolio = Portfolio(values=base.values, dates=base.dates)
+                portfolio.apply_contributions(10000, 500, "monthly")
+                return portfolio
+
+            analyzed = contributed()
+            values = get_ticker_values(tickers, start, end)
+            cases += [
+                ("get_portfolio", count, years, lambda w=weights, s=start, e=end: Portfolio.get_portfolio(w, s, e)),
+                ("apply_contributions", count, years, contributed),
+                ("analyze", count, years, analyzed.analyze),
+                ("get_ticker_values", count, years, lambda t=tickers, s=start, e=end: get_ticker_values(t, s, e)),
+                ("get_stats", count, years, lambda v=values: get_stats(v)),
+            ]
+    return cases
+
+
+def endpoint_requests(names, ticker_counts, years_grid):
+    """(name, tickers, years, path, body) for the endpoint cases."""
+    requests = []
+    for years in years_grid:
+        start, end = date_range(years)
+        for count in ticker_counts:
+            tickers = names[:count]
+            requests += [
+                ("POST /portfolio", count, years, "/portfolio", {
+                    "portfolio": {ticker: 1 / count for ticker in tickers},
+                    "start_date": start, "end_date": end,
+                    "initial": 10000, "addition": 500, "frequency": "monthly", "max_points": 500,
+                }),
+                ("POST /ticker_chart", count, years, "/ticker_chart", {
+                    "tickers": tickers, "start_date": start, "end_date": end, "max_points": 500,
+                }),
+            ]
+    return requests
+
+
+async def run_endpoints(requests, repeat, warmup=2):
+    import main
+    from benchmarks.asgi import request, error_of
+
+    results = []
+    async with main.app.router.lifespan_context(main.app):
+        for name, count, years, path, body in requests:
+            for flavour in ("cold", "cached"):
+                async def call():
+                    if flavour == "cold":
+                        main.result_cache.invalidate()
+                    status, _, content = await request(main.app, "POST", path, body)
+                    error = error_of(status, content)
+                    if error:
+                        raise RuntimeError(f"{path} failed: {error}")
+
+                for _ in range(warmup):
+                    await call()
+                gc.collect()
+                times = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    await call()
+                    times.append(time.perf_counter() - started)
+                tracemalloc.start()
+                await call()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                results.append({"name": f"{name} ({flavour})", "tickers": count, "years": years,
+                                **summarize(times, peak)})
+                print(_line(results[-1]))
+    return results
+
+
+def run(args):
+    from benchmarks.synthetic import universe_dir, write_universe
+
+    ticker_counts = sorted(set(args.tickers))
+    years_grid = sorted(set(args.years))
+    data_dir = universe_dir(args.data_root, max(ticker_counts), max(years_grid), args.seed)
+
+    # config reads these on import, so they are set before any app module is imported.
+    os.environ["DATA_DIR"] = data_dir
+    os.environ["COLUMNAR_DIR"] = os.path.join(data_dir, "columnar")
+    os.environ["RESULT_CACHE_DIR"] = ""
+    os.environ.setdefault("COMPUTE_WORKERS", "0")
+
+    print(f"Universe: {max(ticker_counts)} tickers x {max(years_grid):g} years in {data_dir}")
+    names = write_universe(data_dir, max(ticker_counts), max(years_grid), args.seed)
+
+    results = []
+    for name, count, years, fn in library_cases(names, ticker_counts, years_grid):
+        results.append({"name": name, "tickers": count, "years": years, **measure(fn, args.repeat)})
+        print(_line(results[-1]))
+    results += asyncio.run(run_endpoints(endpoint_requests(names, ticker_counts, years_grid), args.repeat))
+
+    report = {"meta": _meta(args), "results": results}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.out}")
+
+    if args.baseline:
+        return compare(_read(args.baseline), report, args.threshold)
+    return 0
+
+
+def compare(baseline, current, threshold):
+    """Prints the p50 change of every case found in both runs; returns 1 if any regressed."""
+    previous = {(r["name"], r["tickers"], r["years"]): r for r in baseline["results"]}
+    regressions = 0
+    for result in current["results"]:
+        before = previous.get((result["name"], result["tickers"], result["years"]))
+        if before is None:
+            continue
+        change = result["p50_ms"] / before["p50_ms"] - 1 if before["p50_ms"] > 0 else 0.0
+        regressed = change > threshold and result["p50_ms"] - before["p50_ms"] > MIN_REGRESSION_MS
+        regressions += regressed
+        print(f"{'REGRESSION' if regressed else 'ok':<10} {_case(result):<44} "
+              f"{before['p50_ms']:>10.3f} -> {result['p50_ms']:>10.3f} ms  ({change:+.1%})")
+    print(f"{regressions} regression(s) beyond {threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def _case(result):
+    return f"{result['name']} [{result['tickers']}t x {result['years']:g}y]"
+
+
+def _line(result):
+    return (f"{_case(result):<44} p50 {result['p50_ms']:>10.3f} ms  p95 {result['p95_ms']:>10.3f} ms  "
+            f"{result['throughput_per_s']:>10.1f}/s  peak {result['peak_bytes'] / 1e6:>8.2f} MB")
+
+
+def _meta(args):
+    import pandas as pd
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def _read(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _ints(text):
+    return [int(x) for x in text.split(",") if x]
+
+
+def _floats(text):
+    return [float(x) for x in text.split(",") if x]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Benchmarks over synthetic price data.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write the results")
+    run_parser.add_argument("--tickers", type=_ints, default=DEFAULT_TICKERS, help="ticker counts, e.g. 1,10,100,500")
+    run_parser.add_argument("--years", type=_floats, default=DEFAULT_YEARS, help="years of history, e.g. 1,10,55")
+    run_parser.add_argument("--repeat", type=int, default=20, help="timed calls per case")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--data-root", default=DATA_ROOT, help="where synthetic universes are kept")
+    run_parser.add_argument("--out", default="benchmark-results.json")
+    run_parser.add_argument("--baseline", help="compare against this earlier result file")
+    run_parser.add_argument("--threshold", type=float, default=0.2, help="p50 slowdown flagged as a regression")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        return run(args)
+    return compare(_read(args.baseline), _read(args.current), args.threshold)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
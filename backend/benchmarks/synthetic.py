@@ -0,0 +1,67 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Deterministic synthetic price universes for benchmarks and load tests.
+#
+# Ticker i (named SYN000, SYN001, ...) is a geometric random walk on business
+# days with its own drift and volatility, all drawn from
+# default_rng([seed, i]), so a ticker's history does not depend on how many
+# other tickers are generated. About one business day in 2000 is dropped per
+# ticker, so the tickers do not all trade on the same days and aligning them
+# does real work. Histories end on END_DATE and go back `years` years.
+#
+# Universes are written through the same pipeline as real data: functions.ingest
+# (from a FakeFetcher) writes the pickles, columnar copies, range indexes,
+# master calendar and manifest.
+END_DATE = "2024-12-31"
+MISSING_DAY_RATE = 0.0005
+
+
+def ticker_names(count):
+    return [f"SYN{i:03d}" for i in range(count)]
+
+
+def synthetic_history(i, years, seed=0):
+    """History of synthetic ticker i in the ingest fetcher format (Date, Close, Dividends, Stock Splits)."""
+    rng = np.random.default_rng([seed, i])
+    end = pd.Timestamp(END_DATE)
+    dates = pd.bdate_range(end=end, periods=int(round(years * 261)))
+    drift = rng.uniform(0.0, 0.12)
+    volatility = rng.uniform(0.12, 0.45)
+    log_returns = rng.normal((drift - volatility ** 2 / 2) / 252, volatility / np.sqrt(252), len(dates))
+    close = rng.uniform(10, 200) * np.exp(np.cumsum(log_returns))
+
+    keep = rng.random(len(dates)) >= MISSING_DAY_RATE
+    keep[[0, -1]] = True
+    return pd.DataFrame({
+        "Date": dates[keep].tz_localize("America/New_York"),
+        "Close": close[keep],
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    })
+
+
+def universe_dir(root, tickers, years, seed=0):
+    return os.path.join(root, f"syn-{tickers}x{years:g}y-seed{seed}")
+
+
+def write_universe(data_dir, tickers, years, seed=0):
+    """
+    Writes a synthetic universe of `tickers` tickers and `years` years of history
+    to data_dir (pickles, manifest, columnar copies and calendar) unless it is
+    already there. Returns the ticker names.
+    """
+    from functions.ingest import FakeFetcher, ingest, read_manifest
+
+    names = ticker_names(tickers)
+    manifest = read_manifest(data_dir)
+    if all(name in manifest and "offset" in manifest[name] for name in names):
+        return names
+
+    histories = {name: synthetic_history(i, years, seed) for i, name in enumerate(names)}
+    start = min(df["Date"].iloc[0] for df in histories.values()).tz_convert(None).normalize()
+    end = pd.Timestamp(END_DATE) + pd.Timedelta(days=1)
+    ingest(names, FakeFetcher(histories), start, end, rate=0, data_dir=data_dir,
+           columnar_dir=os.path.join(data_dir, "columnar"))
+    return names
@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class ComputeSaturated(Exception):
+    pass
+
+
+class ComputeTimeout(Exception):
+    pass
+
+
+class ComputePool:
+    """
+    Runs blocking computations off the event loop, either on a pool of worker
+    processes (workers > 0) or on a thread pool in this process (workers == 0).
+
+    At most `max_pending` computations may be queued or running at once; further
+    submissions raise ComputeSaturated instead of queueing without bound. Callers
+    stop waiting after `timeout` seconds (ComputeTimeout); a computation already
+    running in a worker is left to finish and still counts as pending until then.
+    Finished computations are counted as completed, failed (raised) or
+    cancelled (timed out before they started).
+    """
+
+    def __init__(self, workers: int, max_pending: int, timeout: float, initializer=None, initargs=()):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.initializer = initializer
+        self.initargs = initargs
+        self.executor = None
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.lock = threading.Lock()
+
+    def start(self):
+        if self.workers > 0:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=self.initializer, initargs=self.initargs)
+        else:
+            self.executor = ThreadPoolExecutor(thread_name_prefix="compute")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    async def run(self, fn, *args):
+        if self.executor is None:
+            self.start()
+
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise ComputeSaturated(f"Server busy: {self.pending} computations pending")
+            self.pending += 1
+
+        future = self.executor.submit(fn, *args)
+        future.add_done_callback(self._done)
+        try:
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+        except asyncio.TimeoutError:
+            future.cancel()  # only succeeds if it has not started yet
+            with self.lock:
+                self.timed_out += 1
+            raise ComputeTimeout(f"Computation exceeded {self.timeout:g}s")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "workers": self.workers,
+                "pending": self.pending,
+                "max_pending": self.max_pending,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+    def _done(self, future):
+        with self.lock:
+            self.pending -= 1
+            if future.cancelled():
+                self.cancelled += 1
+            elif future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
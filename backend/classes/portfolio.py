@@ -1,8 +1,15 @@
-import yfinance as yf
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from functions.data import get_info
+from functions.data import get_info, get_column
+from functions.trading_calendar import align
+from functions.columnar import from_epoch_days
+from functions.rebalance import rebalanced_values
+from functions import contributions
+from functions.contributions import FREQUENCIES
+from functions.xirr import xirr
+from functions.metrics import compute_metrics
+from functions.serialize import to_builtin
+from functions.downsample import downsample_dates
+from functions.timing import stage
 import numpy as np
 
 class Portfolio:
@@ -10,63 +17,60 @@ class Portfolio:
         self.values = values  # normalized portfolio values
         self.dates = pd.to_datetime(dates)
         self.dollar_values = values
+        self.contributions = []
         self.data = []
         
     @staticmethod
-    def get_portfolio(portfolio: dict, start_date: str, end_date: str):
-        tickers = []
-        ticker_values = {}
-        for ticker, weight in portfolio.items():
-            
-            df = get_info(ticker, start_date, end_date, prices=False)
-
-            series = df['Close'].dropna()
-            normalized = (series / series.iloc[0]) * 100
-            ticker_values[ticker] = normalized.tolist()
-            weighted = normalized * weight
-            tickers.append(weighted)
+    def get_portfolio(portfolio: dict, start_date: str, end_date: str, rebalance: str = "none", band: float = 0.05):
+        """
+        Portfolio of normalized closes: each ticker is normalized to 100 on its
+        first trading day in the range and the tickers are aligned on the days
+        they all traded (see functions/trading_calendar.py).
+
+        rebalance: 'none' (buy-and-hold, the weighted sum taken as one
+        matrix-vector product), 'monthly', 'quarterly', 'yearly' or 'threshold'
+        (whenever a weight drifts more than `band` from its target); see
+        functions/rebalance.py.
+        """
+        dates, matrix = Portfolio.get_matrix(list(portfolio), start_date, end_date)
+        weights = np.array(list(portfolio.values()), dtype=float)
+        if rebalance == "none":
+            return Portfolio(values=matrix @ weights, dates=dates)
+        return Portfolio(values=rebalanced_values(matrix, weights, dates, rebalance, band), dates=dates)
 
+    @staticmethod
+    def get_matrix(tickers: list, start_date: str, end_date: str):
+        """
+        Closes of `tickers`, each normalized to 100 on its first trading day in
+        the range, on the days they all traded: (dates, dates x tickers matrix).
+        """
         if not tickers:
             raise ValueError("No valid data for any tickers.")
 
-        # Align on common dates
-        df_all = pd.concat(tickers, axis=1).dropna()
-        portfolio_series = df_all.sum(axis=1)
+        columns = []
+        with stage("load"):
+            for ticker in tickers:
+                days, close, offset = get_column(ticker, start_date, end_date)
+                columns.append((days, (close / close[0]) * 100, offset))
 
-        return Portfolio(values=portfolio_series.tolist(), dates=portfolio_series.index.tolist())
+        with stage("align"):
+            days, matrix = align(columns, "intersection")
+        if len(days) == 0:
+            raise ValueError("No overlapping data across tickers.")
+        return from_epoch_days(days), matrix
 
-    def apply_contributions(self, initial: float, addition: float, frequency: str = 'monthly'):
+    def apply_contributions(self, initial: float, addition: float, frequency='monthly'):
         """
-        frequency: 'weekly', 'monthly', 'yearly'
+        frequency: 'weekly', 'biweekly', 'monthly', 'quarterly', 'yearly',
+        or an explicit list of contribution dates
         """
-        valid_freqs = ['weekly', 'monthly', 'yearly']
-        if frequency not in valid_freqs:
-            raise ValueError(f"Frequency must be one of {valid_freqs}")
-
-        current_value = initial
-        self.dollar_values = [initial]
-
-        last_contrib_date = self.dates[0]
-
-        for i in range(1, len(self.values)):
-            growth = self.values[i] / self.values[i - 1]
-            current_value *= growth
-
-            # Check if it's time to contribute
-            if self._should_contribute(self.dates[i], last_contrib_date, frequency):
-                current_value += addition
-                last_contrib_date = self.dates[i]
+        if isinstance(frequency, str) and frequency not in FREQUENCIES:
+            raise ValueError(f"Frequency must be one of {FREQUENCIES}")
 
-            self.dollar_values.append(round(current_value, 2))
-
-    def _should_contribute(self, current_date, last_contrib_date, frequency):
-        delta = (current_date - last_contrib_date).days
-        if frequency == 'weekly':
-            return delta >= 7
-        elif frequency == 'monthly':
-            return current_date.month != last_contrib_date.month or current_date.year != last_contrib_date.year
-        elif frequency == 'yearly':
-            return current_date.year != last_contrib_date.year
+        with stage("contributions"):
+            self.dollar_values, self.contributions = contributions.apply_contributions(
+                self.values, self.dates, initial, addition, frequency
+            )
 
     def analyze(self):
         """
@@ -88,111 +92,83 @@ class Portfolio:
         """
         if len(self.dollar_values) < 2:
             raise ValueError("Not enough data points in portfolio to compute metrics.")
-
-        dollar_values = pd.Series(self.dollar_values, index=self.dates)
-        values = pd.Series(self.values, index=self.dates)
-        
-        initial_dollar = dollar_values.iloc[0]
-        ending_dollar = dollar_values.iloc[-1]
-        
-        initial = values.iloc[0]
-        ending = values.iloc[-1]
-        
-        total_return = (ending / initial) - 1
-
-        total_days = (dollar_values.index[-1] - dollar_values.index[0]).days
-        years = total_days / 365.25
-        CAGR = (ending / initial) ** (1/years) - 1 if years > 0 else np.nan
-
-        daily_returns = values.pct_change().dropna()
-        annualized_std = daily_returns.std() * np.sqrt(252)
-
-        yearly_returns = values.resample('YE').apply(lambda s: s.iloc[-1] / s.iloc[0] - 1)
-        best_year = yearly_returns.max()
-        worst_year = yearly_returns.min()
-
-        running_max = dollar_values.cummax()
-        drawdown = (dollar_values - running_max) / running_max
-        max_drawdown = drawdown.min()
-
-        risk_free_rate = 0.02
-        sharpe_ratio = np.nan if np.isclose(annualized_std, 0) else (CAGR - risk_free_rate) / annualized_std
-
-        daily_rf = risk_free_rate / 252
-        downside_returns = daily_returns[daily_returns < daily_rf]
-        downside_std = downside_returns.std() * np.sqrt(252)
-        sortino_ratio = np.nan if np.isclose(downside_std, 0) else (CAGR - risk_free_rate) / downside_std
-
-        if sharpe_ratio is not np.nan and sharpe_ratio > 1000:
-            sharpe_ratio = np.nan
-        if sortino_ratio is not np.nan and sortino_ratio > 1000:
-            sortino_ratio = np.nan
-
-        total_contrib = initial_dollar
-        cashflows = []
-        cf_dates = list(dollar_values.index)
-
-        rtol = 1e-4
-        atol = 0.01
-
-        for i, d in enumerate(cf_dates):
-            if i == 0:
-                cashflows.append(-initial_dollar)
-            else:
-                raw_growth = self.values[i] / self.values[i - 1]
-                expected = self.dollar_values[i - 1] * raw_growth
-                contrib = self.dollar_values[i] - expected
-                if not np.isclose(self.dollar_values[i], expected, rtol=rtol, atol=atol):
-                    total_contrib += contrib
-                    cashflows.append(-contrib)
-                else:
-                    cashflows.append(0.0)
-
-        cashflows[-1] += ending_dollar
-
-        def xnpv(rate, cashflows, dates):
-            t0 = dates[0]
-            return sum([cf / (1+rate)**((d - t0).days/365.25) for cf, d in zip(cashflows, dates)])
-
-        def xirr(cashflows, dates):
-            r = 0.1
-            for _ in range(100):
-                npv = xnpv(r, cashflows, dates)
-                dr = 1e-5
-                derivative = (xnpv(r + dr, cashflows, dates) - npv) / dr
-                if derivative == 0:
-                    break
-                new_r = r - npv / derivative
-                if abs(new_r - r) < 1e-6:
-                    return new_r
-                r = new_r
-            return r
-
-        MWRR = xirr(cashflows, cf_dates)
-
-        self.data = [
-            round(initial_dollar, 2),
-            round(ending_dollar, 2),
-            round(total_return, 4),
-            round(CAGR, 4),
-            round(annualized_std, 4),
-            round(best_year, 4),
-            round(worst_year, 4),
-            round(max_drawdown, 4),
-            round(sharpe_ratio, 4),
-            round(sortino_ratio, 4),
-            round(total_contrib),
-            round(MWRR, 4)
-        ]
+        with stage("metrics"):
+            # Column 0: normalized values (returns and risk); column 1: dollar values (drawdown).
+            m = compute_metrics(np.column_stack([self.values, self.dollar_values]), self.dates)
+
+            initial_dollar = m["initial"][1]
+            ending_dollar = m["ending"][1]
+            total_return = m["total_return"][0]
+            CAGR = m["cagr"][0]
+            annualized_std = m["volatility"][0]
+            best_year = m["best_year"][0]
+            worst_year = m["worst_year"][0]
+            max_drawdown = m["max_drawdown"][1]
+            sharpe_ratio = m["sharpe"][0]
+            sortino_ratio = m["sortino"][0]
+
+            cashflows = self.get_cashflows()
+            total_contrib = ending_dollar - cashflows.sum()
+            MWRR = xirr(cashflows, self.dates)
+
+            self.data = summary(
+                initial_dollar, ending_dollar, total_return, CAGR, annualized_std, best_year,
+                worst_year, max_drawdown, sharpe_ratio, sortino_ratio, total_contrib, MWRR,
+            )
     
-    def get_json(self):
-        return {
-            "dates": [d.strftime("%Y-%m-%d") for d in self.dates],
-            "portfolio": self.dollar_values,
+    def get_cashflows(self):
+        """
+        Investor cash flows per trading day for MWRR: every contribution (including the
+        initial investment) as an outflow, and the ending value returned on the last day.
+        """
+        contributions = np.asarray(self.contributions, dtype=np.float64)
+        if len(contributions) != len(self.dollar_values):
+            # No contribution plan applied: a single initial investment.
+            contributions = np.zeros(len(self.dollar_values))
+            contributions[0] = self.dollar_values[0]
+        cashflows = -contributions
+        cashflows[-1] += self.dollar_values[-1]
+        return cashflows
+
+    def get_result(self, max_points=None):
+        """
+        Chart data and metrics as arrays; serialized by functions.serialize.
+        With max_points, the chart series are downsampled (LTTB on the dollar
+        values) while the metrics stay computed on every trading day.
+        """
+        result = {
+            "dates": self.dates.values.astype("datetime64[D]"),
+            "portfolio": np.asarray(self.dollar_values, dtype=np.float64),
             "data": self.data,
-            "raw": self.values,
+            "raw": np.asarray(self.values, dtype=np.float64),
             }
+        if max_points is not None:
+            idx = downsample_dates(result["dates"], result["portfolio"], max_points)
+            for field in ("dates", "portfolio", "raw"):
+                result[field] = result[field][idx]
+        return result
+
+    def get_json(self):
+        return to_builtin(self.get_result())
    
+def summary(initial_dollar, ending_dollar, total_return, CAGR, annualized_std, best_year,
+            worst_year, max_drawdown, sharpe_ratio, sortino_ratio, total_contrib, MWRR):
+    """The 12 rounded metrics reported for a portfolio, in Portfolio.analyze order."""
+    return [
+        round(initial_dollar, 2),
+        round(ending_dollar, 2),
+        round(total_return, 4),
+        round(CAGR, 4),
+        round(annualized_std, 4),
+        round(best_year, 4),
+        round(worst_year, 4),
+        round(max_drawdown, 4),
+        round(sharpe_ratio, 4),
+        round(sortino_ratio, 4),
+        round(total_contrib),
+        round(MWRR, 4)
+    ]
+
 class Ticker:
     def __init__(self, ticker):
         self.ticker = ticker
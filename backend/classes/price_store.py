@@ -0,0 +1,87 @@
+import threading
+from collections import OrderedDict
+from classes.single_flight import SingleFlight
+
+
+class PriceStore:
+    """
+    Keeps parsed price histories resident in memory, keyed by ticker.
+
+    Histories are loaded on first use through `loader(ticker)` and kept until
+    the combined size of all entries exceeds `max_bytes`, at which point the
+    least recently used tickers are evicted. Concurrent misses on the same
+    ticker share a single load.
+
+    Entries are sized with `sizeof(entry)`, which defaults to the deep memory
+    usage of a DataFrame.
+    """
+
+    def __init__(self, loader, max_bytes: int, sizeof=None):
+        self.loader = loader
+        self.sizeof = sizeof or _frame_bytes
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # ticker -> (frame, nbytes)
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        self.loads = SingleFlight()
+
+    def get(self, ticker: str):
+        with self.lock:
+            entry = self.entries.get(ticker)
+            if entry is not None:
+                self.entries.move_to_end(ticker)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        return self.loads.do(ticker, lambda: self._load(ticker))
+
+    def _load(self, ticker):
+        frame = self.loader(ticker)
+        nbytes = int(self.sizeof(frame))
+
+        with self.lock:
+            if ticker not in self.entries:
+                self.entries[ticker] = (frame, nbytes)
+                self.bytes_used += nbytes
+                self._evict()
+        return frame
+
+    def preload(self, tickers):
+        for ticker in tickers:
+            self.get(ticker)
+
+    def invalidate(self, ticker: str = None):
+        with self.lock:
+            if ticker is None:
+                self.entries.clear()
+                self.bytes_used = 0
+            elif ticker in self.entries:
+                self.bytes_used -= self.entries.pop(ticker)[1]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "tickers": len(self.entries),
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "coalesced_loads": self.loads.coalesced,
+            }
+
+    def _evict(self):
+        # The most recently loaded entry is always kept, even if it alone is
+        # larger than the budget; the caller still needs it.
+        while self.bytes_used > self.max_bytes and len(self.entries) > 1:
+            _, (_, nbytes) = self.entries.popitem(last=False)
+            self.bytes_used -= nbytes
+            self.evictions += 1
+
+
+def _frame_bytes(frame):
+    return frame.memory_usage(index=True, deep=True).sum()
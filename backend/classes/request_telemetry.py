@@ -0,0 +1,86 @@
+import logging
+import os
+import time
+from functions.timing import server_timing, stages
+
+logger = logging.getLogger("requests")
+
+
+class RequestTelemetry:
+    """
+    ASGI middleware timing every HTTP request: sets up the request's stage
+    timers (functions/timing.py), adds them as a Server-Timing header when the
+    response starts, and records duration, stages, body sizes and status in a
+    classes.telemetry.Telemetry. Requests slower than `slow_seconds` are logged
+    as warnings; with a profiler, their sampled stacks are written to
+    `profile_dir`.
+    """
+
+    def __init__(self, app, telemetry, server_timing=True, slow_seconds=None, profiler=None, profile_dir=None):
+        self.app = app
+        self.telemetry = telemetry
+        self.server_timing = server_timing
+        self.slow_seconds = slow_seconds
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        timings = {}
+        token = stages.set(timings)
+        started = time.perf_counter()
+        profile = self.profiler.begin() if self.profiler is not None else None
+        sizes = {"request": 0, "response": 0}
+        response = {"status": 500, "first_byte": None}
+
+        async def counting_receive():
+            message = await receive()
+            sizes["request"] += len(message.get("body", b""))
+            return message
+
+        async def timing_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["first_byte"] = time.perf_counter() - started
+                if self.server_timing:
+                    header = server_timing(timings, response["first_byte"]).encode("latin-1")
+                    message = dict(message, headers=[*message.get("headers", []), (b"server-timing", header)])
+            elif message["type"] == "http.response.body":
+                sizes["response"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, timing_send)
+        finally:
+            stages.reset(token)
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            endpoint = getattr(route, "path", None) or "unmatched"
+            self.telemetry.observe_request(
+                endpoint, scope["method"], response["status"], response["first_byte"] or elapsed,
+                timings, sizes["request"], sizes["response"],
+            )
+            slow = self.slow_seconds is not None and elapsed >= self.slow_seconds
+            stacks = self.profiler.end(profile, keep=slow) if self.profiler is not None else None
+            if slow:
+                fields = {
+                    "endpoint": endpoint,
+                    "status": response["status"],
+                    "duration_ms": round(elapsed * 1000, 1),
+                    "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in timings.items()},
+                }
+                if stacks:
+                    fields["profile"] = self._write_profile(endpoint, stacks)
+                logger.warning("Slow request %s %s took %.0f ms", scope["method"], endpoint, elapsed * 1000, extra=fields)
+            else:
+                logger.debug("%s %s %s %.1f ms", scope["method"], endpoint, response["status"], elapsed * 1000)
+
+    def _write_profile(self, endpoint, stacks):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{endpoint.strip('/').replace('/', '_') or 'root'}.txt"
+        path = os.path.join(self.profile_dir, name)
+        with open(path, "w") as f:
+            f.write(stacks + "\n")
+        return path
@@ -0,0 +1,176 @@
+import asyncio
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functions.timing import stage
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of computed responses with a per-entry TTL.
+
+    Entries are tagged with the data version returned by `version()` when they
+    were stored; once the version changes (price files refreshed) every entry is
+    dropped. If `persist_dir` is set, entries are also written there and read
+    back on a memory miss, so the cache survives restarts.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float, persist_dir: str = None, version=lambda: None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.persist_dir = persist_dir
+        self.version = version
+        self.entries = OrderedDict()  # key -> (value, nbytes, expires_at)
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.current_version = None
+        self.lock = threading.Lock()
+        if persist_dir:
+            os.makedirs(persist_dir, exist_ok=True)
+
+    def get(self, key):
+        with stage("cache"):
+            value, version, now = self._get_resident(key)
+            return value if value is not None else self._get_persisted(key, version, now)
+
+    async def get_async(self, key):
+        """get() for the event loop: memory hits are answered inline, disk reads run in a thread."""
+        with stage("cache"):
+            value, version, now = self._get_resident(key)
+            if value is not None:
+                return value
+            if not self.persist_dir:
+                return self._get_persisted(key, version, now)
+            return await asyncio.to_thread(self._get_persisted, key, version, now)
+
+    async def put_async(self, key, value):
+        """put() in a thread, so pickling (and writing) a large result does not block the event loop."""
+        await asyncio.to_thread(self.put, key, value)
+
+    def _get_resident(self, key):
+        version = self.version()
+        now = time.time()
+        with self.lock:
+            self._check_version(version)
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] <= now:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], version, now
+        return None, version, now
+
+    def _get_persisted(self, key, version, now):
+        value = self._load(key, version, now)
+        with self.lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value):
+        version = self.version()
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        expires_at = time.time() + self.ttl
+        with self.lock:
+            self._check_version(version)
+            self._insert(key, value, len(data), expires_at)
+        if self.persist_dir:
+            self._store(key, version, expires_at, data)
+
+    def invalidate(self):
+        with self.lock:
+            self._clear()
+        if self.persist_dir:
+            for name in os.listdir(self.persist_dir):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.persist_dir, name))
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes_used": self.bytes_used,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _check_version(self, version):
+        if version != self.current_version:
+            if self.current_version is not None:
+                self._clear()
+            self.current_version = version
+
+    def _clear(self):
+        self.entries.clear()
+        self.bytes_used = 0
+        self.invalidations += 1
+
+    def _insert(self, key, value, nbytes, expires_at):
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (value, nbytes, expires_at)
+        self.bytes_used += nbytes
+        while self.bytes_used > self.max_bytes and len(self.entries) > 1:
+            _, (_, size, _) = self.entries.popitem(last=False)
+            self.bytes_used -= size
+            self.evictions += 1
+
+    def _remove(self, key):
+        self.bytes_used -= self.entries.pop(key)[1]
+
+    def _path(self, key):
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.persist_dir, f"{digest}.pkl")
+
+    def _store(self, key, version, expires_at, data):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                pickle.dump((key, version, expires_at, data), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning("Result cache write failed: %s", e)
+
+    def _load(self, key, version, now):
+        if not self.persist_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                stored_key, stored_version, expires_at, data = pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError, ValueError):
+            return None
+
+        if stored_key != key or stored_version != version or expires_at <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+
+        value = pickle.loads(data)
+        with self.lock:
+            self._insert(key, value, len(data), expires_at)
+        return value
@@ -0,0 +1,74 @@
+import collections
+import sys
+import threading
+import time
+
+
+class SamplingProfiler:
+    """
+    Opt-in statistical profiler for slow requests. While at least one request
+    is being profiled, a daemon thread samples the Python stack of every thread
+    each `interval` seconds and keeps the samples of the last `window` seconds.
+    When a request ends, the samples taken during it are returned in collapsed
+    stack format ("frame;frame;frame count" lines, readable by flamegraph.pl
+    and speedscope).
+
+    Samples cover the threads of this process (the event loop and the
+    in-process compute pool), not the workers of a process pool, and are not
+    attributed to a single request: concurrent requests share them.
+    """
+
+    def __init__(self, interval: float = 0.005, window: float = 60.0):
+        self.interval = interval
+        self.window = window
+        self.samples = collections.deque()  # (timestamp, stack tuples)
+        self.active = 0
+        self.thread = None
+        self.lock = threading.Lock()
+        self.wake = threading.Condition(self.lock)
+
+    def begin(self):
+        """Marks a request start; returns the token to pass to end()."""
+        with self.lock:
+            self.active += 1
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self.thread.start()
+            self.wake.notify()
+        return time.perf_counter()
+
+    def end(self, token, keep=True):
+        """Collapsed stacks sampled since `token` (None unless keep)."""
+        now = time.perf_counter()
+        with self.lock:
+            self.active -= 1
+            if not keep:
+                return None
+            counts = collections.Counter(
+                stack for at, stacks in self.samples if token <= at <= now for stack in stacks
+            )
+        return "\n".join(f"{';'.join(stack)} {count}" for stack, count in counts.most_common())
+
+    def _run(self):
+        me = threading.get_ident()
+        while True:
+            with self.lock:
+                while not self.active:
+                    self.samples.clear()
+                    self.wake.wait()
+            now = time.perf_counter()
+            stacks = tuple(_stack(frame) for ident, frame in sys._current_frames().items() if ident != me)
+            with self.lock:
+                self.samples.append((now, stacks))
+                while self.samples and self.samples[0][0] < now - self.window:
+                    self.samples.popleft()
+            time.sleep(self.interval)
+
+
+def _stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{frame.f_lineno})")
+        frame = frame.f_back
+    return tuple(reversed(names))
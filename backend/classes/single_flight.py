@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+class FlightCancelled(Exception):
+    pass
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the
+    computation and every caller that arrives while it is in flight waits for
+    and shares its result (or exception) instead of computing it again.
+    """
+
+    def __init__(self):
+        self.calls = {}  # key -> Future
+        self.tasks = set()  # running do_async computations, referenced until done
+        self.lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+    async def do_async(self, key, fn):
+        """
+        Like do(), for a coroutine function; waiting callers do not block the
+        event loop. The computation runs as its own task, so cancelling any
+        caller, the first one included, leaves it running for the others; if
+        the task itself is cancelled, waiting callers get FlightCancelled.
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(fn())
+            self.tasks.add(task)
+            task.add_done_callback(lambda task: self._finish(key, future, task))
+        return await asyncio.shield(asyncio.wrap_future(future))
+
+    def _finish(self, key, future, task):
+        self.tasks.discard(task)
+        if task.cancelled():
+            future.set_exception(FlightCancelled(f"Computation for {key!r} was cancelled"))
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+        with self.lock:
+            del self.calls[key]
+
+    def _join(self, key):
+        with self.lock:
+            future = self.calls.get(key)
+            if future is None:
+                future = Future()
+                self.calls[key] = future
+                self.executed += 1
+                return future, True
+            self.coalesced += 1
+            return future, False
+
+    def stats(self):
+        with self.lock:
+            return {
+                "in_flight": len(self.calls),
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+            }
@@ -0,0 +1,102 @@
+import bisect
+import math
+import threading
+
+# Request telemetry in the Prometheus text exposition format. Histograms keep
+# cumulative bucket counts per label set; everything is guarded by one lock
+# since observations are a few additions each. Counts are per process: with
+# several uvicorn workers every worker exposes its own /metrics.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+
+class Telemetry:
+    def __init__(self, prefix="stocksite"):
+        self.prefix = prefix
+        self.histograms = {}  # name -> (help, buckets, {labels: [bucket counts..., sum, count]})
+        self.counters = {}    # name -> (help, {labels: value})
+        self.lock = threading.Lock()
+        self.histogram("request_duration_seconds", "Time to the response start, per endpoint.", LATENCY_BUCKETS)
+        self.histogram("stage_duration_seconds", "Time spent per request stage, per endpoint.", LATENCY_BUCKETS)
+        self.histogram("request_size_bytes", "Request body size, per endpoint.", SIZE_BUCKETS)
+        self.histogram("response_size_bytes", "Response body size (after compression), per endpoint.", SIZE_BUCKETS)
+        self.counter("requests_total", "Requests answered, per endpoint and status.")
+
+    def histogram(self, name, help, buckets):
+        self.histograms[name] = (help, tuple(buckets), {})
+
+    def counter(self, name, help):
+        self.counters[name] = (help, {})
+
+    def observe(self, name, value, **labels):
+        _, buckets, series = self.histograms[name]
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            counts = series.get(key)
+            if counts is None:
+                counts = series[key] = [0] * (len(buckets) + 2)
+            i = bisect.bisect_left(buckets, value)
+            if i < len(buckets):
+                counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def inc(self, name, amount=1, **labels):
+        _, series = self.counters[name]
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            series[key] = series.get(key, 0) + amount
+
+    def observe_request(self, endpoint, method, status, seconds, stages, request_bytes, response_bytes):
+        self.inc("requests_total", endpoint=endpoint, method=method, status=str(status))
+        self.observe("request_duration_seconds", seconds, endpoint=endpoint, method=method)
+        self.observe("request_size_bytes", request_bytes, endpoint=endpoint)
+        self.observe("response_size_bytes", response_bytes, endpoint=endpoint)
+        for name, value in stages.items():
+            self.observe("stage_duration_seconds", value, endpoint=endpoint, stage=name)
+
+    def render(self, gauges=None):
+        """
+        All metrics as Prometheus text. `gauges` maps a component (e.g.
+        "result_cache") to its stats() dict; numeric entries are exposed as
+        gauges named <prefix>_<component>_<entry>.
+        """
+        lines = []
+        with self.lock:
+            for name, (help, series) in self.counters.items():
+                full = f"{self.prefix}_{name}"
+                lines += [f"# HELP {full} {help}", f"# TYPE {full} counter"]
+                lines += [f"{full}{_labels(key)} {_number(value)}" for key, value in series.items()]
+            for name, (help, buckets, series) in self.histograms.items():
+                full = f"{self.prefix}_{name}"
+                lines += [f"# HELP {full} {help}", f"# TYPE {full} histogram"]
+                for key, counts in series.items():
+                    cumulative = 0
+                    for bound, count in zip(buckets, counts):
+                        cumulative += count
+                        lines.append(f"{full}_bucket{_labels(key + (('le', _number(bound)),))} {cumulative}")
+                    lines.append(f"{full}_bucket{_labels(key + (('le', '+Inf'),))} {counts[-1]}")
+                    lines.append(f"{full}_sum{_labels(key)} {_number(counts[-2])}")
+                    lines.append(f"{full}_count{_labels(key)} {counts[-1]}")
+        for component, stats in (gauges or {}).items():
+            for entry, value in stats.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                full = f"{self.prefix}_{component}_{entry}"
+                lines += [f"# TYPE {full} gauge", f"{full} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key):
+    if not key:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n") for _, v in key)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + "}"
+
+
+def _number(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
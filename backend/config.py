@@ -0,0 +1,76 @@
+import os
+
+# Directory holding the per-ticker price files written by download_data.py
+DATA_DIR = os.environ.get(
+    "DATA_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data_cache"),
+)
+
+# Memory budget for the resident price store (bytes); least-recently-used
+# tickers are evicted once the loaded histories exceed it.
+PRICE_STORE_MAX_BYTES = int(os.environ.get("PRICE_STORE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Memory budget for the per-ticker range indexes (functions/range_index.py)
+# built on demand for tickers that have no index on disk.
+INDEX_STORE_MAX_BYTES = int(os.environ.get("INDEX_STORE_MAX_BYTES", 128 * 1024 * 1024))
+
+# Memory-mappable columnar copies of the price files (see convert_data.py).
+# Tickers found here are read straight from disk by date range.
+COLUMNAR_DIR = os.environ.get("COLUMNAR_DIR", os.path.join(DATA_DIR, "columnar"))
+
+# Result cache for /portfolio and /ticker_chart responses. Set RESULT_CACHE_DIR
+# to also keep entries on disk so they survive restarts.
+RESULT_CACHE_MAX_BYTES = int(os.environ.get("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+RESULT_CACHE_TTL = float(os.environ.get("RESULT_CACHE_TTL", 6 * 60 * 60))
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR") or None
+
+# How often (seconds) the data directories are checked for refreshed files.
+DATA_VERSION_CHECK_SECONDS = float(os.environ.get("DATA_VERSION_CHECK_SECONDS", 5))
+
+# Execution of /portfolio and /ticker_chart computations. COMPUTE_WORKERS=0 runs
+# them on the in-process thread pool; N > 0 uses a pool of N worker processes.
+# Requests beyond COMPUTE_MAX_PENDING queued or running computations are
+# rejected with 503, and a computation taking longer than COMPUTE_TIMEOUT
+# seconds is answered with 504.
+COMPUTE_WORKERS = int(os.environ.get("COMPUTE_WORKERS", 0))
+COMPUTE_MAX_PENDING = int(os.environ.get("COMPUTE_MAX_PENDING", 64))
+COMPUTE_TIMEOUT = float(os.environ.get("COMPUTE_TIMEOUT", 30))
+
+# Largest number of scenarios accepted by one /portfolio/batch request.
+BATCH_MAX_SCENARIOS = int(os.environ.get("BATCH_MAX_SCENARIOS", 256))
+
+# Monte Carlo projections (/simulate): most paths, horizon years and reported
+# dates per request, and memory budget of one simulated chunk (bytes). Chunks
+# are spread over the compute pool.
+MC_MAX_PATHS = int(os.environ.get("MC_MAX_PATHS", 20000))
+MC_MAX_YEARS = float(os.environ.get("MC_MAX_YEARS", 100))
+MC_MAX_POINTS = int(os.environ.get("MC_MAX_POINTS", 1000))
+MC_CHUNK_BYTES = int(os.environ.get("MC_CHUNK_BYTES", 64 * 1024 * 1024))
+
+# Logging: level (DEBUG, INFO, WARNING, ...) and format ("text" or "json", one
+# object per line). Requests slower than SLOW_REQUEST_SECONDS are logged as
+# warnings with their per-stage timings.
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+SLOW_REQUEST_SECONDS = float(os.environ.get("SLOW_REQUEST_SECONDS", 2))
+
+# Per-stage timings of each request in a Server-Timing response header.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "1") not in ("0", "false", "no")
+
+# Sampling profiler for slow requests (classes/sampling_profiler.py): when
+# PROFILE_DIR is set, every request is sampled every PROFILE_INTERVAL seconds
+# and the collapsed stacks of requests slower than SLOW_REQUEST_SECONDS are
+# written there. Off by default; sampling costs a little CPU on every request.
+PROFILE_DIR = os.environ.get("PROFILE_DIR") or None
+PROFILE_INTERVAL = float(os.environ.get("PROFILE_INTERVAL", 0.005))
+
+# Tickers loaded into every compute worker at startup and used to warm up the
+# compute path (see functions.compute.warm_up); GET /ready answers 503 until the
+# warm-up is done. WARMUP=0 skips it and reports ready at once.
+PRELOAD_TICKERS = [t.strip() for t in os.environ.get("PRELOAD_TICKERS", "").split(",") if t.strip()]
+WARMUP = os.environ.get("WARMUP", "1") not in ("0", "false", "no")
+
+# download_data.py: concurrent fetches and the overall request rate (per second)
+# allowed against the upstream provider.
+INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", 8))
+INGEST_RATE = float(os.environ.get("INGEST_RATE", 2))
@@ -0,0 +1,38 @@
+import os
+import config
+from functions.data import load_history
+from functions.columnar import write_columnar
+from functions.trading_calendar import rebuild_calendar
+from functions.ingest import manifest_entry, read_manifest, write_manifest
+
+# One-shot conversion of the whole pickle/CSV cache into the memory-mappable
+# columnar layout read by get_info (see functions/columnar.py). download_data.py
+# already converts every ticker it updates; this rebuilds everything, e.g. for
+# files cached before that or copied in by hand.
+# Tickers missing from the manifest (files cached before it existed) are added.
+# Finally the master trading calendar is rebuilt from every converted ticker and
+# each manifest entry gets its "offset" into it (see functions/trading_calendar.py).
+
+tickers = sorted({
+    os.path.splitext(name)[0]
+    for name in os.listdir(config.DATA_DIR)
+    if name.endswith((".pkl", ".csv"))
+})
+
+manifest = read_manifest()
+
+for ticker in tickers:
+    print(f"Converting {ticker}...")
+    try:
+        df = load_history(ticker)
+        write_columnar(ticker, df)
+        if ticker not in manifest:
+            path = os.path.join(config.DATA_DIR, f"{ticker}.pkl")
+            if not os.path.exists(path):
+                path = os.path.join(config.DATA_DIR, f"{ticker}.csv")
+            manifest[ticker] = manifest_entry(path, df.reset_index())
+    except Exception as e:
+        print(f"{ticker} failed: {e}")
+
+rebuild_calendar(manifest)
+write_manifest(manifest)
@@ -0,0 +1,153 @@
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import numpy as np
+import pandas as pd
+import config
+from functions.range_index import build_index, save_index
+
+# On-disk layout, one directory per ticker:
+#   {COLUMNAR_DIR}/{ticker}/date.npy       int64   days since 1970-01-01, ascending
+#   {COLUMNAR_DIR}/{ticker}/close.npy      float64
+#   {COLUMNAR_DIR}/{ticker}/dividends.npy  float64
+#   {COLUMNAR_DIR}/{ticker}/splits.npy     float64
+#   {COLUMNAR_DIR}/{ticker}/index/*.npy    prefix-sum range index (functions/range_index.py)
+# Every file is a plain .npy array so it can be opened with np.load(mmap_mode="r");
+# the OS page cache is then shared by every worker process reading the same ticker.
+#
+# Files are never rewritten in place, since other processes may have them mapped.
+# {ticker} is a symlink to a version directory .{ticker}.<random>: a rewrite fills
+# a new version directory, switches the link to it with one os.replace, then
+# removes the old version (its files stay readable through existing mappings).
+# Every switch writes a new token to {COLUMNAR_DIR}/generation, which
+# functions.data.data_version watches.
+COLUMNS = {
+    "close": "Close",
+    "dividends": "Dividends",
+    "splits": "Stock Splits",
+}
+GENERATION_NAME = "generation"
+
+
+def to_epoch_days(dates):
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def from_epoch_days(days):
+    return pd.DatetimeIndex(np.asarray(days, dtype="datetime64[D]").astype("datetime64[ns]"), name="Date")
+
+
+def write_columnar(ticker, df, out_dir=None):
+    """
+    Writes a Date-indexed price frame (as returned by functions.data.load_history)
+    in the columnar layout, together with its range index, and publishes it as
+    the ticker's current version.
+    """
+    out_dir = out_dir or config.COLUMNAR_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    version_dir = tempfile.mkdtemp(dir=out_dir, prefix=f".{ticker}.")
+    try:
+        os.chmod(version_dir, 0o755)
+        df = df[~df.index.isna()]
+        days = to_epoch_days(df.index.values)
+        np.save(os.path.join(version_dir, "date.npy"), days)
+        for name, column in COLUMNS.items():
+            values = df[column] if column in df.columns else pd.Series(0.0, index=df.index)
+            values = pd.to_numeric(values, errors="coerce").to_numpy(np.float64)
+            np.save(os.path.join(version_dir, f"{name}.npy"), values)
+            if name == "close":
+                save_index(build_index(days, values), version_dir)
+        _publish(ticker, version_dir, out_dir)
+    except BaseException:
+        shutil.rmtree(version_dir, ignore_errors=True)
+        raise
+
+
+def _publish(ticker, version_dir, out_dir):
+    # Points {ticker} at version_dir in one rename and drops the version it replaces.
+    link = os.path.join(out_dir, ticker)
+    previous = os.path.realpath(link) if os.path.islink(link) else None
+    if os.path.isdir(link) and previous is None:
+        # A plain directory from before versioned writes is moved aside first.
+        previous = os.path.join(out_dir, f".{ticker}.{uuid.uuid4().hex}")
+        os.rename(link, previous)
+    tmp = os.path.join(out_dir, f".tmp-{os.path.basename(version_dir)}")
+    os.symlink(os.path.basename(version_dir), tmp)
+    os.replace(tmp, link)
+    write_generation(out_dir)
+    if previous is not None:
+        shutil.rmtree(previous, ignore_errors=True)
+
+
+def write_generation(out_dir=None):
+    """Replaces the generation token with a new one; any data_version() check after this sees a change."""
+    out_dir = out_dir or config.COLUMNAR_DIR
+    tmp = os.path.join(out_dir, f".tmp-{GENERATION_NAME}-{uuid.uuid4().hex}")
+    with open(tmp, "w") as f:
+        f.write(uuid.uuid4().hex)
+    os.replace(tmp, os.path.join(out_dir, GENERATION_NAME))
+
+
+def read_generation(out_dir=None):
+    try:
+        with open(os.path.join(out_dir or config.COLUMNAR_DIR, GENERATION_NAME)) as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class ColumnarHistory:
+    def __init__(self, path):
+        # Every file is read from the version the link points to now.
+        path = os.path.realpath(path)
+        self.path = path
+        self.days = np.load(os.path.join(path, "date.npy"), mmap_mode="r")
+        self.columns = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in COLUMNS}
+
+    def bounds(self, start_date, end_date):
+        """Row range [lo, hi) covering start_date..end_date inclusive, by binary search."""
+        lo = int(np.searchsorted(self.days, to_epoch_days(start_date), side="left"))
+        hi = int(np.searchsorted(self.days, to_epoch_days(end_date), side="right"))
+        return lo, hi
+
+    def frame(self, start_date, end_date):
+        lo, hi = self.bounds(start_date, end_date)
+        return pd.DataFrame(
+            {column: self.columns[name][lo:hi] for name, column in COLUMNS.items()},
+            index=from_epoch_days(self.days[lo:hi]),
+        )
+
+
+_handles = {}
+_handles_lock = threading.Lock()
+
+
+def open_columnar(ticker):
+    """Returns the memory-mapped history for a ticker, or None if it has not been converted."""
+    with _handles_lock:
+        history = _handles.get(ticker)
+    if history is not None:
+        return history
+
+    path = os.path.join(config.COLUMNAR_DIR, ticker)
+    if not os.path.exists(os.path.join(path, "date.npy")):
+        return None
+
+    try:
+        history = ColumnarHistory(path)
+    except FileNotFoundError:
+        # The version was replaced and removed while it was being opened.
+        history = ColumnarHistory(path)
+    with _handles_lock:
+        _handles[ticker] = history
+    return history
+
+
+def close_columnar(ticker=None):
+    with _handles_lock:
+        if ticker is None:
+            _handles.clear()
+        else:
+            _handles.pop(ticker, None)
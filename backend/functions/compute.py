@@ -0,0 +1,100 @@
+import logging
+import pandas as pd
+from classes.portfolio import Portfolio
+from functions.ticker_values import get_ticker_chart, get_range_stats
+from functions.data import preload_prices, ticker_universe, common_range
+from functions.scenarios import evaluate_scenarios
+from functions.optimize import optimize_portfolio
+from functions.simulate import plan_projection, simulate_chunks, summarize_projection
+from functions.screen import screen
+
+logger = logging.getLogger(__name__)
+
+# Entry points for the CPU-bound endpoint work. They take and return plain
+# picklable values so they can run in a worker process of classes.compute_pool.
+
+
+_warmed = False
+_warm_result = None
+
+
+def init_worker(preload_tickers):
+    try:
+        warm_up(preload_tickers)
+    except Exception as e:
+        logger.warning("Warm-up failed: %s", e)
+
+
+def warm_up(tickers):
+    """
+    Loads `tickers` and runs the portfolio, ticker chart and ticker stats
+    computations once over their last two years, so the one-time costs of this
+    process (mapping the files, building range indexes, first calls into pandas
+    and NumPy) are paid before the first request instead of by it. Without
+    tickers the first ticker of the universe is used. Runs once per process;
+    every call returns the portfolio and chart results of that run (None if
+    there is no data) so the caller can warm up serialization too.
+    """
+    global _warmed, _warm_result
+    if _warmed:
+        return _warm_result
+    preload_prices(tickers)
+    sample = list(tickers[:5]) or sorted(ticker_universe())[:1]
+    if not sample:
+        _warmed = True
+        return None
+
+    start, end = common_range(sample, "1900-01-01", "2100-01-01")
+    start = max(pd.Timestamp(start), pd.Timestamp(end) - pd.DateOffset(years=2)).strftime("%Y-%m-%d")
+    weights = {ticker: 1 / len(sample) for ticker in sample}
+    result = {
+        "portfolio": compute_portfolio(weights, start, end, 10000, 100, "monthly", 500),
+        "chart": compute_ticker_chart(sample, start, end, 500),
+    }
+    compute_portfolio(weights, start, end, 10000, 100, "quarterly", None, "quarterly")
+    compute_ticker_stats(sample, start, end)
+    _warmed, _warm_result = True, result
+    return result
+
+
+def compute_portfolio(portfolio, start_date, end_date, initial, addition, frequency, max_points=None,
+                      rebalance="none", rebalance_band=0.05):
+    portfolio_obj = Portfolio.get_portfolio(portfolio, start_date, end_date, rebalance, rebalance_band)
+    portfolio_obj.apply_contributions(initial, addition, frequency)
+    portfolio_obj.analyze()
+    logger.debug("Portfolio metrics: %s", portfolio_obj.data)
+    return portfolio_obj.get_result(max_points)
+
+
+def compute_portfolio_batch(tickers, start_date, end_date, scenarios, max_points=None):
+    return evaluate_scenarios(tickers, start_date, end_date, scenarios, max_points)
+
+
+def compute_optimization(tickers, start_date, end_date, lower, upper, points, initial, addition, frequency, rebalance):
+    return optimize_portfolio(tickers, start_date, end_date, lower, upper, points, initial, addition, frequency, rebalance)
+
+
+def plan_simulation(portfolio, start_date, end_date, initial, addition, frequency, rebalance,
+                    horizon_years, paths, method, block_size, seed, percentiles, points):
+    return plan_projection(portfolio, start_date, end_date, initial, addition, frequency, rebalance,
+                           horizon_years, paths, method, block_size, seed, percentiles, points)
+
+
+def simulate_chunk_jobs(jobs):
+    return simulate_chunks(jobs)
+
+
+def summarize_simulation(plan, parts):
+    return summarize_projection(plan, parts)
+
+
+def compute_screen(universe, start_date, end_date, sort_by, descending, filters, limit):
+    return screen(universe, start_date, end_date, sort_by, descending, filters, limit)
+
+
+def compute_ticker_chart(tickers, start_date, end_date, max_points=None):
+    return get_ticker_chart(tickers, start_date, end_date, max_points)
+
+
+def compute_ticker_stats(tickers, start_date, end_date):
+    return {"tickerStats": get_range_stats(tickers, start_date, end_date)}
@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+# Calendar schedules contribute on the first trading day of each new period;
+# interval schedules contribute on the first trading day at least N days after
+# the previous contribution.
+PERIOD_FREQUENCIES = ["monthly", "quarterly", "yearly"]
+INTERVAL_FREQUENCIES = {"weekly": 7, "biweekly": 14}
+FREQUENCIES = ["weekly", "biweekly", "monthly", "quarterly", "yearly"]
+
+
+def contribution_schedule(dates, frequency):
+    """
+    Returns an int array with the number of contributions made on each trading day.
+
+    frequency is one of FREQUENCIES or an explicit list of dates; each listed date
+    contributes on the first trading day on or after it. Day 0 holds the initial
+    investment and never receives a contribution.
+    """
+    dates = pd.DatetimeIndex(dates)
+    n = len(dates)
+    counts = np.zeros(n, dtype=np.int64)
+    if n < 2:
+        return counts
+
+    if not isinstance(frequency, str):
+        targets = pd.to_datetime(list(frequency)).values.astype("datetime64[ns]")
+        idx = np.searchsorted(dates.values.astype("datetime64[ns]"), targets, side="left")
+        idx = idx[(idx > 0) & (idx < n)]
+        return np.bincount(idx, minlength=n).astype(np.int64)
+
+    if frequency in INTERVAL_FREQUENCIES:
+        days = dates.values.astype("datetime64[D]").astype(np.int64)
+        counts[_interval_chain(days, INTERVAL_FREQUENCIES[frequency])[1:]] = 1
+    elif frequency in PERIOD_FREQUENCIES:
+        if frequency == "monthly":
+            key = dates.year * 12 + dates.month
+        elif frequency == "quarterly":
+            key = dates.year * 4 + (dates.month - 1) // 3
+        else:
+            key = dates.year
+        key = np.asarray(key)
+        counts[1:] = key[1:] != key[:-1]
+    else:
+        raise ValueError(f"Frequency must be one of {FREQUENCIES} or a list of dates")
+
+    return counts
+
+
+def _interval_chain(days, interval):
+    """
+    Indices of the contribution days for an interval schedule: 0, then repeatedly the
+    first day at least `interval` days after the previous one.
+
+    The chain is built by pointer doubling over the "next contribution" jump table, so
+    it takes O(log k) vectorized steps for k contributions instead of a per-day loop.
+    """
+    n = len(days)
+    jump = np.append(np.searchsorted(days, days + interval, side="left"), n)
+    chain = np.array([0])
+    while True:
+        ext = jump[chain]
+        ext = ext[ext < n]
+        chain = np.concatenate([chain, ext])
+        if len(ext) < len(chain) - len(ext):
+            return chain
+        jump = jump[jump]
+
+
+def apply_contributions(values, dates, initial, addition, frequency="monthly"):
+    """
+    Grows an initial investment along a normalized value series while adding
+    `addition` on every scheduled contribution day.
+
+    Returns (dollar_values, contributions) as arrays aligned with `dates`;
+    contributions[0] is the initial investment.
+
+    `values` may also be a (dates x scenarios) matrix sharing one schedule, with
+    `initial` and `addition` given per scenario; the results are then matrices.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    counts = contribution_schedule(dates, frequency).astype(np.float64)
+    if values.ndim == 2:
+        counts = counts[:, None]
+
+    contributions = np.asarray(addition, dtype=np.float64) * counts
+    contributions[0] = initial
+
+    # V[i] = V[i-1] * g[i] + c[i]  ==>  V[i] = G[i] * sum_{j<=i} c[j] / G[j]
+    growth = values / values[0]
+    dollar_values = growth * np.cumsum(contributions / growth, axis=0)
+
+    dollar_values = np.round(dollar_values, 2)
+    dollar_values[0] = initial
+    return dollar_values, contributions
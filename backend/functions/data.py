@@ -1,41 +1,258 @@
-import yfinance as yf
 import pandas as pd
+import numpy as np
 import time
 import os
-import requests
+import logging
+import config
+from classes.price_store import PriceStore
+from functions.columnar import open_columnar, close_columnar, read_generation, to_epoch_days
+from functions.range_index import build_index, open_index
+from functions.ingest import read_manifest
+from functions.trading_calendar import align, close_calendar
+import bisect
+import functools
+import threading
 
-def get_info(ticker, start_date, end_date, prices=True):
-    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "data_cache"))
-    pkl_path = os.path.join(base_dir, f"{ticker}.pkl")
-    csv_path = os.path.join(base_dir, f"{ticker}.csv")
+logger = logging.getLogger(__name__)
+
+def load_history(ticker):
+    """
+    Reads the cached history for a ticker from disk and returns it sorted and
+    indexed by naive trading dates. Used as the loader for the resident price store.
+    """
+    pkl_path = os.path.join(config.DATA_DIR, f"{ticker}.pkl")
+    csv_path = os.path.join(config.DATA_DIR, f"{ticker}.csv")
 
     if os.path.exists(pkl_path):
-        print(f"Loading {ticker} from pickle...")
+        logger.info("Loading %s from pickle", ticker)
         df = pd.read_pickle(pkl_path)
-        if "Date" not in df.columns:
-            raise ValueError(f"'Date' column missing in {ticker}. Columns: {df.columns.tolist()}")
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce", utc=True).dt.tz_convert(None)
-        df = df.sort_values("Date").set_index("Date")
     elif os.path.exists(csv_path):
         # Fallback: load CSV if pickle doesn't exist.
         df = pd.read_csv(csv_path)
-        if "Date" not in df.columns:
-            raise ValueError(f"'Date' column missing in {ticker}. Columns: {df.columns.tolist()}")
-        df["Date"] = pd.to_datetime(df["Date"], errors="coerce", utc=True).dt.tz_convert(None)
-        df = df.sort_values("Date").set_index("Date")
     else:
         raise FileNotFoundError(f"Cached file not found for ticker: {ticker}")
 
+    if "Date" not in df.columns:
+        raise ValueError(f"'Date' column missing in {ticker}. Columns: {df.columns.tolist()}")
+    df["Date"] = pd.to_datetime(df["Date"], errors="coerce", utc=True).dt.tz_convert(None).dt.normalize()
+    return df.sort_values("Date").set_index("Date")
+
+
+price_store = PriceStore(load_history, config.PRICE_STORE_MAX_BYTES)
+
+
+def load_index(ticker):
+    """
+    Range index of a ticker's full close history: memory-mapped from the
+    columnar directory when it was written at conversion time, otherwise built
+    from the history.
+    """
+    history = open_columnar(ticker)
+    if history is not None:
+        index = open_index(history.path)
+        if index is not None:
+            return index
+        return build_index(history.days, history.columns["close"])
+
+    df = price_store.get(ticker)
+    df = df[~df.index.isna()]
+    close = pd.to_numeric(df["Close"], errors="coerce").to_numpy(np.float64)
+    return build_index(to_epoch_days(df.index.values), close)
+
+
+index_store = PriceStore(load_index, config.INDEX_STORE_MAX_BYTES, sizeof=lambda index: index.nbytes)
+
+_data_version = None
+_data_version_checked_at = 0.0
+_data_version_lock = threading.Lock()
+
+
+def data_version():
+    """
+    Token identifying the current contents of the data directories: the
+    modification times of DATA_DIR and COLUMNAR_DIR, which change whenever a
+    price file is added or atomically replaced, and the columnar generation
+    token, which changes whenever a ticker's columnar version is switched
+    (see functions/columnar.py). Rechecked at most every
+    DATA_VERSION_CHECK_SECONDS; on a change the resident price store, the range
+    indexes, the memory-mapped handles, the master calendar and the ticker
+    universe are dropped so fresh files are read.
+    """
+    global _data_version, _data_version_checked_at
+    now = time.monotonic()
+    with _data_version_lock:
+        if _data_version is not None and now - _data_version_checked_at < config.DATA_VERSION_CHECK_SECONDS:
+            return _data_version
+
+        version = (_mtime(config.DATA_DIR), _mtime(config.COLUMNAR_DIR), read_generation())
+        if _data_version is not None and version != _data_version:
+            logger.info("Price data changed on disk, reloading")
+            price_store.invalidate()
+            index_store.invalidate()
+            close_columnar()
+            close_calendar()
+            _drop_universe()
+        _data_version = version
+        _data_version_checked_at = now
+        return version
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+_universe = None
+_universe_lock = threading.Lock()
+
+
+def ticker_universe():
+    """
+    Every ticker with price data, mapped to its manifest entry (first_date,
+    last_date, rows, sha256; see functions/ingest.py). Tickers on disk but not
+    in the manifest map to an empty entry. Read once and kept in memory until
+    the data directories change; no price file is opened.
+    """
+    return _load_universe()[0]
+
+
+def _load_universe():
+    global _universe
+    data_version()
+    with _universe_lock:
+        if _universe is None:
+            names = set()
+            if os.path.isdir(config.DATA_DIR):
+                names.update(
+                    os.path.splitext(name)[0]
+                    for name in os.listdir(config.DATA_DIR)
+                    if name.endswith((".pkl", ".csv"))
+                )
+            if os.path.isdir(config.COLUMNAR_DIR):
+                # One directory per ticker; files (the master calendar, the
+                # generation token) and hidden version directories are skipped.
+                names.update(
+                    name for name in os.listdir(config.COLUMNAR_DIR)
+                    if not name.startswith(".") and os.path.isdir(os.path.join(config.COLUMNAR_DIR, name))
+                )
+            manifest = read_manifest(config.DATA_DIR)
+            entries = {ticker: manifest.get(ticker, {}) for ticker in names}
+            _universe = (entries, sorted(entries))
+        return _universe
+
+
+def _drop_universe():
+    global _universe
+    with _universe_lock:
+        _universe = None
+
+
+def check_tickers(tickers):
+    universe = ticker_universe()
+    unknown = [ticker for ticker in tickers if ticker not in universe]
+    if unknown:
+        raise ValueError(f"Unknown ticker(s): {', '.join(unknown)}")
+
+
+def common_range(tickers, start_date, end_date):
+    """
+    Clamps [start_date, end_date] to the dates every ticker has data for, using
+    the manifest alone. Returns YYYY-MM-DD strings; raises ValueError for an
+    unknown ticker or when the tickers share no dates in the range.
+    """
+    check_tickers(tickers)
+    universe = ticker_universe()
+    start = pd.to_datetime(start_date, utc=True).tz_convert(None).normalize()
+    end = pd.to_datetime(end_date, utc=True).tz_convert(None).normalize()
+    for ticker in tickers:
+        entry = universe[ticker]
+        if "first_date" in entry:
+            start = max(start, pd.Timestamp(entry["first_date"]))
+            end = min(end, pd.Timestamp(entry["last_date"]))
+    if start > end:
+        raise ValueError(f"No common data for {', '.join(tickers)} between {start_date} and {end_date}")
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def search_tickers(prefix, limit=20):
+    """Tickers starting with `prefix` (case-insensitive), in alphabetical order."""
+    universe, names = _load_universe()
+    prefix = prefix.upper()
+    lo = bisect.bisect_left(names, prefix)
+    matches = []
+    for ticker in names[lo:]:
+        if not ticker.startswith(prefix) or len(matches) >= limit:
+            break
+        entry = universe[ticker]
+        matches.append({"ticker": ticker, "first_date": entry.get("first_date"), "last_date": entry.get("last_date")})
+    return matches
+
+
+def preload_prices(tickers):
+    """Opens (columnar) or loads (price store) each ticker ahead of its first request."""
+    for ticker in tickers:
+        try:
+            if open_columnar(ticker) is None:
+                price_store.get(ticker)
+        except Exception as e:
+            logger.warning("Preloading %s failed: %s", ticker, e)
+
+
+def get_info(ticker, start_date, end_date, prices=True):
+    data_version()
+
     # Convert input dates to naive datetime objects.
     start_date = pd.to_datetime(start_date, utc=True).tz_convert(None)
     end_date = pd.to_datetime(end_date, utc=True).tz_convert(None)
 
-    df_slice = df.loc[start_date:end_date]
+    # Converted tickers are sliced straight off the memory-mapped arrays so only
+    # the requested range is read; everything else goes through the price store.
+    history = open_columnar(ticker)
+    if history is not None:
+        df_slice = history.frame(start_date.to_datetime64(), end_date.to_datetime64())
+    else:
+        df_slice = price_store.get(ticker).loc[start_date:end_date]
     if df_slice.empty:
         raise ValueError(f"No data for {ticker} between {start_date} and {end_date}")
 
     return df_slice["Close"] if prices else df_slice
 
+
+def get_range(ticker, start_date, end_date):
+    """
+    Range index of a ticker with the rows lo..hi (inclusive) of its trading days
+    between start_date and end_date. Nothing but the index's lookups is read.
+    """
+    data_version()
+
+    first, last = _epoch_range(start_date, end_date)
+    index = index_store.get(ticker)
+    lo, hi = index.bounds(first, last)
+    if hi < lo:
+        raise ValueError(f"No data for {ticker} between {start_date} and {end_date}")
+    return index, lo, hi
+
+
+@functools.lru_cache(maxsize=256)
+def _epoch_range(start_date, end_date):
+    """Epoch days of a request's date bounds; parsed once per distinct range, not once per ticker."""
+    start_date = pd.to_datetime(start_date, utc=True).tz_convert(None)
+    end_date = pd.to_datetime(end_date, utc=True).tz_convert(None)
+    return to_epoch_days(start_date.to_datetime64()), to_epoch_days(end_date.to_datetime64())
+
+
+def get_column(ticker, start_date, end_date):
+    """
+    (days, close, offset) of a ticker between start_date and end_date, ready
+    for functions.trading_calendar.align: epoch days and closes (NaN dropped)
+    straight from the range index, and the master calendar row of the first
+    day when the manifest knows it.
+    """
+    index, lo, hi = get_range(ticker, start_date, end_date)
+    offset = ticker_universe().get(ticker, {}).get("offset")
+    return index.days[lo:hi + 1], index.close[lo:hi + 1], None if offset is None else offset + lo
    
 
 def plot_tickers_data(ticker_objects, normalize=False):
@@ -51,10 +268,10 @@ def plot_tickers_data(ticker_objects, normalize=False):
             series = (series / series.iloc[0]) * 100
 
         if not data["dates"]:
-            data["dates"] = [d.strftime("%Y-%m-%d") for d in series.index]
+            data["dates"] = np.datetime_as_string(series.index.values, unit="D").tolist()
 
         data["stocks"][ticker_obj.ticker] = {
-            "values": [round(v.item() if hasattr(v, "item") else float(v), 2) for v in series.values],
+            "values": np.round(series.to_numpy(dtype=float), 2).tolist(),
             "weight": ticker_obj.weight
         }
 
@@ -77,34 +294,34 @@ def get_latest_common_start(ticker_objects):
 
 
 def plot_weighted_portfolio_data(ticker_objects):
-    portfolio_df = pd.DataFrame()
-
+    columns, used = [], []
     for t in ticker_objects:
         prices = t.prices.dropna()
         if prices.empty:
             continue
 
-        normalized = (prices / prices.iloc[0]) * 100
-        weighted = normalized * t.weight
-        portfolio_df[t.ticker] = weighted
-
-    portfolio_df.dropna(inplace=True)
+        normalized = (prices.to_numpy(dtype=float) / prices.iloc[0]) * 100
+        columns.append((to_epoch_days(prices.index.values), normalized, None))
+        used.append(t)
 
-    if portfolio_df.empty:
+    if not columns:
         raise ValueError("No overlapping data across tickers.")
 
-    portfolio_df["Portfolio"] = portfolio_df.sum(axis=1)
+    days, matrix = align(columns, "intersection")
+    if len(days) == 0:
+        raise ValueError("No overlapping data across tickers.")
 
+    weights = np.array([t.weight for t in used], dtype=float)
     data = {
-        "dates": [d.strftime("%Y-%m-%d") for d in portfolio_df.index],
-        "portfolio": [round(float(v), 2) for v in portfolio_df["Portfolio"].values],
+        "dates": np.datetime_as_string(days.astype("datetime64[D]"), unit="D").tolist(),
+        "portfolio": np.round(matrix @ weights, 2).tolist(),
         "stocks": {}
     }
 
-    for ticker in portfolio_df.columns[:-1]:
-        data["stocks"][ticker] = {
-            "values": [round(float(v), 2) for v in portfolio_df[ticker].values],
-            "weight": next(t.weight for t in ticker_objects if t.ticker == ticker)
+    for j, t in enumerate(used):
+        data["stocks"][t.ticker] = {
+            "values": np.round(matrix[:, j] * t.weight, 2).tolist(),
+            "weight": t.weight
         }
 
     return data
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def lttb(x, y, max_points):
+    """
+    Largest-Triangle-Three-Buckets: indices of at most `max_points` points of the
+    series (x, y) that preserve its visual shape. The first and last points are
+    always kept; every bucket in between contributes the point forming the
+    largest triangle with the previously kept point and the next bucket's mean.
+
+    Buckets are laid out as one padded 2D array so each step is a single
+    vectorized argmax; only the dependency on the previously kept point is walked
+    bucket by bucket.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_points is None or n <= max_points:
+        return np.arange(n)
+    if max_points < 3:
+        raise ValueError("max_points must be at least 3")
+
+    # Interior points 1..n-2 split into max_points - 2 buckets.
+    buckets = max_points - 2
+    edges = (1 + np.arange(buckets + 1) * (n - 2) / buckets).astype(np.int64)
+    starts, ends = edges[:-1], edges[1:]
+    width = int((ends - starts).max())
+
+    rows = starts[:, None] + np.arange(width)[None, :]
+    valid = rows < ends[:, None]
+    rows = np.where(valid, rows, starts[:, None])
+    bx, by = x[rows], y[rows]
+
+    # Mean of the following bucket (the last point for the final bucket).
+    counts = valid.sum(axis=1)
+    mean_x = np.where(valid, bx, 0).sum(axis=1) / counts
+    mean_y = np.where(valid, by, 0).sum(axis=1) / counts
+    cx = np.append(mean_x[1:], x[-1])
+    cy = np.append(mean_y[1:], y[-1])
+
+    picked = np.empty(buckets, dtype=np.int64)
+    ax, ay = x[0], y[0]
+    for b in range(buckets):
+        area = np.abs((ax - cx[b]) * (by[b] - ay) - (ax - bx[b]) * (cy[b] - ay))
+        area[~valid[b]] = -1
+        j = rows[b, area.argmax()]
+        picked[b] = j
+        ax, ay = x[j], y[j]
+
+    return np.concatenate([[0], picked, [n - 1]])
+
+
+def downsample_dates(dates, values, max_points):
+    """LTTB indices for a value series indexed by datetime64 dates (x = day number)."""
+    days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+    return lttb(days, values, max_points)
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import config
+from functions.columnar import write_columnar
+from functions.trading_calendar import rebuild_calendar
+
+# Incremental market-data ingest. Each ticker's cached pickle is extended with
+# only the bars newer than its last cached date, fetched through a pluggable
+# fetcher on a bounded, rate-limited worker pool, and replaced atomically so the
+# API never reads a half-written file. Every updated ticker also gets a new
+# columnar copy and range index (functions/columnar.py), which is what the API
+# reads first, and the master calendar is rebuilt at the end of the run. A
+# manifest of what is on disk is kept in {DATA_DIR}/manifest.json.
+#
+# A fetcher is any callable fetch(ticker, start, end) -> DataFrame with columns
+# Date, Close, Dividends, Stock Splits (end exclusive, empty when there is no data).
+COLUMNS = ["Date", "Close", "Dividends", "Stock Splits"]
+MANIFEST_NAME = "manifest.json"
+
+logger = logging.getLogger(__name__)
+
+
+class YahooFetcher:
+    """Fetches daily history from Yahoo Finance through yfinance."""
+
+    def __call__(self, ticker, start, end):
+        import yfinance as yf
+
+        df = yf.Ticker(ticker).history(start=start, end=end)
+        if df.empty:
+            return pd.DataFrame(columns=COLUMNS)
+        return df.reset_index()[COLUMNS]
+
+
+class FakeFetcher:
+    """
+    Serves histories from memory instead of the network: `histories` maps a
+    ticker to a DataFrame in the fetcher format. Every call is recorded in
+    `calls` as (ticker, start, end).
+    """
+
+    def __init__(self, histories):
+        self.histories = histories
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, ticker, start, end):
+        with self.lock:
+            self.calls.append((ticker, start, end))
+        if ticker not in self.histories:
+            return pd.DataFrame(columns=COLUMNS)
+        df = self.histories[ticker]
+        day = _dates(df["Date"])
+        keep = (day >= pd.Timestamp(start)) & (day < pd.Timestamp(end))
+        return df[keep.to_numpy()].reset_index(drop=True)
+
+
+class RateLimiter:
+    """Token bucket shared by all workers: at most `rate` acquisitions per second."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def ingest(tickers, fetcher, start_date, end_date=None, workers=None, rate=None, data_dir=None, columnar_dir=None):
+    """
+    Brings the cached history of every ticker up to end_date (default: today),
+    its columnar copy, the master calendar and the manifest. Returns the
+    manifest entries of this run, keyed by ticker; a ticker that failed keeps
+    its previous entry with an "error".
+    """
+    data_dir = data_dir or config.DATA_DIR
+    columnar_dir = columnar_dir or config.COLUMNAR_DIR
+    workers = workers or config.INGEST_WORKERS
+    rate = config.INGEST_RATE if rate is None else rate
+    end_date = pd.Timestamp(end_date or pd.Timestamp.today()).normalize()
+    os.makedirs(data_dir, exist_ok=True)
+
+    manifest = read_manifest(data_dir)
+    limiter = RateLimiter(rate)
+
+    def run(ticker):
+        try:
+            entry = ingest_ticker(ticker, fetcher, pd.Timestamp(start_date), end_date, limiter, data_dir, columnar_dir)
+        except Exception as e:
+            logger.warning("%s failed: %s", ticker, e)
+            entry = dict(manifest.get(ticker, {}), error=str(e))
+        return ticker, entry
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(pool.map(run, tickers))
+
+    # Entries are merged into the existing ones so fields set elsewhere (the
+    # calendar "offset") survive until the calendar is rebuilt.
+    converted = False
+    for ticker, entry in results.items():
+        if entry and "rows" in entry and "error" not in entry:
+            converted |= entry.pop("converted", False)
+            merged = dict(manifest.get(ticker, {}), **entry)
+            merged.pop("error", None)
+            manifest[ticker] = merged
+    if converted:
+        rebuild_calendar(manifest, columnar_dir)
+    write_manifest(manifest, data_dir)
+    return results
+
+
+def ingest_ticker(ticker, fetcher, start_date, end_date, limiter, data_dir, columnar_dir=None):
+    """
+    Updates one ticker's pickle and columnar copy. Returns its manifest entry
+    with "converted" set when a columnar copy was written, or None when the
+    ticker has no data.
+    """
+    path = os.path.join(data_dir, f"{ticker}.pkl")
+    columnar_dir = columnar_dir or config.COLUMNAR_DIR
+    cached = pd.read_pickle(path) if os.path.exists(path) else None
+
+    fetch_from = start_date
+    if cached is not None and not cached.empty:
+        fetch_from = _dates(cached["Date"]).max() + pd.Timedelta(days=1)
+    if fetch_from >= end_date:
+        logger.info("%s is up to date", ticker)
+        return _unchanged(ticker, path, cached, columnar_dir)
+
+    limiter.acquire()
+    logger.info("Downloading %s from %s", ticker, fetch_from.date())
+    new = fetcher(ticker, str(fetch_from.date()), str(end_date.date()))
+    if new.empty:
+        return _unchanged(ticker, path, cached, columnar_dir)
+
+    if cached is not None and (new["Dividends"].fillna(0).ne(0).any() or new["Stock Splits"].fillna(0).ne(0).any()):
+        # A new dividend or split re-adjusts every earlier close, so the cached
+        # bars are stale: take the full history again instead of appending.
+        limiter.acquire()
+        logger.info("Refetching %s after a dividend/split", ticker)
+        cached_dates = _dates(cached["Date"])
+        since = min(start_date, cached_dates.min())
+        df = fetcher(ticker, str(since.date()), str(end_date.date()))
+        # A short or empty answer must not replace a good cached history.
+        if df.empty:
+            raise ValueError(f"Refetch of {ticker} returned no data")
+        refetched, first, last = _dates(df["Date"]), cached_dates.min(), _dates(new["Date"]).max()
+        if refetched.min() > first or refetched.max() < last:
+            raise ValueError(
+                f"Refetch of {ticker} covers {refetched.min().date()}..{refetched.max().date()}, "
+                f"less than {first.date()}..{last.date()}"
+            )
+        df = df[COLUMNS]
+    elif cached is not None:
+        df = pd.concat([cached, new[COLUMNS]], ignore_index=True)
+    else:
+        df = new[COLUMNS].reset_index(drop=True)
+
+    df = df.drop_duplicates("Date", keep="last").sort_values("Date").reset_index(drop=True)
+    write_atomic(path, lambda f: df.to_pickle(f))
+    _convert(ticker, df, columnar_dir)
+    return dict(manifest_entry(path, df), converted=True)
+
+
+def _unchanged(ticker, path, cached, columnar_dir):
+    # Entry of a ticker with nothing new; converted here if it has no columnar copy yet.
+    if cached is None:
+        return None
+    entry = manifest_entry(path, cached)
+    if not os.path.isdir(os.path.join(columnar_dir, ticker)):
+        _convert(ticker, cached, columnar_dir)
+        entry["converted"] = True
+    return entry
+
+
+def _convert(ticker, df, columnar_dir):
+    history = df.assign(Date=_dates(df["Date"])).set_index("Date")
+    write_columnar(ticker, history, columnar_dir)
+
+
+def manifest_entry(path, df):
+    """First/last date with a close, row count and checksum of a cached price file."""
+    dates = _dates(df["Date"])[pd.to_numeric(df["Close"], errors="coerce").notna().to_numpy()]
+    return {
+        "first_date": str(dates.min().date()),
+        "last_date": str(dates.max().date()),
+        "rows": int(len(df)),
+        "sha256": file_checksum(path),
+    }
+
+
+def read_manifest(data_dir=None):
+    path = os.path.join(data_dir or config.DATA_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(manifest, data_dir=None):
+    path = os.path.join(data_dir or config.DATA_DIR, MANIFEST_NAME)
+    text = json.dumps(dict(sorted(manifest.items())), indent=1)
+    write_atomic(path, lambda f: f.write(text.encode("utf-8")))
+
+
+def write_atomic(path, write):
+    """Writes through `write(file)` to a temp file beside `path`, then renames it over `path`."""
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _dates(column):
+    # Trading dates as naive midnight timestamps, whatever the source timezone.
+    return pd.to_datetime(column, utc=True).dt.tz_convert(None).dt.normalize()
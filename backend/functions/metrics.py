@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+
+RISK_FREE_RATE = 0.02
+TRADING_DAYS = 252
+
+
+def compute_metrics(values, dates, risk_free_rate=RISK_FREE_RATE, observed=None):
+    """
+    Computes performance metrics for every column of a (dates x series) value
+    matrix in one vectorized pass.
+
+    Columns may start late or end early (leading/trailing NaN) when a series
+    does not cover the whole date range; each column is measured over its own
+    valid span. For a matrix forward-filled onto shared dates, `observed` marks
+    the cells holding a column's own values (trading_calendar.align with
+    observed=True): a filled cell then adds no zero daily return and does not
+    open a calendar year, so every column is measured on its own dates only.
+    Returns a dict of arrays, one entry per column:
+
+      initial, ending, total_return, cagr, volatility, best_year, worst_year,
+      max_drawdown, sharpe, sortino
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if values.ndim == 1:
+        values = values[:, None]
+    dates = pd.DatetimeIndex(dates)
+    n, k = values.shape
+    cols = np.arange(k)
+
+    valid = ~np.isnan(values)
+    has_data = valid.any(axis=0)
+    first = np.where(has_data, valid.argmax(axis=0), 0)
+    last = np.where(has_data, n - 1 - valid[::-1].argmax(axis=0), 0)
+
+    with np.errstate(all="ignore"):
+        initial = np.where(has_data, values[first, cols], np.nan)
+        ending = np.where(has_data, values[last, cols], np.nan)
+        total_return = ending / initial - 1
+
+        day = dates.values.astype("datetime64[D]").astype(np.int64)
+        years = (day[last] - day[first]) / 365.25
+        cagr = np.where(years > 0, (ending / initial) ** (1 / years) - 1, np.nan)
+
+        daily_returns = values[1:] / values[:-1] - 1
+        if observed is not None:
+            daily_returns = np.where(observed[1:], daily_returns, np.nan)
+        volatility = _nanstd(daily_returns) * np.sqrt(TRADING_DAYS)
+
+        daily_rf = risk_free_rate / TRADING_DAYS
+        downside = np.where(daily_returns < daily_rf, daily_returns, np.nan)
+        downside_std = _nanstd(downside) * np.sqrt(TRADING_DAYS)
+
+        yearly = yearly_returns(values, dates, first, last, observed)
+        best_year = _nanreduce(np.nanmax, yearly)
+        worst_year = _nanreduce(np.nanmin, yearly)
+
+        running_max = np.fmax.accumulate(values, axis=0)
+        max_drawdown = _nanreduce(np.nanmin, values / running_max - 1)
+
+        sharpe = np.where(np.isclose(volatility, 0), np.nan, (cagr - risk_free_rate) / volatility)
+        sortino = np.where(np.isclose(downside_std, 0), np.nan, (cagr - risk_free_rate) / downside_std)
+        sharpe = np.where(sharpe > 1000, np.nan, sharpe)
+        sortino = np.where(sortino > 1000, np.nan, sortino)
+
+    return {
+        "initial": initial,
+        "ending": ending,
+        "total_return": total_return,
+        "cagr": cagr,
+        "volatility": volatility,
+        "best_year": best_year,
+        "worst_year": worst_year,
+        "max_drawdown": max_drawdown,
+        "sharpe": sharpe,
+        "sortino": sortino,
+    }
+
+
+def yearly_returns(values, dates, first, last, observed=None):
+    """
+    (years x series) matrix of calendar-year returns: last value of the year over
+    the first value of the year, each restricted to the column's valid span
+    and, with `observed`, starting at the column's first observed value.
+    """
+    year = np.asarray(pd.DatetimeIndex(dates).year)
+    starts = np.flatnonzero(np.r_[True, year[1:] != year[:-1]])
+    ends = np.r_[starts[1:], len(year)] - 1
+
+    lo = np.maximum(starts[:, None], first[None, :])
+    hi = np.minimum(ends[:, None], last[None, :])
+    cols = np.arange(values.shape[1])[None, :]
+    if observed is not None:
+        # Next observed row at or after each row (n when there is none); the
+        # forward-filled value at `hi` already is the last observed one.
+        n = len(values)
+        rows = np.where(observed, np.arange(n)[:, None], n)
+        next_observed = np.minimum.accumulate(rows[::-1], axis=0)[::-1]
+        lo = next_observed[np.minimum(lo, n - 1), cols]
+    with np.errstate(all="ignore"):
+        returns = values[hi, cols] / values[np.minimum(lo, len(values) - 1), cols] - 1
+    return np.where(lo <= hi, returns, np.nan)
+
+
+def _nanstd(x):
+    # Sample standard deviation (ddof=1) per column, ignoring NaN; NaN with < 2 points.
+    count = (~np.isnan(x)).sum(axis=0)
+    mean = np.nansum(x, axis=0) / count
+    var = np.nansum((x - mean) ** 2, axis=0) / (count - 1)
+    return np.where(count > 1, np.sqrt(var), np.nan)
+
+
+def _nanreduce(func, x):
+    # nanmin/nanmax per column without the all-NaN RuntimeWarning.
+    empty = np.isnan(x).all(axis=0)
+    if x.shape[0] == 0:
+        return np.full(x.shape[1], np.nan)
+    return np.where(empty, np.nan, func(np.where(empty, 0, x), axis=0))
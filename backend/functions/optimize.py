@@ -0,0 +1,199 @@
+import numpy as np
+from classes.portfolio import Portfolio
+from functions.metrics import RISK_FREE_RATE, TRADING_DAYS
+from functions.scenarios import evaluate_on_matrix
+
+# Long-only mean-variance optimization with per-ticker weight bounds, solved in
+# NumPy: for a risk-aversion trade-off lam, minimize  w' C w - lam * mu' w  over
+# {sum(w) = 1, lower <= w <= upper}. Every lam is one column of a weight matrix
+# and all columns are solved together by accelerated projected gradient (FISTA).
+#
+# mu and C are annualized mean daily returns and covariance of daily returns.
+#
+# Frontier portfolios are placed at evenly spaced expected returns: each target
+# is bracketed by two trade-offs of the grid, the bracket is narrowed by secant
+# steps on the trade-off (all targets in one batched solve per step), and the
+# target is met exactly by mixing the bracket's two ends.
+MAX_ITER = 3000
+TOL = 1e-8
+BRACKET_STEPS = 40
+BRACKET_TOL = 1e-7
+
+
+def return_stats(matrix):
+    """Annualized mean return vector and covariance matrix of a (dates x tickers) price matrix."""
+    returns = matrix[1:] / matrix[:-1] - 1
+    return returns.mean(axis=0) * TRADING_DAYS, np.atleast_2d(np.cov(returns, rowvar=False)) * TRADING_DAYS
+
+
+def solve(mu, cov, lams, lower, upper, start=None):
+    """Optimal weights (tickers x len(lams)) for each trade-off in `lams`."""
+    lams = np.asarray(lams, dtype=np.float64)[None, :]
+    step = 1 / (2 * max(np.linalg.eigvalsh(cov)[-1], 1e-12))
+    w = project(np.full((len(mu), lams.shape[1]), 1 / len(mu)) if start is None else start, lower, upper)
+    y, t = w, np.ones(lams.shape[1])
+    for _ in range(MAX_ITER):
+        gradient = 2 * cov @ y - lams * mu[:, None]
+        w_next = project(y - step * gradient, lower, upper)
+        # Momentum is restarted for columns whose step turned against the gradient.
+        t = np.where(((y - w_next) * (w_next - w)).sum(axis=0) > 0, 1.0, t)
+        t_next = (1 + np.sqrt(1 + 4 * t * t)) / 2
+        y = w_next + (t - 1) / t_next * (w_next - w)
+        converged = np.abs(w_next - w).max() < TOL
+        w, t = w_next, t_next
+        if converged:
+            break
+    return w
+
+
+def project(v, lower, upper):
+    """
+    Euclidean projection of each column of v onto {sum = 1, lower <= w <= upper}:
+    w = clip(v - tau, lower, upper) with tau found by bisection, all columns at once.
+    """
+    lower, upper = lower[:, None], upper[:, None]
+    lo = (v - upper).min(axis=0)
+    hi = (v - lower).max(axis=0)
+    for _ in range(50):
+        tau = (lo + hi) / 2
+        too_big = np.clip(v - tau, lower, upper).sum(axis=0) > 1
+        lo = np.where(too_big, tau, lo)
+        hi = np.where(too_big, hi, tau)
+    return np.clip(v - (lo + hi) / 2, lower, upper)
+
+
+def max_return(mu, lower, upper):
+    """Highest expected return within the bounds: lower bounds first, the rest by descending mu."""
+    w = lower.copy()
+    room = 1 - w.sum()
+    for i in np.argsort(-mu, kind="stable"):
+        add = min(upper[i] - w[i], room)
+        w[i] += add
+        room -= add
+        if room <= 0:
+            break
+    return w
+
+
+def on_targets(mu, cov, lams, weights, targets, lower, upper):
+    """
+    Frontier weights (tickers x len(targets)) whose expected returns are the
+    `targets`. `lams` (ascending, the last may be inf) and their solved
+    `weights` must bracket every target.
+    """
+    expected = np.maximum.accumulate(mu @ weights)
+    j = np.clip(np.searchsorted(expected, targets), 1, len(lams) - 1)
+    lo_lam, hi_lam = lams[j - 1], lams[j]
+    lo_w, hi_w = weights[:, j - 1], weights[:, j]
+    lo_e, hi_e = mu @ lo_w, mu @ hi_w
+    tol = BRACKET_TOL * max(expected[-1] - expected[0], 1e-12)
+
+    def active(w):
+        return np.where(w <= lower[:, None] + 1e-9, -1, np.where(w >= upper[:, None] - 1e-9, 1, 0))
+
+    for _ in range(BRACKET_STEPS):
+        # Between two trade-offs with the same bounds active the solution is
+        # affine in the trade-off, so mixing the ends is already exact there.
+        open_ = np.flatnonzero((hi_e - lo_e > tol) & (active(lo_w) != active(hi_w)).any(axis=0))
+        if not len(open_):
+            break
+        # Secant step in the trade-off, kept off the bracket's ends (x10 towards an infinite end).
+        lo, hi = lo_lam[open_], hi_lam[open_]
+        finite = np.where(np.isinf(hi), lo * 10, hi)
+        share = np.clip((targets[open_] - lo_e[open_]) / (hi_e[open_] - lo_e[open_]), 0.1, 0.9)
+        mid = np.where(np.isinf(hi), finite, lo + share * (finite - lo))
+        w = solve(mu, cov, mid, lower, upper, lo_w[:, open_] * (1 - share) + hi_w[:, open_] * share)
+        e = mu @ w
+        below = e <= targets[open_]
+        up, down = open_[below], open_[~below]
+        lo_lam[up], lo_w[:, up], lo_e[up] = mid[below], w[:, below], e[below]
+        hi_lam[down], hi_w[:, down], hi_e[down] = mid[~below], w[:, ~below], e[~below]
+
+    span = hi_e - lo_e
+    a = np.clip(np.where(span > 0, (hi_e - targets) / np.where(span > 0, span, 1), 1.0), 0, 1)
+    return lo_w * a + hi_w * (1 - a)
+
+
+def efficient_frontier(mu, cov, lower, upper, points=20, risk_free_rate=RISK_FREE_RATE):
+    """
+    Minimum-variance, maximum-Sharpe and `points` frontier portfolios.
+    Returns a dict of weight arrays: "min_variance", "max_sharpe" and
+    "frontier" (tickers x points, at evenly spaced expected returns from the
+    minimum-variance to the maximum-return portfolio).
+    """
+    lower = np.asarray(lower, dtype=np.float64)
+    upper = np.asarray(upper, dtype=np.float64)
+    if np.any(lower > upper) or lower.sum() > 1 + 1e-9 or upper.sum() < 1 - 1e-9:
+        raise ValueError("Weight bounds admit no fully invested portfolio")
+
+    # The trade-off scale at which the return term matters as much as the risk term.
+    scale = 2 * np.trace(cov) / len(mu) / max(np.abs(mu).max(), 1e-12)
+    lams = np.concatenate([[0.0], scale * np.geomspace(1e-2, 1e3, max(points, 2) * 4)])
+    weights = solve(mu, cov, lams, lower, upper)
+
+    expected = mu @ weights
+    volatility = np.sqrt(np.maximum(np.einsum("ij,ik,kj->j", weights, cov, weights), 0))
+    sharpe = (expected - risk_free_rate) / np.where(volatility > 0, volatility, np.nan)
+
+    # Frontier: `points` portfolios evenly spaced in expected return, up to the
+    # maximum-return portfolio (the limit of an infinite trade-off).
+    top = max_return(mu, lower, upper)
+    targets = np.linspace(expected[0], max(mu @ top, expected[0]), points)
+    frontier = on_targets(mu, cov, np.append(lams, np.inf), np.column_stack([weights, top]), targets, lower, upper)
+
+    # Max Sharpe: the best grid trade-off, refined on a finer grid around it.
+    best = int(np.nanargmax(np.where(np.isnan(sharpe), -np.inf, sharpe)))
+    fine = np.geomspace(lams[max(best - 1, 1)], lams[min(best + 1, len(lams) - 1)], 17)
+    fine_weights = solve(mu, cov, fine, lower, upper, np.repeat(weights[:, [best]], len(fine), axis=1))
+    candidates = np.hstack([weights[:, [best]], fine_weights])
+    candidate_sharpe = (mu @ candidates - risk_free_rate) / np.sqrt(
+        np.maximum(np.einsum("ij,ik,kj->j", candidates, cov, candidates), 1e-300)
+    )
+    max_sharpe = candidates[:, int(np.argmax(candidate_sharpe))]
+
+    return {
+        "min_variance": weights[:, 0],
+        "max_sharpe": max_sharpe,
+        "frontier": frontier,
+    }
+
+
+def optimize_portfolio(tickers, start_date, end_date, lower, upper, points=20,
+                       initial=10000, addition=0, frequency="monthly", rebalance="none"):
+    """
+    Efficient frontier of `tickers` over the date range. Each returned portfolio
+    carries its weights, expected return, volatility and Sharpe ratio from the
+    covariance model, and the Portfolio.analyze metrics ("data") of actually
+    holding it over the range with the given contribution plan.
+    """
+    dates, matrix = Portfolio.get_matrix(list(tickers), start_date, end_date)
+    if len(dates) < 3:
+        raise ValueError("Not enough data points to estimate returns.")
+    mu, cov = return_stats(matrix)
+    result = efficient_frontier(mu, cov, lower, upper, points)
+
+    portfolios = [result["min_variance"], result["max_sharpe"], *result["frontier"].T]
+    evaluated = evaluate_on_matrix(tickers, dates, matrix, [
+        {
+            "weights": dict(zip(tickers, w)),
+            "initial": initial,
+            "addition": addition,
+            "frequency": frequency,
+            "rebalance": rebalance,
+        }
+        for w in portfolios
+    ])["scenarios"]
+
+    def describe(w, metrics):
+        vol = float(np.sqrt(max(w @ cov @ w, 0)))
+        expected = float(mu @ w)
+        return {
+            "weights": {ticker: round(float(x), 6) for ticker, x in zip(tickers, w)},
+            "expectedReturn": round(expected, 4),
+            "volatility": round(vol, 4),
+            "sharpe": round((expected - RISK_FREE_RATE) / vol, 4) if vol > 0 else None,
+            "data": metrics["data"],
+        }
+
+    described = [describe(w, metrics) for w, metrics in zip(portfolios, evaluated)]
+    return {"minVariance": described[0], "maxSharpe": described[1], "frontier": described[2:]}
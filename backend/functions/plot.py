@@ -1,8 +1,11 @@
+import logging
 import yfinance as yf
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 
+logger = logging.getLogger(__name__)
+
 def plot_json_chart(data_dict, title="Chart"):
     plt.figure(figsize=(14, 6), dpi=120)
     plt.clf()
@@ -16,7 +19,7 @@ def plot_json_chart(data_dict, title="Chart"):
     if "stocks" in data_dict:
         for ticker, info in data_dict["stocks"].items():
             if len(info["values"]) != len(dates):
-                print(f"Skipping {ticker}: mismatched date/value length.")
+                logger.warning("Skipping %s: mismatched date/value length.", ticker)
                 continue
             label = f"{ticker} ({info['weight']*100:.0f}%)"
             plt.plot(dates, info["values"], label=label, linestyle="--", alpha=0.7)
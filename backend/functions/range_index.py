@@ -0,0 +1,241 @@
+import os
+import numpy as np
+
+from functions.metrics import RISK_FREE_RATE, TRADING_DAYS
+
+# Per-ticker prefix-sum index over the full close history. Any [start, end]
+# range is answered from a handful of lookups:
+#
+#   days, close     cleaned history (NaN closes dropped), days since 1970-01-01
+#   cum_r, cum_r2   prefix sums of daily returns and squared returns
+#   cum_dn, cum_d,  prefix count / sum / squared sum of downside returns
+#   cum_d2          (returns below RISK_FREE_RATE / TRADING_DAYS)
+#   year_starts     row of the first trading day of each calendar year
+#   year_returns    return of each calendar year, first to last trading day
+#   year_max,       sparse tables over year_returns: row k holds the max / min
+#   year_min        of the 2**k years starting at each year
+#   dd_max, dd_min, segment tree over close (root at 1, leaves from len/2):
+#   dd_mdd          each node's max, min and max drawdown within the node
+#
+# cum_*[k] covers the returns of rows 1..k, so the returns inside rows lo..hi
+# are cum[hi] - cum[lo].
+FIELDS = (
+    "days", "close", "cum_r", "cum_r2", "cum_dn", "cum_d", "cum_d2", "year_starts", "year_returns",
+    "year_max", "year_min", "dd_max", "dd_min", "dd_mdd",
+)
+INDEX_DIR = "index"
+METRICS = ("total_return", "cagr", "volatility", "best_year", "worst_year", "max_drawdown", "sharpe", "sortino")
+
+
+class PrefixIndex:
+    def __init__(self, arrays):
+        for field in FIELDS:
+            setattr(self, field, arrays[field])
+
+    @property
+    def nbytes(self):
+        # Memory-mapped arrays live in the page cache, not in this process.
+        arrays = (getattr(self, field) for field in FIELDS)
+        return sum(a.nbytes for a in arrays if not isinstance(a, np.memmap))
+
+    def bounds(self, start_day, end_day):
+        """Row range lo..hi (inclusive) of the trading days between the two epoch days."""
+        lo = int(np.searchsorted(self.days, start_day, side="left"))
+        hi = int(np.searchsorted(self.days, end_day, side="right")) - 1
+        return lo, hi
+
+    def stats(self, lo, hi, risk_free_rate=RISK_FREE_RATE):
+        """
+        Metrics for rows lo..hi, matching functions.metrics.compute_metrics on that
+        slice. Total return, CAGR, volatility, Sharpe, Sortino and best/worst year
+        take constant time; max drawdown takes O(log n).
+        """
+        nan = float("nan")
+        if hi <= lo:
+            return dict.fromkeys(METRICS, nan)
+
+        close, days = self.close, self.days
+        total_return = close[hi] / close[lo] - 1
+        years = (days[hi] - days[lo]) / 365.25
+        cagr = (close[hi] / close[lo]) ** (1 / years) - 1 if years > 0 else nan
+
+        n = hi - lo
+        volatility = _std(n, self.cum_r[hi] - self.cum_r[lo], self.cum_r2[hi] - self.cum_r2[lo])
+
+        if risk_free_rate == RISK_FREE_RATE:
+            downside_std = _std(
+                int(self.cum_dn[hi] - self.cum_dn[lo]),
+                self.cum_d[hi] - self.cum_d[lo],
+                self.cum_d2[hi] - self.cum_d2[lo],
+            )
+        else:
+            # The prefix sums are built for the default threshold; other rates scan the slice.
+            r = close[lo + 1:hi + 1] / close[lo:hi] - 1
+            d = r[r < risk_free_rate / TRADING_DAYS]
+            downside_std = _std(len(d), d.sum(), (d ** 2).sum())
+        volatility *= np.sqrt(TRADING_DAYS)
+        downside_std *= np.sqrt(TRADING_DAYS)
+
+        best_year, worst_year = self._year_extremes(lo, hi)
+        max_drawdown = self.max_drawdown(lo, hi)
+
+        sharpe = nan if np.isclose(volatility, 0) or np.isnan(volatility) else (cagr - risk_free_rate) / volatility
+        sortino = nan if np.isclose(downside_std, 0) or np.isnan(downside_std) else (cagr - risk_free_rate) / downside_std
+        if sharpe > 1000:
+            sharpe = nan
+        if sortino > 1000:
+            sortino = nan
+
+        return {
+            "total_return": float(total_return),
+            "cagr": float(cagr),
+            "volatility": float(volatility),
+            "best_year": best_year,
+            "worst_year": worst_year,
+            "max_drawdown": float(max_drawdown),
+            "sharpe": float(sharpe),
+            "sortino": float(sortino),
+        }
+
+    def max_drawdown(self, lo, hi):
+        """Largest peak-to-trough fall of close over rows lo..hi, from O(log n) tree nodes."""
+        size = len(self.dd_max) // 2
+        left, right = [], []
+        l, r = lo + size, hi + size + 1
+        while l < r:
+            if l & 1:
+                left.append(l)
+                l += 1
+            if r & 1:
+                r -= 1
+                right.append(r)
+            l >>= 1
+            r >>= 1
+
+        peak, drawdown = -np.inf, 0.0
+        for node in left + right[::-1]:
+            drawdown = min(drawdown, self.dd_mdd[node], self.dd_min[node] / peak - 1 if peak > 0 else 0.0)
+            peak = max(peak, self.dd_max[node])
+        return float(drawdown)
+
+    def _year_extremes(self, lo, hi):
+        """Best and worst calendar year over rows lo..hi; the partial first and last
+        years are computed directly and the whole years in between come from the
+        sparse tables."""
+        first_year = int(np.searchsorted(self.year_starts, lo, side="right")) - 1
+        last_year = int(np.searchsorted(self.year_starts, hi, side="right")) - 1
+        close, starts = self.close, self.year_starts
+        if first_year == last_year:
+            only = float(close[hi] / close[lo] - 1)
+            return only, only
+
+        head = close[starts[first_year + 1] - 1] / close[lo] - 1
+        tail = close[hi] / close[starts[last_year]] - 1
+        best, worst = max(head, tail), min(head, tail)
+        a, b = first_year + 1, last_year - 1
+        if a <= b:
+            k = (b - a + 1).bit_length() - 1
+            best = max(best, self.year_max[k, a], self.year_max[k, b - (1 << k) + 1])
+            worst = min(worst, self.year_min[k, a], self.year_min[k, b - (1 << k) + 1])
+        return float(best), float(worst)
+
+
+def build_index(days, close, risk_free_rate=RISK_FREE_RATE):
+    days = np.asarray(days, dtype=np.int64)
+    close = np.asarray(close, dtype=np.float64)
+    keep = ~np.isnan(close)
+    days, close = days[keep], close[keep]
+
+    r = close[1:] / close[:-1] - 1 if len(close) > 1 else np.empty(0)
+    down = r < risk_free_rate / TRADING_DAYS
+    d = np.where(down, r, 0.0)
+
+    def prefix(x):
+        return np.concatenate([[0], np.cumsum(x)])
+
+    year = (days.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970)
+    year_starts = np.flatnonzero(np.r_[True, year[1:] != year[:-1]]) if len(year) else np.empty(0, np.int64)
+    year_ends = np.r_[year_starts[1:], len(year)] - 1
+    year_returns = close[year_ends] / close[year_starts] - 1 if len(year) else np.empty(0)
+
+    year_max, year_min = _sparse_tables(year_returns)
+    dd_max, dd_min, dd_mdd = _drawdown_tree(close)
+
+    return PrefixIndex({
+        "days": days,
+        "close": close,
+        "cum_r": prefix(r),
+        "cum_r2": prefix(r ** 2),
+        "cum_dn": prefix(down.astype(np.int64)),
+        "cum_d": prefix(d),
+        "cum_d2": prefix(d ** 2),
+        "year_starts": year_starts.astype(np.int64),
+        "year_returns": year_returns,
+        "year_max": year_max,
+        "year_min": year_min,
+        "dd_max": dd_max,
+        "dd_min": dd_min,
+        "dd_mdd": dd_mdd,
+    })
+
+
+def _sparse_tables(values):
+    # Row k: max / min of values[i:i + 2**k]; row k + 1 combines two halves of row k.
+    levels = max(len(values), 1).bit_length()
+    table_max = np.full((levels, len(values)), np.nan)
+    table_min = np.full((levels, len(values)), np.nan)
+    table_max[0], table_min[0] = values, values
+    for k in range(1, levels):
+        half, width = 1 << (k - 1), len(values) - (1 << k) + 1
+        table_max[k, :width] = np.maximum(table_max[k - 1, :width], table_max[k - 1, half:half + width])
+        table_min[k, :width] = np.minimum(table_min[k - 1, :width], table_min[k - 1, half:half + width])
+    return table_max, table_min
+
+
+def _drawdown_tree(close):
+    # Leaves past the end are padding (max -inf, min +inf) that never lowers a drawdown.
+    size = 1 << max(len(close) - 1, 0).bit_length()
+    tree_max = np.full(2 * size, -np.inf)
+    tree_min = np.full(2 * size, np.inf)
+    tree_mdd = np.zeros(2 * size)
+    tree_max[size:size + len(close)] = close
+    tree_min[size:size + len(close)] = close
+
+    width = size // 2
+    while width >= 1:
+        node = np.arange(width, 2 * width)
+        left, right = 2 * node, 2 * node + 1
+        tree_max[node] = np.maximum(tree_max[left], tree_max[right])
+        tree_min[node] = np.minimum(tree_min[left], tree_min[right])
+        with np.errstate(all="ignore"):
+            across = np.where(tree_max[left] > 0, tree_min[right] / tree_max[left] - 1, 0.0)
+        tree_mdd[node] = np.fmin(np.minimum(tree_mdd[left], tree_mdd[right]), across)
+        width //= 2
+    return tree_max, tree_min, tree_mdd
+
+
+def save_index(index, ticker_dir):
+    out_dir = os.path.join(ticker_dir, INDEX_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    for field in FIELDS:
+        np.save(os.path.join(out_dir, f"{field}.npy"), getattr(index, field))
+
+
+def open_index(ticker_dir):
+    """Memory-maps an index written by save_index, or returns None if there is none."""
+    in_dir = os.path.join(ticker_dir, INDEX_DIR)
+    if not os.path.exists(os.path.join(in_dir, f"{FIELDS[-1]}.npy")):
+        return None
+    try:
+        return PrefixIndex({field: np.load(os.path.join(in_dir, f"{field}.npy"), mmap_mode="r") for field in FIELDS})
+    except FileNotFoundError:
+        # The ticker's version was replaced and removed meanwhile (see functions/columnar.py).
+        return None
+
+
+def _std(n, s1, s2):
+    # Sample standard deviation (ddof=1) from count, sum and sum of squares.
+    if n < 2:
+        return float("nan")
+    var = (s2 - s1 * s1 / n) / (n - 1)
+    return float(np.sqrt(max(var, 0.0)))
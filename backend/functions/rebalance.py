@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from functions.contributions import contribution_schedule
+
+# Rebalancing resets the holdings to the target weights at the close of a
+# rebalance day. Calendar modes rebalance on the first trading day of each new
+# month/quarter/year (the same days functions.contributions contributes on);
+# "threshold" rebalances whenever any weight has drifted more than `band`
+# (absolute, e.g. 0.05 = 5 percentage points) from its target.
+REBALANCE_MODES = ["none", "monthly", "quarterly", "yearly", "threshold"]
+
+# Rows examined per vectorized step while looking for the next threshold breach;
+# doubled each step so long calm stretches take few steps.
+THRESHOLD_WINDOW = 256
+
+
+def rebalance_points(matrix, weights, dates, mode="none", band=0.05):
+    """Rows (always including 0) on whose close the holdings are reset to `weights`."""
+    if mode not in REBALANCE_MODES:
+        raise ValueError(f"Rebalance mode must be one of {REBALANCE_MODES}")
+    if mode == "none":
+        return np.array([0])
+    if mode == "threshold":
+        if band <= 0:
+            raise ValueError("Rebalance band must be positive")
+        return _threshold_points(matrix, weights, band)
+    counts = contribution_schedule(pd.DatetimeIndex(dates), mode)
+    return np.flatnonzero(np.r_[1, counts[1:]])
+
+
+def rebalanced_values(matrix, weights, dates, mode="none", band=0.05):
+    """
+    Value of a portfolio over a (dates x tickers) price matrix (any positive
+    per-ticker scale, no NaN) that starts at matrix[0] @ weights and is
+    rebalanced to `weights` at the rows given by rebalance_points.
+
+    The timeline is cut into segments at the rebalance rows; within a segment
+    the value is the segment's starting value times the weighted growth since
+    its start, so everything is a few array operations per call, independent of
+    the number of days between rebalances.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    starts = rebalance_points(matrix, weights, dates, mode, band)
+
+    segment = np.searchsorted(starts, np.arange(len(matrix)), side="right") - 1
+    growth = (matrix / matrix[starts[segment]]) @ weights / weights.sum()
+
+    # Value at each segment start: the previous segment's growth up to it, chained.
+    step = (matrix[starts[1:]] / matrix[starts[:-1]]) @ weights / weights.sum()
+    start_values = (matrix[0] @ weights) * np.concatenate([[1.0], np.cumprod(step)])
+    return start_values[segment] * growth
+
+
+def _threshold_points(matrix, weights, band):
+    target = weights / weights.sum()
+    points = [0]
+    start, n = 0, len(matrix)
+    while True:
+        breach = None
+        lo, window = start + 1, THRESHOLD_WINDOW
+        while lo < n and breach is None:
+            hi = min(n, lo + window)
+            held = target * (matrix[lo:hi] / matrix[start])
+            drift = np.abs(held / held.sum(axis=1, keepdims=True) - target).max(axis=1)
+            hit = np.flatnonzero(drift > band)
+            if len(hit):
+                breach = lo + int(hit[0])
+            lo, window = hi, window * 2
+        if breach is None:
+            return np.array(points)
+        points.append(breach)
+        start = breach
@@ -0,0 +1,96 @@
+import numpy as np
+from classes.portfolio import Portfolio, summary
+from functions import contributions
+from functions.contributions import FREQUENCIES
+from functions.downsample import downsample_dates
+from functions.metrics import compute_metrics
+from functions.rebalance import rebalanced_values
+from functions.timing import stage
+from functions.xirr import xirr_batch
+
+
+def evaluate_scenarios(tickers, start_date, end_date, scenarios, max_points=None):
+    """
+    Evaluates many portfolios over one shared ticker set and date range.
+
+    The tickers are loaded and aligned once (on the days they all traded); each
+    scenario is a dict with weights (ticker -> weight, missing tickers weigh 0),
+    initial, addition, frequency, and optionally rebalance, rebalance_band and
+    series. Values for every scenario are computed as one (dates x scenarios)
+    matrix, contributions are applied per shared schedule, and all metrics come
+    from one pass of the metrics engine plus one batched XIRR solve.
+
+    Returns {"scenarios": [...]} in request order, each with "data" (the
+    Portfolio.analyze metrics) and, for scenarios with series=True, the
+    "dates", "portfolio" and "raw" series of /portfolio.
+    """
+    dates, matrix = Portfolio.get_matrix(list(tickers), start_date, end_date)
+    return evaluate_on_matrix(tickers, dates, matrix, scenarios, max_points)
+
+
+def evaluate_on_matrix(tickers, dates, matrix, scenarios, max_points=None):
+    """evaluate_scenarios on an already aligned (dates x tickers) matrix from Portfolio.get_matrix."""
+    if not scenarios:
+        raise ValueError("No scenarios given.")
+    if len(dates) < 2:
+        raise ValueError("Not enough data points in portfolio to compute metrics.")
+
+    position = {ticker: j for j, ticker in enumerate(tickers)}
+    weights = np.zeros((len(tickers), len(scenarios)))
+    for i, scenario in enumerate(scenarios):
+        for ticker, weight in scenario["weights"].items():
+            if ticker not in position:
+                raise ValueError(f"Scenario {i} weights {ticker}, which is not in the ticker set.")
+            weights[position[ticker], i] = weight
+
+    # Buy-and-hold scenarios in one matrix product; rebalanced ones column by column.
+    values = matrix @ weights
+    for i, scenario in enumerate(scenarios):
+        mode = scenario.get("rebalance", "none")
+        if mode != "none":
+            values[:, i] = rebalanced_values(matrix, weights[:, i], dates, mode, scenario.get("rebalance_band", 0.05))
+
+    # Scenarios sharing a contribution schedule are grown together.
+    dollar_values = np.empty_like(values)
+    flows = np.empty_like(values)
+    groups = {}
+    for i, scenario in enumerate(scenarios):
+        frequency = scenario["frequency"]
+        if isinstance(frequency, str) and frequency not in FREQUENCIES:
+            raise ValueError(f"Frequency must be one of {FREQUENCIES}")
+        key = frequency if isinstance(frequency, str) else tuple(frequency)
+        groups.setdefault(key, []).append(i)
+    with stage("contributions"):
+        for frequency, members in groups.items():
+            frequency = frequency if isinstance(frequency, str) else list(frequency)
+            dollar_values[:, members], flows[:, members] = contributions.apply_contributions(
+                values[:, members], dates,
+                np.array([scenarios[i]["initial"] for i in members], dtype=float),
+                np.array([scenarios[i]["addition"] for i in members], dtype=float),
+                frequency,
+            )
+
+    k = len(scenarios)
+    with stage("metrics"):
+        m = compute_metrics(np.hstack([values, dollar_values]), dates)
+        cashflows = -flows.T
+        cashflows[:, -1] += dollar_values[-1]
+        mwrr = xirr_batch(cashflows, dates)
+    total_contrib = dollar_values[-1] - cashflows.sum(axis=1)
+
+    day = dates.values.astype("datetime64[D]")
+    results = []
+    for i, scenario in enumerate(scenarios):
+        result = {"data": summary(
+            m["initial"][k + i], m["ending"][k + i], m["total_return"][i], m["cagr"][i],
+            m["volatility"][i], m["best_year"][i], m["worst_year"][i], m["max_drawdown"][k + i],
+            m["sharpe"][i], m["sortino"][i], total_contrib[i], mwrr[i],
+        )}
+        if scenario.get("series"):
+            result.update({"dates": day, "portfolio": dollar_values[:, i], "raw": values[:, i]})
+            if max_points is not None:
+                idx = downsample_dates(day, dollar_values[:, i], max_points)
+                for field in ("dates", "portfolio", "raw"):
+                    result[field] = result[field][idx]
+        results.append(result)
+    return {"scenarios": results}
@@ -0,0 +1,85 @@
+import numpy as np
+from functions.columnar import from_epoch_days
+from functions.data import get_column, ticker_universe
+from functions.metrics import compute_metrics
+from functions.timing import stage
+from functions.trading_calendar import align
+from functions.universe import sp500_tickers
+
+# Universe screener: the metric set of every ticker of a universe over one date
+# range, from a single (dates x tickers) matrix. Closes come straight from the
+# resident / memory-mapped range indexes (functions.data.get_column), are placed
+# on the master calendar with the per_ticker policy and go through one pass of
+# the metrics engine, which measures each ticker on its own trading days (the
+# forward-filled cells are masked), as get_range_stats does. `years` is the
+# span each ticker actually covers, for filtering out tickers that listed after
+# the start of the range.
+UNIVERSES = {"sp500": sp500_tickers}
+METRICS = ["total_return", "cagr", "volatility", "best_year", "worst_year", "max_drawdown", "sharpe", "sortino", "years"]
+
+
+def universe_tickers(universe):
+    """Cached tickers of a named universe ("sp500", "all") or of an explicit ticker list."""
+    cached = ticker_universe()
+    if isinstance(universe, str):
+        if universe == "all":
+            return sorted(cached)
+        if universe not in UNIVERSES:
+            raise ValueError(f"Universe must be one of {['all', *UNIVERSES]} or a list of tickers")
+        universe = UNIVERSES[universe]
+    return [ticker for ticker in dict.fromkeys(universe) if ticker in cached]
+
+
+def screen(universe, start_date, end_date, sort_by="sharpe", descending=True, filters=(), limit=20):
+    """
+    Ranks the tickers of `universe` by `sort_by` over [start_date, end_date].
+    `filters` are dicts {"metric", "min", "max"} (either bound optional). Returns
+    the first `limit` matches, each {"ticker", <metric>: value...}, with the
+    number of tickers screened and matched.
+    """
+    if sort_by not in METRICS:
+        raise ValueError(f"sort_by must be one of {METRICS}")
+    for f in filters:
+        if f["metric"] not in METRICS:
+            raise ValueError(f"Filter metric must be one of {METRICS}")
+
+    tickers, columns = [], []
+    with stage("load"):
+        for ticker in universe_tickers(universe):
+            try:
+                days, close, offset = get_column(ticker, start_date, end_date)
+            except ValueError:
+                continue  # no data in the range
+            if len(days) >= 2:
+                tickers.append(ticker)
+                columns.append((days, close, offset))
+    if not tickers:
+        raise ValueError("No ticker of the universe has data in the range.")
+
+    with stage("align"):
+        days, matrix, observed = align(columns, "per_ticker", observed=True)
+    with stage("metrics"):
+        m = compute_metrics(matrix, from_epoch_days(days), observed=observed)
+        m["years"] = np.array([(d[-1] - d[0]) / 365.25 for d, _, _ in columns])
+        values = np.column_stack([np.asarray(m[name], dtype=np.float64) for name in METRICS])
+
+        keep = ~np.isnan(values[:, METRICS.index(sort_by)])
+        for f in filters:
+            column = values[:, METRICS.index(f["metric"])]
+            if f.get("min") is not None:
+                keep &= column >= f["min"]
+            if f.get("max") is not None:
+                keep &= column <= f["max"]
+
+        matched = np.flatnonzero(keep)
+        key = values[matched, METRICS.index(sort_by)]
+        order = matched[np.argsort(-key if descending else key, kind="stable")][:max(limit, 0)]
+
+    results = []
+    for i in order:
+        row = {"ticker": tickers[i]}
+        for j, name in enumerate(METRICS):
+            value = values[i, j]
+            row[name] = None if np.isnan(value) else round(float(value), 4)
+        results.append(row)
+    return {"results": results, "screened": len(tickers), "matched": len(matched)}
@@ -0,0 +1,112 @@
+import asyncio
+import base64
+import json
+import numpy as np
+from fastapi.responses import JSONResponse
+from functions.timing import stage
+
+try:
+    import orjson
+except ImportError:  # falls back to the standard library encoder
+    orjson = None
+
+# Results are computed as dicts holding NumPy arrays (datetime64 dates, float64
+# series) and only turned into a wire format here, once, at the end of a request.
+#
+# Default format: plain JSON, dates as "YYYY-MM-DD" strings and series as number
+# lists (NaN -> null).
+#
+# Compact format (opt-in with ?format=compact or Accept: COMPACT_MEDIA_TYPE):
+#   dates  -> {"start": "YYYY-MM-DD", "days": <base64 little-endian int32 day offsets from start>}
+#   series -> <base64 little-endian float32 values>
+# Other fields (metrics, stats) are left as JSON.
+COMPACT_MEDIA_TYPE = "application/vnd.portfolio.compact+json"
+
+# render_async encodes results holding more array data than this (bytes) in a
+# thread instead of on the event loop.
+INLINE_RENDER_BYTES = 256 * 1024
+
+
+def wants_compact(request) -> bool:
+    return (
+        request.query_params.get("format") == "compact"
+        or COMPACT_MEDIA_TYPE in request.headers.get("accept", "")
+    )
+
+
+def render(result, compact=False):
+    with stage("serialize"):
+        content = _encode(result, compact)
+        return FastJSONResponse(content, media_type=COMPACT_MEDIA_TYPE if compact else "application/json")
+
+
+async def render_async(result, compact=False):
+    """render() for the event loop: large results are encoded in a thread."""
+    if _array_bytes(result) <= INLINE_RENDER_BYTES:
+        return render(result, compact)
+    return await asyncio.to_thread(render, result, compact)
+
+
+def to_builtin(value):
+    """JSON-ready copy of a result using only Python lists, floats and strings."""
+    value = _encode(value, compact=False)
+    return _builtin(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSON response encoded with orjson when it is installed, which writes NumPy
+    arrays straight from their buffers instead of building Python lists.
+    """
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+        return json.dumps(_builtin(content), allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _encode(value, compact):
+    if isinstance(value, dict):
+        return {key: _encode(item, compact) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_encode(item, compact) for item in value]
+    if isinstance(value, np.ndarray):
+        if np.issubdtype(value.dtype, np.datetime64):
+            days = value.astype("datetime64[D]")
+            if not compact:
+                return np.datetime_as_string(days).tolist()
+            offsets = (days - days[0]).astype("<i4") if len(days) else np.empty(0, "<i4")
+            return {
+                "start": str(days[0]) if len(days) else None,
+                "days": _b64(offsets),
+            }
+        if compact:
+            return _b64(np.ascontiguousarray(value, dtype="<f4"))
+        return np.ascontiguousarray(value)
+    return value
+
+
+def _array_bytes(value):
+    if isinstance(value, dict):
+        return sum(_array_bytes(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(_array_bytes(item) for item in value)
+    return value.nbytes if isinstance(value, np.ndarray) else 0
+
+
+def _b64(array):
+    return base64.b64encode(memoryview(array)).decode("ascii")
+
+
+def _builtin(value):
+    if isinstance(value, dict):
+        return {key: _builtin(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        value = value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_builtin(item) for item in value]
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
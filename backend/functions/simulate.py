@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+import config
+from classes.portfolio import Portfolio
+from functions import contributions
+from functions.contributions import FREQUENCIES
+from functions.metrics import TRADING_DAYS
+
+# Forward projections of a portfolio's dollar value from its historical daily
+# returns. Paths are simulated in chunks of whole (paths x days) arrays:
+#
+#   bootstrap   blocks of `block_size` consecutive historical returns, drawn
+#               with replacement (keeps short-range autocorrelation and fat tails)
+#   parametric  i.i.d. normal daily log returns with the historical mean and std
+#
+# Contributions follow the apply_contributions rules on the simulated future
+# dates. Future trading days are spaced 365.25 / TRADING_DAYS calendar days
+# apart. Only `points` evenly spaced days per path are kept, so memory is
+# bounded by MC_CHUNK_BYTES per chunk plus (paths x points) for the whole run;
+# MC_MAX_YEARS keeps a chunk of a single path within MC_CHUNK_BYTES.
+#
+# A projection runs in three steps so the chunks can be spread over compute
+# jobs (see run_simulation in main.py): plan_projection, simulate_chunks on
+# consecutive runs of its jobs, then summarize_projection.
+#
+# Paths draw their randomness in groups of STREAM_PATHS, each group from its own
+# child of one SeedSequence, one row of draws per path. Chunks hold whole groups
+# or an equal share of one, so a seed gives the same result whatever
+# MC_CHUNK_BYTES is and however the chunks are spread.
+METHODS = ["bootstrap", "parametric"]
+# (dates x paths) 8-byte arrays alive at once while a chunk is simulated, the
+# ones inside apply_contributions included; sizes chunks to MC_CHUNK_BYTES.
+CHUNK_ARRAYS = 4
+# Paths per random stream. Not a power of two: chunk widths that are make the
+# column-wise cumsum over a chunk much slower (cache set conflicts).
+STREAM_PATHS = 100
+
+
+def project_portfolio(portfolio, start_date, end_date, initial, addition, frequency, rebalance="none",
+                      horizon_years=10, paths=2000, method="bootstrap", block_size=21, seed=None,
+                      percentiles=(5, 25, 50, 75, 95), points=120):
+    """
+    Simulates `paths` futures of `horizon_years` for the portfolio whose history
+    is taken from [start_date, end_date]. Returns percentile bands of the dollar
+    value over time and the distribution of the terminal value.
+    """
+    plan, jobs = plan_projection(portfolio, start_date, end_date, initial, addition, frequency, rebalance,
+                                 horizon_years, paths, method, block_size, seed, percentiles, points)
+    return summarize_projection(plan, [simulate_chunks(jobs)])
+
+
+def plan_projection(portfolio, start_date, end_date, initial, addition, frequency, rebalance="none",
+                    horizon_years=10, paths=2000, method="bootstrap", block_size=21, seed=None,
+                    percentiles=(5, 25, 50, 75, 95), points=120):
+    """
+    Validates a projection and splits it into chunks of at most MC_CHUNK_BYTES.
+    Returns (plan, jobs): the plan is what summarize_projection needs besides
+    the simulated values, and every job is one chunk for simulate_chunks.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Method must be one of {METHODS}")
+    if isinstance(frequency, str) and frequency not in FREQUENCIES:
+        raise ValueError(f"Frequency must be one of {FREQUENCIES}")
+    if not 1 <= paths <= config.MC_MAX_PATHS:
+        raise ValueError(f"paths must be between 1 and {config.MC_MAX_PATHS}")
+    if not 0 < horizon_years <= config.MC_MAX_YEARS:
+        raise ValueError(f"horizon_years must be positive and at most {config.MC_MAX_YEARS:g}")
+    if not 2 <= points <= config.MC_MAX_POINTS:
+        raise ValueError(f"points must be between 2 and {config.MC_MAX_POINTS}")
+    if not all(0 <= p <= 100 for p in percentiles):
+        raise ValueError("percentiles must be between 0 and 100")
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+
+    history = Portfolio.get_portfolio(portfolio, start_date, end_date, rebalance)
+    values = np.asarray(history.values, dtype=np.float64)
+    returns = values[1:] / values[:-1] - 1
+    if len(returns) < max(block_size, 2):
+        raise ValueError("Not enough history to sample returns from.")
+
+    days = int(round(horizon_years * TRADING_DAYS))
+    last = history.dates[-1].to_datetime64().astype("datetime64[D]")
+    offsets = np.round(np.arange(days + 1) * 365.25 / TRADING_DAYS).astype(np.int64)
+    dates = last + offsets.astype("timedelta64[D]")
+    schedule = contributions.contribution_schedule(pd.DatetimeIndex(dates), frequency)
+    kept = np.unique(np.linspace(0, days, min(points, days + 1)).round().astype(np.int64))
+
+    seed = int(np.random.SeedSequence().entropy % 2**63) if seed is None else int(seed)
+    chunk = max(1, int(config.MC_CHUNK_BYTES // (8 * CHUNK_ARRAYS * (days + 1))))
+    # A multiple of STREAM_PATHS, or below that the largest divisor of it that fits.
+    if chunk >= STREAM_PATHS:
+        chunk -= chunk % STREAM_PATHS
+    else:
+        chunk = max(d for d in range(1, chunk + 1) if STREAM_PATHS % d == 0)
+    streams = np.random.SeedSequence(seed).spawn(-(-paths // STREAM_PATHS))
+    jobs = []
+    for start in range(0, paths, chunk):
+        group = start // STREAM_PATHS
+        chunk_streams = streams[group:-(-(start + chunk) // STREAM_PATHS)]
+        jobs.append((returns, method, block_size, dates, frequency, initial, addition, kept,
+                     min(chunk, paths - start), chunk_streams, start - group * STREAM_PATHS))
+    plan = {
+        "dates": dates[kept],
+        "contributed": float(initial + addition * schedule[1:].sum()),
+        "percentiles": tuple(percentiles),
+        "paths": paths,
+        "method": method,
+        "seed": seed,
+    }
+    return plan, jobs
+
+
+def simulate_chunks(jobs):
+    """(paths x points) dollar values of consecutive jobs of plan_projection, stacked in order."""
+    return np.vstack([_simulate_chunk(*job) for job in jobs])
+
+
+def summarize_projection(plan, parts):
+    """Percentile bands and terminal distribution from the simulate_chunks results of all of a plan's jobs, in order."""
+    sampled = np.vstack(parts)
+    contributed = plan["contributed"]
+    terminal = sampled[:, -1]
+    counts, edges = np.histogram(terminal, bins=50)
+    q = np.asarray(plan["percentiles"], dtype=np.float64)
+    return {
+        "dates": plan["dates"],
+        "bands": {f"p{p:g}": band for p, band in zip(q, np.percentile(sampled, q, axis=0))},
+        "terminal": {
+            "mean": float(terminal.mean()),
+            "percentiles": {f"p{p:g}": float(v) for p, v in zip(q, np.percentile(terminal, q))},
+            "probabilityBelowContributed": float((terminal < contributed).mean()),
+            "histogram": {"edges": edges, "counts": counts.astype(np.float64)},
+        },
+        "contributed": contributed,
+        "paths": plan["paths"],
+        "method": plan["method"],
+        "seed": plan["seed"],
+    }
+
+
+def _simulate_chunk(returns, method, block_size, dates, frequency, initial, addition, kept, size, streams, skip):
+    """
+    (size x len(kept)) dollar values of `size` simulated paths, drawn from the
+    path groups' `streams` starting `skip` paths into the first group.
+    """
+    days = len(dates) - 1
+    if method == "bootstrap":
+        blocks = -(-days // block_size)
+        count = len(returns) - block_size + 1
+        starts = _draw(streams, skip, np.empty((size, blocks)), lambda rng, out: rng.random(out=out))
+        starts = (starts * count).astype(np.int64)
+        idx = (starts[:, :, None] + np.arange(block_size)).reshape(size, -1)[:, :days]
+        del starts
+        log_growth = np.log1p(returns)[idx]
+        del idx
+    else:
+        log_returns = np.log1p(returns)
+        log_growth = _draw(streams, skip, np.empty((size, days)), lambda rng, out: rng.standard_normal(out=out))
+        log_growth *= log_returns.std(ddof=1)
+        log_growth += log_returns.mean()
+
+    # Growth since today per path (day 0 = 1), laid out dates x paths for
+    # apply_contributions and built in place to keep the chunk's peak memory down.
+    growth = np.empty((days + 1, size))
+    growth[0] = 1
+    np.cumsum(log_growth.T, axis=0, out=growth[1:])
+    del log_growth
+    np.exp(growth[1:], out=growth[1:])
+    dollars, _ = contributions.apply_contributions(growth, dates, initial, addition, frequency)
+    return dollars[kept].T
+
+
+def _draw(streams, skip, out, fill):
+    """
+    Fills `out` with one row of draws for each of its consecutive paths.
+    fill(rng, rows) fills rows with the next draws of a stream; filling in
+    pieces gives the same rows, so the `skip` rows of the first group that
+    belong to earlier chunks are drawn (into `out`) and dropped first.
+    """
+    size, row = len(out), 0
+    for seed in streams:
+        rng = np.random.default_rng(seed)
+        for _ in range(skip // size):
+            fill(rng, out)
+        take = min(size - row, STREAM_PATHS - skip)
+        fill(rng, out[row:row + take])
+        row, skip = row + take, 0
+    return out
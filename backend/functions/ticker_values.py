@@ -1,78 +1,119 @@
 import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-from functions.data import get_info
+from functions.data import get_info, get_range
 import numpy as np
-from datetime import datetime
+from functions.metrics import compute_metrics
+from functions.downsample import downsample_dates
+from functions.trading_calendar import align
+from functions.columnar import to_epoch_days
+from functions.timing import stage
 
 def get_ticker_values(tickers, start_date, end_date):
+    """
+    Loads each ticker once and returns its close normalized to 100 on the first
+    trading day, as a Series indexed by the real trading dates.
+    """
     ticker_values = {}
-    for ticker in tickers:
-        df = get_info(ticker, start_date, end_date, prices=False)
-        
-        series = pd.to_numeric(df["Close"], errors='coerce').dropna()
+    with stage("load"):
+        for ticker in tickers:
+            df = get_info(ticker, start_date, end_date, prices=False)
+
+            series = pd.to_numeric(df["Close"], errors='coerce').dropna()
+
+            normalized = (series / series.iloc[0]) * 100
+            ticker_values[ticker] = normalized
 
-        normalized = (series / series.iloc[0]) * 100
-        ticker_values[ticker] = normalized.tolist()
-    
     return ticker_values
 
-def get_stats(values, start_date, end_date, risk_free_rate=0.02):
+def get_stats(values, risk_free_rate=0.02):
     """
-    Compute portfolio stats from time series of values and a start/end date.
-    Assumes values are equally spaced (daily).
+    Compute stats for a dict of date-indexed value series (as returned by
+    get_ticker_values). All series are placed on their combined trading dates
+    and measured together in one pass of the metrics engine, each on its own
+    trading days.
     """
-    output = {}
-    for ticker, values in values.items():
-        if len(values) < 2:
-            raise ValueError("Not enough data points to compute metrics.")
-
-        start_date = pd.to_datetime(start_date)
-        end_date = pd.to_datetime(end_date)
-
-        # Infer date index assuming daily frequency
-        dates = pd.date_range(start=start_date, end=end_date, periods=len(values))
-        values = pd.Series(values, index=dates)
+    for ticker, series in values.items():
+        if len(series) < 2:
+            raise ValueError(f"Not enough data points to compute metrics for {ticker}.")
 
-        initial = values.iloc[0]
-        ending = values.iloc[-1]
-        total_return = (ending / initial) - 1
+    with stage("align"):
+        days, matrix, observed = align(
+            [(to_epoch_days(series.index.values), series.to_numpy(dtype=float), None) for series in values.values()],
+            "per_ticker",
+            observed=True,
+        )
+    dates = pd.DatetimeIndex(days.astype("datetime64[D]"))
+    with stage("metrics"):
+        m = compute_metrics(matrix, dates, risk_free_rate, observed)
 
-        total_days = (end_date - start_date).days
-        years = total_days / 365.25
-        CAGR = (ending / initial) ** (1 / years) - 1 if years > 0 else np.nan
+    output = {}
+    for i, ticker in enumerate(values):
+        output[ticker] = [
+            round(m["cagr"][i], 4),
+            round(m["volatility"][i], 4),
+            round(m["best_year"][i], 4),
+            round(m["worst_year"][i], 4),
+            round(m["max_drawdown"][i], 4),
+            round(m["sharpe"][i], 4),
+            round(m["sortino"][i], 4)
+        ]
 
-        daily_returns = values.pct_change().dropna()
-        annualized_std = daily_returns.std() * np.sqrt(252)
+    return output
 
-        yearly_returns = values.resample('YE').apply(lambda s: s.iloc[-1] / s.iloc[0] - 1)
-        best_year = yearly_returns.max()
-        worst_year = yearly_returns.min()
+def get_range_stats(tickers, start_date, end_date, risk_free_rate=0.02):
+    """
+    Same stats as get_stats, answered per ticker from its range index over
+    [start_date, end_date] instead of from the loaded series. Each ticker is
+    measured on its own trading days.
+    """
+    output = {}
+    for ticker in tickers:
+        index, lo, hi = _range(ticker, start_date, end_date)
+        with stage("metrics"):
+            output[ticker] = _stats_row(index.stats(lo, hi, risk_free_rate))
+    return output
 
-        running_max = values.cummax()
-        drawdown = (values - running_max) / running_max
-        max_drawdown = drawdown.min()
+def get_ticker_chart(tickers, start_date, end_date, max_points=None):
+    """
+    Single pass behind /ticker_chart: every ticker is read once, from its range
+    index, whose rows give both its values (normalized to 100 on the first
+    trading day) and its stats. Values stay arrays until functions.serialize
+    renders them.
 
-        sharpe_ratio = np.nan if np.isclose(annualized_std, 0) else (CAGR - risk_free_rate) / annualized_std
+    With max_points, each ticker's values are downsampled (LTTB) after the stats
+    are computed, and the dates of the kept points are returned in "tickerDates".
+    """
+    result = {"tickerVals": {}, "tickerStats": {}}
+    dates = {}
+    for ticker in tickers:
+        index, lo, hi = _range(ticker, start_date, end_date)
+        close = np.asarray(index.close[lo:hi + 1])
+        result["tickerVals"][ticker] = close / close[0] * 100
+        dates[ticker] = np.asarray(index.days[lo:hi + 1]).astype("datetime64[D]")
+        with stage("metrics"):
+            result["tickerStats"][ticker] = _stats_row(index.stats(lo, hi))
+    if max_points is not None:
+        result["tickerDates"] = {}
+        for ticker, values in result["tickerVals"].items():
+            idx = downsample_dates(dates[ticker], values, max_points)
+            result["tickerVals"][ticker] = values[idx]
+            result["tickerDates"][ticker] = dates[ticker][idx]
+    return result
 
-        daily_rf = risk_free_rate / 252
-        downside_returns = daily_returns[daily_returns < daily_rf]
-        downside_std = downside_returns.std() * np.sqrt(252)
-        sortino_ratio = np.nan if np.isclose(downside_std, 0) else (CAGR - risk_free_rate) / downside_std
+def _range(ticker, start_date, end_date):
+    with stage("load"):
+        index, lo, hi = get_range(ticker, start_date, end_date)
+    if hi - lo < 1:
+        raise ValueError(f"Not enough data points to compute metrics for {ticker}.")
+    return index, lo, hi
 
-        if sharpe_ratio is not np.nan and sharpe_ratio > 1000:
-            sharpe_ratio = np.nan
-        if sortino_ratio is not np.nan and sortino_ratio > 1000:
-            sortino_ratio = np.nan
-            
-        output[ticker] = [
-        round(CAGR, 4),
-        round(annualized_std, 4),
-        round(best_year, 4),
-        round(worst_year, 4),
-        round(max_drawdown, 4),
-        round(sharpe_ratio, 4),
-        round(sortino_ratio, 4)
+def _stats_row(m):
+    # The stats list of /ticker_chart for one ticker's index.stats result.
+    return [
+        round(m["cagr"], 4),
+        round(m["volatility"], 4),
+        round(m["best_year"], 4),
+        round(m["worst_year"], 4),
+        round(m["max_drawdown"], 4),
+        round(m["sharpe"], 4),
+        round(m["sortino"], 4)
     ]
-
-    return output
\ No newline at end of file
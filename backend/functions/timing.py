@@ -0,0 +1,55 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Per-request stage timers. A request's stages ("load", "align",
+# "contributions", "metrics", "serialize", ...) are summed into the dict held
+# by the `stages` context variable, which the timing middleware in main.py
+# sets for every request and reports as the Server-Timing header and /metrics.
+# Outside a request `stage` only costs a context variable lookup.
+#
+# Computations on the compute pool run in another thread or process, where the
+# request's context is not visible: they are run through `timed`, which
+# collects their stages and returns them alongside the result.
+stages = ContextVar("stages", default=None)
+
+
+@contextmanager
+def stage(name):
+    timings = stages.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+
+
+def record(name, seconds):
+    timings = stages.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def timed(fn, submitted, *args):
+    """
+    Runs fn(*args) with its own stage timers; returns (result, stages). The
+    wall-clock time since `submitted` (time.time() when the job was queued) is
+    reported as the "queue" stage.
+    """
+    timings = {"queue": max(0.0, time.time() - submitted)}
+    token = stages.set(timings)
+    try:
+        return fn(*args), timings
+    finally:
+        stages.reset(token)
+
+
+def server_timing(timings, total=None):
+    """Server-Timing header value: one `name;dur=<ms>` entry per stage."""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
@@ -0,0 +1,157 @@
+import os
+import threading
+import numpy as np
+import config
+from functions.range_index import open_index
+
+# Master trading calendar: the sorted union of every converted ticker's trading
+# days (epoch days), stored as {COLUMNAR_DIR}/calendar.npy by rebuild_calendar
+# (run by convert_data.py and functions.ingest).
+# Each ticker's manifest entry records "offset", the calendar row of its first
+# day, so a ticker that traded every calendar day of its span maps rows lo..hi of
+# its history onto calendar rows offset + lo..offset + hi by plain slicing.
+#
+# Series are aligned on calendar rows into one (dates x tickers) matrix. Days a
+# ticker has no close are handled by one of the POLICIES:
+#
+#   intersection  only days every ticker traded (the portfolio default)
+#   ffill         days any of the tickers traded, from the latest ticker start to
+#                 the earliest ticker end; a ticker missing a day carries its
+#                 previous close forward
+#   per_ticker    every day any of the tickers traded; each column is
+#                 forward-filled within its own span and NaN before its start /
+#                 after its end
+POLICIES = ("intersection", "ffill", "per_ticker")
+CALENDAR_NAME = "calendar.npy"
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def write_calendar(day_arrays, out_dir=None):
+    """Writes the union of the given epoch-day arrays as the master calendar and returns it."""
+    out_dir = out_dir or config.COLUMNAR_DIR
+    calendar = np.unique(np.concatenate([np.asarray(days, dtype=np.int64) for days in day_arrays]))
+    tmp = os.path.join(out_dir, f".tmp-{CALENDAR_NAME}")
+    np.save(tmp, calendar)
+    os.replace(tmp, os.path.join(out_dir, CALENDAR_NAME))
+    return calendar
+
+
+def rebuild_calendar(manifest, out_dir=None):
+    """
+    Rewrites the master calendar from the range indexes of every converted
+    ticker in out_dir and sets the "offset" of their manifest entries. Returns
+    the calendar, or None when no ticker has been converted.
+    """
+    out_dir = out_dir or config.COLUMNAR_DIR
+    indexes = {}
+    for ticker in sorted(os.listdir(out_dir)) if os.path.isdir(out_dir) else []:
+        path = os.path.join(out_dir, ticker)
+        if ticker.startswith(".") or not os.path.isdir(path):
+            continue
+        index = open_index(os.path.realpath(path))
+        if index is not None and len(index.days):
+            indexes[ticker] = index
+    if not indexes:
+        return None
+
+    calendar = write_calendar([index.days for index in indexes.values()], out_dir)
+    for ticker, index in indexes.items():
+        if ticker in manifest:
+            manifest[ticker]["offset"] = int(np.searchsorted(calendar, index.days[0]))
+    return calendar
+
+
+def open_calendar():
+    """The memory-mapped master calendar, or None if none has been written."""
+    global _calendar
+    with _calendar_lock:
+        if _calendar is None:
+            path = os.path.join(config.COLUMNAR_DIR, CALENDAR_NAME)
+            if not os.path.exists(path):
+                return None
+            _calendar = np.load(path, mmap_mode="r")
+        return _calendar
+
+
+def close_calendar():
+    global _calendar
+    with _calendar_lock:
+        _calendar = None
+
+
+def calendar_rows(calendar, days, offset=None):
+    """
+    Calendar rows of an ascending run of trading days, or None if some day is
+    not in the calendar. With the calendar row of days[0] known (offset), a run
+    without gaps is recognized from its last day alone and needs no search.
+    """
+    if len(days) == 0:
+        return np.empty(0, dtype=np.int64)
+    if offset is not None:
+        end = offset + len(days) - 1
+        if end < len(calendar) and calendar[offset] == days[0] and calendar[end] == days[-1]:
+            return np.arange(offset, end + 1)
+    rows = np.searchsorted(calendar, days)
+    if rows[-1] >= len(calendar) or not np.array_equal(calendar[rows], days):
+        return None
+    return rows
+
+
+def align(columns, policy="intersection", calendar=None, observed=False):
+    """
+    Places (days, values, offset) columns side by side. `offset` is the master
+    calendar row of days[0] when known, else None. Uses the master calendar when
+    it covers every column and the union of the columns' days otherwise.
+    Returns (days, matrix) for the rows kept by `policy`; with observed=True,
+    (days, matrix, observed) where observed marks the cells holding a column's
+    own value rather than a forward-filled one.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Alignment policy must be one of {POLICIES}")
+    if not columns:
+        raise ValueError("No series to align.")
+
+    calendar = open_calendar() if calendar is None else calendar
+    rows = None
+    if calendar is not None:
+        rows = [calendar_rows(calendar, days, offset) for days, _, offset in columns]
+        if any(r is None for r in rows):
+            rows = None
+    if rows is None:
+        calendar = np.unique(np.concatenate([np.asarray(days, dtype=np.int64) for days, _, _ in columns]))
+        rows = [np.searchsorted(calendar, days) for days, _, _ in columns]
+
+    # Work on the calendar window spanned by the columns only.
+    first = min(r[0] for r in rows if len(r))
+    last = max(r[-1] for r in rows if len(r))
+    matrix = np.full((last - first + 1, len(columns)), np.nan)
+    for j, ((_, values, _), r) in enumerate(zip(columns, rows)):
+        matrix[r - first, j] = values
+    days = np.asarray(calendar[first:last + 1])
+
+    present = ~np.isnan(matrix)
+    if policy == "intersection":
+        keep = present.all(axis=1)
+        return (days[keep], matrix[keep], present[keep]) if observed else (days[keep], matrix[keep])
+
+    # Calendar days none of these tickers traded are dropped before filling.
+    traded = present.any(axis=1)
+    starts = np.array([r[0] - first for r in rows])
+    ends = np.array([r[-1] - first for r in rows])
+    matrix = _ffill(matrix, starts, ends)
+    if policy == "ffill":
+        traded[:starts.max()] = False
+        traded[ends.min() + 1:] = False
+    return (days[traded], matrix[traded], present[traded]) if observed else (days[traded], matrix[traded])
+
+
+def _ffill(matrix, starts, ends):
+    # Carries each column's last value over the NaN rows inside [start, end].
+    n = len(matrix)
+    row = np.where(np.isnan(matrix), 0, np.arange(n)[:, None])
+    row = np.maximum.accumulate(row, axis=0)
+    filled = np.take_along_axis(matrix, row, axis=0)
+    inside = (np.arange(n)[:, None] >= starts[None, :]) & (np.arange(n)[:, None] <= ends[None, :])
+    return np.where(inside, filled, np.nan)
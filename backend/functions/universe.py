@@ -0,0 +1,45 @@
+# Ticker universes fetched by download_data.py.
+
+sp500_tickers = [
+    "MMM", "AOS", "ABT", "ABBV", "ACN", "ADBE", "AMD", "AES", "AFL", "A", "APD", "ABNB", "AKAM", "ALB", "ARE", "ALGN", "ALLE", "LNT", "ALL", 
+    "GOOGL", "GOOG", "MO", "AMZN", "AMCR", "AEE", "AEP", "AXP", "AIG", "AMT", "AWK", "AMP", "AME", "AMGN", "APH", "ADI", "ANSS", "AON", "APA", 
+    "APO", "AAPL", "AMAT", "APTV", "ACGL", "ADM", "ANET", "AJG", "AIZ", "T", "ATO", "ADSK", "ADP", "AZO", "AVB", "AVY", "AXON", "BKR", "BALL", 
+    "BAC", "BAX", "BDX", "BRK.B", "BBY", "TECH", "BIIB", "BLK", "BX", "BK", "BA", "BKNG", "BSX", "BMY", "AVGO", "BR", "BRO", "BF.B", "BLDR", "BG", 
+    "BXP", "CHRW", "CDNS", "CZR", "CPT", "CPB", "COF", "CAH", "KMX", "CCL", "CARR", "CAT", "CBOE", "CBRE", "CDW", "COR", "CNC", "CNP", "CF", "CRL", 
+    "SCHW", "CHTR", "CVX", "CMG", "CB", "CHD", "CI", "CINF", "CTAS", "CSCO", "C", "CFG", "CLX", "CME", "CMS", "KO", "CTSH", "CL", "CMCSA", "CAG", 
+    "COP", "ED", "STZ", "CEG", "COO", "CPRT", "GLW", "CPAY", "CTVA", "CSGP", "COST", "CTRA", "CRWD", "CCI", "CSX", "CMI", "CVS", "DHR", "DRI", 
+    "DVA", "DAY", "DECK", "DE", "DELL", "DAL", "DVN", "DXCM", "FANG", "DLR", "DFS", "DG", "DLTR", "D", "DPZ", "DASH", "DOV", "DOW", "DHI", "DTE", 
+    "DUK", "DD", "EMN", "ETN", "EBAY", "ECL", "EIX", "EW", "EA", "ELV", "EMR", "ENPH", "ETR", "EOG", "EPAM", "EQT", "EFX", "EQIX", "EQR", "ERIE", 
+    "ESS", "EL", "EG", "EVRG", "ES", "EXC", "EXE", "EXPE", "EXPD", "EXR", "XOM", "FFIV", "FDS", "FICO", "FAST", "FRT", "FDX", "FIS", "FITB", "FSLR", 
+    "FE", "FI", "F", "FTNT", "FTV", "FOXA", "FOX", "BEN", "FCX", "GRMN", "IT", "GE", "GEHC", "GEV", "GEN", "GNRC", "GD", "GIS", "GM", "GPC", "GILD", 
+    "GPN", "GL", "GDDY", "GS", "HAL", "HIG", "HAS", "HCA", "DOC", "HSIC", "HSY", "HES", "HPE", "HLT", "HOLX", "HD", "HON", "HRL", "HST", "HWM", 
+    "HPQ", "HUBB", "HUM", "HBAN", "HII", "IBM", "IEX", "IDXX", "ITW", "INCY", "IR", "PODD", "INTC", "ICE", "IFF", "IP", "IPG", "INTU", "ISRG", "IVZ", 
+    "INVH", "IQV", "IRM", "JBHT", "JBL", "JKHY", "J", "JNJ", "JCI", "JPM", "JNPR", "K", "KVUE", "KDP", "KEY", "KEYS", "KMB", "KIM", "KMI", "KKR", 
+    "KLAC", "KHC", "KR", "LHX", "LH", "LRCX", "LW", "LVS", "LDOS", "LEN", "LII", "LLY", "LIN", "LYV", "LKQ", "LMT", "L", "LOW", "LULU", "LYB", "MTB", 
+    "MPC", "MKTX", "MAR", "MMC", "MLM", "MAS", "MA", "MTCH", "MKC", "MCD", "MCK", "MDT", "MRK", "META", "MET", "MTD", "MGM", "MCHP", "MU", "MSFT", 
+    "MAA", "MRNA", "MHK", "MOH", "TAP", "MDLZ", "MPWR", "MNST", "MCO", "MS", "MOS", "MSI", "MSCI", "NDAQ", "NTAP", "NFLX", "NEM", "NWSA", "NWS", "NEE", 
+    "NKE", "NI", "NDSN", "NSC", "NTRS", "NOC", "NCLH", "NRG", "NUE", "NVDA", "NVR", "NXPI", "ORLY", "OXY", "ODFL", "OMC", "ON", "OKE", "ORCL", "OTIS", 
+    "PCAR", "PKG", "PLTR", "PANW", "PARA", "PH", "PAYX", "PAYC", "PYPL", "PNR", "PEP", "PFE", "PCG", "PM", "PSX", "PNW", "PNC", "POOL", "PPG", "PPL", 
+    "PFG", "PG", "PGR", "PLD", "PRU", "PEG", "PTC", "PSA", "PHM", "PWR", "QCOM", "DGX", "RL", "RJF", "RTX", "O", "REG", "REGN", "RF", "RSG", "RMD", 
+    "RVTY", "ROK", "ROL", "ROP", "ROST", "RCL", "SPGI", "CRM", "SBAC", "SLB", "STX", "SRE", "NOW", "SHW", "SPG", "SWKS", "SJM", "SW", "SNA", "SOLV", 
+    "SO", "LUV", "SWK", "SBUX", "STT", "STLD", "STE", "SYK", "SMCI", "SYF", "SNPS", "SYY", "TMUS", "TROW", "TTWO", "TPR", "TRGP", "TGT", "TEL", 
+    "TDY", "TER", "TSLA", "TXN", "TPL", "TXT", "TMO", "TJX", "TKO", "TSCO", "TT", "TDG", "TRV", "TRMB", "TFC", "TYL", "TSN", "USB", "UBER", "UDR", 
+    "ULTA", "UNP", "UAL", "UPS", "URI", "UNH", "UHS", "VLO", "VTR", "VLTO", "VRSN", "VRSK", "VZ", "VRTX", "VTRS", "VICI", "V", "VST", "VMC", "WRB", 
+    "GWW", "WAB", "WBA", "WMT", "DIS", "WBD", "WM", "WAT", "WEC", "WFC", "WELL", "WST", "WDC", "WY", "WSM", "WMB", "WTW", "WDAY", "WYNN", "XEL", 
+    "XYL", "YUM", "ZBRA", "ZBH", "ZTS"
+]
+
+extra_tickers = [
+    "SPY", "VOO", "IVV", "SPLG", "DIA", "ONEQ", "QQQ", "QQQM", "IWM", "VTWO",
+    "VTI", "SPTM", "VEA", "VUG", "VTV", "BND", "AGG", "IEFA", "GLD", "IWF",
+    "IJH", "VIG", "VXUS", "IEMG", "VWO", "IJR", "VGT", "VO", "RSP", "SCHD",
+    "BNDX", "XLK", "IWD", "ITOT", "VYM", "VCIT", "TLT", "XLF", "IVW", "SCHX",
+    "IBIT", "QUAL", "BIL", "SCHF", "IAU", "VT", "SGOV", "MUB", "VEU", "IXUS",
+    "JEPI", "XLV", "VV", "MBB", "IWR", "VTEB", "IVE", "IEF", "IWB", "BSV",
+    "VCSH", "VNQ", "SCHG", "IUSB", "VGIT", "JPST", "LQD", "XLE", "DFAC", "SCHB"
+]
+
+
+new_tickers = ['A', 'AA', 'AAL', 'AAON', 'AAPL', 'AB', 'ABBV', 'ABCB', 'ABG', 'ABM', 'ABNB', 'ABT', 'ACA', 'ACAD', 'ACHC', 'ACHR', 'ACI', 'ACIW', 'ACLX', 'ACM', 'ACT', 'ADBE', 'ADC', 'ADI', 'ADM', 'ADMA', 'ADP', 'ADSK', 'ADT', 'AEE', 'AEIS', 'AEP', 'AES', 'AFG', 'AFL', 'AFRM', 'AGCO', 'AGNC', 'AGNCL', 'AGNCM', 'AGNCN', 'AGNCO', 'AGNCP', 'AHR', 'AI', 'AIG', 'AIT', 'AIZ', 'AJG', 'AKAM', 'AKR', 'AKRO', 'AL', 'ALAB', 'ALB', 'ALE', 'ALGM', 'ALGN', 'ALHC', 'ALIT', 'ALK', 'ALKT', 'ALL', 'ALLE', 'ALLY', 'ALNY', 'ALRM', 'ALSN', 'AM', 'AMAT', 'AMD', 'AME', 'AMED', 'AMG', 'AMGN', 'AMH', 'AMKR', 'AMP', 'AMRX', 'AMT', 'AMTM', 'AMZN', 'AN', 'ANET', 'ANF', 'ANSS', 'AON', 'AOS', 'APA', 'APAM', 'APD', 'APG', 'APH', 'APLE', 'APLS', 'APO', 'APOS', 'APP', 'APPF', 'AQN', 'AQNB', 'AR', 'ARCC', 'ARE', 'ARES', 'ARLP', 'ARMK', 'AROC', 'ARW', 'ASAN', 'ASB', 'ASBA', 'ASGN', 'ASH', 'ASO', 'ASTS', 'ATGE', 'ATI', 'ATMU', 'ATO', 'ATR', 'AUB', 'AUR', 'AVA', 'AVAV', 'AVB', 'AVGO', 'AVNT', 'AVPT', 'AVT', 'AVTR', 'AVY', 'AWI', 'AWK', 'AWR', 'AX', 'AXON', 'AXP', 'AXSM', 'AXTA', 'AYI', 'AZEK', 'AZO', 'AZZ', 'BA', 'BAC', 'BAH', 'BALL', 'BANF', 'BATRA', 'BATRK', 'BAX', 'BBIO', 'BBWI', 'BBY', 'BC', 'BCC', 'BCO', 'BCPC', 'BDC', 'BDX', 'BE', 'BECN', 'BEN', 'BEPC', 'BERY', 'BFAM', 'BFH', 'BG', 'BGC', 'BHF', 'BIIB', 'BILL', 'BIO', 'BJ', 'BK', 'BKH', 'BKNG', 'BKR', 'BKU', 'BL', 'BLD', 'BLDR', 'BLK', 'BLKB', 'BMI', 'BMRN', 'BMY', 'BNL', 'BOH', 'BOKF', 'BOOT', 'BOX', 'BPMC', 'BPOP', 'BR', 'BRBR', 'BRC', 'BRK/A', 'BRK/B', 'BRKR', 'BRO', 'BROS', 'BRX', 'BRZE', 'BSM', 'BSX', 'BSY', 'BTSG', 'BTSGU', 'BURL', 'BWA', 'BWIN', 'BWXT', 'BX', 'BXMT', 'BXP', 'BYD', 'C', 'CACC', 'CACI', 'CADE', 'CAG', 'CAH', 'CAKE', 'CALM', 'CALX', 'CAR', 'CARG', 'CARR', 'CART', 'CASY', 'CAT', 'CATY', 'CAVA', 'CBRE', 'CBSH', 'CBT', 'CBU', 'CBZ', 'CCCS', 'CCI', 'CCK', 'CCL', 'CCOI', 'CCZ', 'CDE', 'CDNS', 'CDP', 'CDW', 'CE', 'CEG', 'CELH', 'CENT', 'CENTA', 'CF', 'CFG', 'CFLT', 'CFR', 'CG', 'CGABL', 'CGNX', 'CHD', 'CHDN', 'CHE', 'CHH', 'CHRD', 'CHRW', 'CHTR', 'CHWY', 'CHX', 'CI', 'CIEN', 'CII', 'CINF', 'CIVI', 'CL', 'CLF', 'CLH', 'CLSK', 'CLX', 'CMA', 'CMC', 'CMCSA', 'CME', 'CMG', 'CMI', 'CMS', 'CMSA', 'CMSC', 'CMSD', 'CNA', 'CNC', 'CNK', 'CNM', 'CNO', 'CNP', 'CNR', 'CNS', 'CNX', 'CNXC', 'COF', 'COHR', 'COIN', 'COKE', 'COLB', 'COLD', 'COLM', 'COMP', 'CON', 'COO', 'COOP', 'COP', 'COR', 'CORT', 'CORZ', 'CORZZ', 'COST', 'COTY', 'CPAY', 'CPB', 'CPK', 'CPNG', 'CPRT', 'CPRX', 'CPT', 'CQP', 'CR', 'CRBG', 'CRC', 'CRDO', 'CRGY', 'CRK', 'CRL', 'CRM', 'CRNX', 'CROX', 'CRS', 'CRUS', 'CRVL', 'CRWD', 'CRWV', 'CSCO', 'CSGP', 'CSL', 'CSQ', 'CSWI', 'CSX', 'CTAS', 'CTRA', 'CTRE', 'CTSH', 'CTVA', 'CUBE', 'CUK', 'CURB', 'CUZ', 'CVBF', 'CVCO', 'CVLT', 'CVNA', 'CVS', 'CVX', 'CW', 'CWAN', 'CWEN', 'CWST', 'CWT', 'CXT', 'CXW', 'CYTK', 'CZR', 'D', 'DAL', 'DAR', 'DASH', 'DAY', 'DBX', 'DCI', 'DD', 'DDOG', 'DDS', 'DE', 'DECK', 'DEI', 'DELL', 'DFH', 'DFS', 'DG', 'DGX', 'DHCNI', 'DHCNL', 'DHI', 'DHR', 'DINO', 'DIS', 'DJT', 'DJTWW', 'DKL', 'DKNG', 'DKS', 'DLB', 'DLR', 'DLTR', 'DNB', 'DOC', 'DOCN', 'DOCS', 'DOCU', 'DORM', 'DOV', 'DOW', 'DPZ', 'DRI', 'DRVN', 'DT', 'DTB', 'DTE', 'DTG', 'DTM', 'DTW', 'DUK', 'DUKB', 'DUOL', 'DVA', 'DVN', 'DXC', 'DXCM', 'DY', 'EA', 'EAI', 'EAT', 'EBAY', 'EBC', 'ECCF', 'ECL', 'ED', 'EE', 'EEFT', 'EFX', 'EGP', 'EHC', 'EIX', 'EL', 'ELAN', 'ELC', 'ELF', 'ELS', 'ELV', 'EME', 'EMN', 'EMP', 'EMR', 'ENJ', 'ENO', 'ENPH', 'ENS', 'ENSG', 'ENTG', 'ENVA', 'EOG', 'EPAC', 'EPAM', 'EPD', 'EPR', 'EPRT', 'EQH', 'EQIX', 'EQR', 'EQT', 'ERIE', 'ES', 'ESAB', 'ESE', 'ESI', 'ESS', 'ESTC', 'ET', 'ETR', 'ETSY', 'EVR', 'EVRG', 'EW', 'EWBC', 'EXAS', 'EXC', 'EXE', 'EXEEL', 'EXEEZ', 'EXEL', 'EXLS', 'EXP', 'EXPD', 'EXPE', 'EXPO', 'EXR', 'F', 'FA', 'FAF', 'FANG', 'FAST', 'FBIN', 'FCFS', 'FCN', 'FCNCA', 'FCPT', 'FCX', 'FDX', 'FE', 'FELE', 'FFBC', 'FFIN', 'FFIV', 'FG', 'FGN', 'FHB', 'FHI', 'FHN', 'FI', 'FIBK', 'FICO', 'FINV', 'FIS', 'FITB', 'FITBI', 'FITBO', 'FITBP', 'FIVE', 'FIX', 'FIZZ', 'FLG', 'FLO', 'FLR', 'FLS', 'FMC', 'FNB', 'FND', 'FNF', 'FOLD', 'FOUR', 'FOX', 'FOXA', 'FR', 'FRME', 'FROG', 'FRPT', 'FRSH', 'FRT', 'FSK', 'FSLR', 'FSS', 'FTAI', 'FTAIM', 'FTAIN', 'FTDR', 'FTNT', 'FTS', 'FTV', 'FUL', 'FULT', 'FULTP', 'FUN', 'FWONA', 'FWONK', 'FYBR', 'GAP', 'GATX', 'GBCI', 'GBDC', 'GBTG', 'GCMG', 'GD', 'GDDY', 'GE', 'GEF', 'GEHC', 'GEN', 'GEO', 'GEV', 'GFF', 'GFS', 'GGG', 'GH', 'GHC', 'GILD', 'GIS', 'GJS', 'GKOS', 'GL', 'GLOB', 'GLPI', 'GLW', 'GM', 'GME', 'GMED', 'GMS', 'GNRC', 'GNTX', 'GNW', 'GOLF', 'GOOG', 'GOOGL', 'GPC', 'GPI', 'GPK', 'GPN', 'GPOR', 'GRBK', 'GS', 'GSAT', 'GSHD', 'GT', 'GTLB', 'GTLS', 'GVA', 'GWRE', 'GWW', 'GXO', 'H', 'HAE', 'HAL', 'HALO', 'HAS', 'HASI', 'HAYW', 'HBAN', 'HBANL', 'HBANM', 'HBANP', 'HCA', 'HCC', 'HCXY', 'HD', 'HEES', 'HEI', 'HES', 'HESM', 'HGTY', 'HGV', 'HHH', 'HIG', 'HII', 'HIMS', 'HIW', 'HL', 'HLI', 'HLNE', 'HLT', 'HOG', 'HOLX', 'HOMB', 'HON', 'HOOD', 'HPE', 'HPQ', 'HQY', 'HR', 'HRB', 'HRI', 'HRL', 'HSIC', 'HST', 'HSY', 'HTGC', 'HUBB', 'HUBG', 'HUBS', 'HUM', 'HUN', 'HURN', 'HWC', 'HWCPZ', 'HWKN', 'HWM', 'HXL', 'IAC', 'IBKR', 'IBM', 'IBOC', 'IBP', 'IBRX', 'ICE', 'ICUI', 'IDA', 'IDCC', 'IDXX', 'IEP', 'IESC', 'IEX', 'IFF', 'IGT', 'ILMN', 'IMVT', 'INCY', 'INDB', 'INFA', 'INGM', 'INGR', 'INSM', 'INSP', 'INTA', 'INTC', 'INTU', 'INVH', 'IONQ', 'IONS', 'IOSP', 'IOT', 'IP', 'IPAR', 'IPG', 'IPGP', 'IQV', 'IR', 'IRDM', 'IRM', 'IRT', 'IRTC', 'ISRG', 'IT', 'ITGR', 'ITRI', 'ITT', 'ITW', 'IVT', 'IVZ', 'J', 'JBHT', 'JBL', 'JBTM', 'JEF', 'JJSF', 'JKHY', 'JLL', 'JNJ', 'JNPR', 'JOBY', 'JOE', 'JPM', 'JWN', 'JXN', 'K', 'KAI', 'KBH', 'KBR', 'KD', 'KDP', 'KEX', 'KEY', 'KEYS', 'KFY', 'KGS', 'KHC', 'KIM', 'KKR', 'KKRS', 'KLAC', 'KMB', 'KMI', 'KMPR', 'KMX', 'KNF', 'KNSL', 'KNTK', 'KNX', 'KO', 'KR', 'KRC', 'KRG', 'KRYS', 'KTB', 'KTOS', 'KVUE', 'KVYO', 'L', 'LAD', 'LAMR', 'LANC', 'LAUR', 'LBRDA', 'LBRDK', 'LBRDP', 'LCID', 'LCII', 'LDOS', 'LEA', 'LECO', 'LEGN', 'LEN', 'LEVI', 'LFST', 'LFUS', 'LH', 'LHX', 'LIF', 'LII', 'LIN', 'LINE', 'LITE', 'LKQ', 'LLY', 'LLYVA', 'LLYVK', 'LMND', 'LMT', 'LNC', 'LNG', 'LNT', 'LNTH', 'LNW', 'LOAR', 'LOGI', 'LOPE', 'LOW', 'LPLA', 'LPX', 'LRCX', 'LRN', 'LSCC', 'LSTR', 'LTH', 'LUMN', 'LUV', 'LVS', 'LW', 'LXP', 'LYFT', 'LYV', 'M', 'MA', 'MAA', 'MAC', 'MAIN', 'MAN', 'MANH', 'MAR', 'MARA', 'MAS', 'MASI', 'MAT', 'MATX', 'MC', 'MCD', 'MCHP', 'MCHPP', 'MCK', 'MCO', 'MCW', 'MCY', 'MDB', 'MDGL', 'MDLZ', 'MDT', 'MDU', 'MEDP', 'MET', 'META', 'MFAN', 'MFAO', 'MFICL', 'MGEE', 'MGM', 'MGRC', 'MGY', 'MHK', 'MHO', 'MIDD', 'MIR', 'MIRM', 'MKC', 'MKL', 'MKSI', 'MKTX', 'MLI', 'MLM', 'MLTX', 'MMC', 'MMM', 'MMS', 'MMSI', 'MNST', 'MO', 'MOD', 'MOH', 'MORN', 'MOS', 'MP', 'MPC', 'MPLX', 'MPW', 'MPWR', 'MRCY', 'MRK', 'MRNA', 'MRP', 'MRVL', 'MS', 'MSA', 'MSCI', 'MSFT', 'MSGS', 'MSI', 'MSM', 'MSTR', 'MTB', 'MTCH', 'MTDR', 'MTG', 'MTH', 'MTN', 'MTSI', 'MTZ', 'MU', 'MUR', 'MUSA', 'MWA', 'NAN', 'NBIX', 'NCLH', 'NCNO', 'NDAQ', 'NDSN', 'NE', 'NEE', 'NEM', 'NET', 'NEU', 'NFG', 'NFLX', 'NHI', 'NI', 'NIO', 'NJR', 'NKE', 'NLY', 'NMFCZ', 'NMIH', 'NNI', 'NNN', 'NOC', 'NOG', 'NOV', 'NOVT', 'NOW', 'NPO', 'NRG', 'NSA', 'NSC', 'NSIT', 'NSP', 'NTAP', 'NTNX', 'NTRA', 'NTRS', 'NTRSO', 'NUE', 'NUVL', 'NVDA', 'NVR', 'NVST', 'NWE', 'NWL', 'NWS', 'NWSA', 'NXST', 'NXT', 'NYMTI', 'NYMTM', 'NYT', 'O', 'OC', 'ODFL', 'OGE', 'OGN', 'OGS', 'OHI', 'OKE', 'OKLO', 'OKTA', 'OLED', 'OLLI', 'OLN', 'OMC', 'OMF', 'ON', 'ONB', 'ONBPO', 'ONBPP', 'ONTO', 'OPCH', 'ORA', 'ORCL', 'ORI', 'ORLY', 'OS', 'OSCR', 'OSIS', 'OSK', 'OTIS', 'OTTR', 'OUT', 'OWL', 'OXLCL', 'OXLCN', 'OXLCO', 'OXLCP', 'OXLCZ', 'OXY', 'OZK', 'PAA', 'PAG', 'PAGP', 'PANW', 'PAR', 'PARA', 'PARAA', 'PATH', 'PATK', 'PAY', 'PAYC', 'PAYO', 'PAYX', 'PB', 'PBH', 'PCAR', 'PCG', 'PCH', 'PCOR', 'PCTY', 'PCVX', 'PDCO', 'PDI', 'PECO', 'PEG', 'PEGA', 'PEN', 'PENN', 'PEP', 'PFE', 'PFG', 'PFGC', 'PFH', 'PFSI', 'PG', 'PGR', 'PH', 'PHM', 'PINS', 'PIPR', 'PJT', 'PKG', 'PLD', 'PLMR', 'PLNT', 'PLTR', 'PLXS', 'PM', 'PMTU', 'PNC', 'PNFP', 'PNW', 'PODD', 'POOL', 'POR', 'POST', 'POWI', 'POWL', 'POWWP', 'PPC', 'PPG', 'PPL', 'PR', 'PRCT', 'PRGO', 'PRGS', 'PRH', 'PRI', 'PRIM', 'PRKS', 'PRMB', 'PRS', 'PRU', 'PRVA', 'PSA', 'PSMT', 'PSN', 'PSTG', 'PSX', 'PTC', 'PTCT', 'PTEN', 'PTGX', 'PTON', 'PVH', 'PWR', 'PYCR', 'PYPL', 'QCOM', 'QLYS', 'QRVO', 'QS', 'QTWO', 'QVCGB', 'QVCGP', 'QXO', 'R', 'RARE', 'RBC', 'RBLX', 'RBRK', 'RCB', 'RCC', 'RCL', 'RDDT', 'RDN', 'RDNT', 'REG', 'REGCO', 'REGCP', 'REGN', 'RELY', 'REXR', 'REYN', 'REZI', 'RF', 'RGA', 'RGEN', 'RGLD', 'RGTI', 'RH', 'RHI', 'RHP', 'RIOT', 'RITM', 'RIVN', 'RJF', 'RKLB', 'RKT', 'RL', 'RLI', 'RMBS', 'RMD', 'RNA', 'RNG', 'ROAD', 'ROK', 'ROKU', 'ROL', 'ROP', 'ROST', 'RPM', 'RPRX', 'RRC', 'RRR', 'RRX', 'RS', 'RSG', 'RSI', 'RTO', 'RTX', 'RUM', 'RUSHA', 'RUSHB', 'RVMD', 'RVTY', 'RWTN', 'RWTO', 'RXO', 'RYAN', 'RYN', 'RYTM', 'S', 'SAIA', 'SAIC', 'SAIL', 'SAM', 'SANM', 'SARO', 'SATS', 'SBAC', 'SBRA', 'SBUX', 'SCCO', 'SCHW', 'SCI', 'SE', 'SEE', 'SEIC', 'SEM', 'SF', 'SFB', 'SFBS', 'SFD', 'SFM', 'SFNC', 'SG', 'SGI', 'SGRY', 'SHAK', 'SHC', 'SHW', 'SIGI', 'SIRI', 'SITE', 'SITM', 'SJM', 'SKT', 'SKX', 'SKY', 'SKYW', 'SLAB', 'SLG', 'SLGN', 'SLM', 'SLMBP', 'SLNO', 'SLVM', 'SM', 'SMCI', 'SMG', 'SMPL', 'SMR', 'SMTC', 'SN', 'SNA', 'SNAP', 'SNDK', 'SNDR', 'SNEX', 'SNOW', 'SNPS', 'SNV', 'SNX', 'SO', 'SOFI', 'SOJC', 'SOJD', 'SOJE', 'SOLV', 'SON', 'SOUN', 'SPG', 'SPGI', 'SPR', 'SPSC', 'SPXC', 'SR', 'SRE', 'SREA', 'SRPT', 'SRRK', 'SSB', 'SSD', 'SSNC', 'STAG', 'STE', 'STEP', 'STLD', 'STR', 'STRF', 'STRK', 'STRL', 'STT', 'STWD', 'STZ', 'SUI', 'SUN', 'SWI', 'SWK', 'SWKS', 'SWTX', 'SWX', 'SXT', 'SYF', 'SYK', 'SYM', 'SYY', 'T', 'TBB', 'TCBI', 'TDG', 'TDS', 'TDY', 'TECH', 'TEM', 'TENB', 'TER', 'TEX', 'TFC', 'TFSL', 'TFX', 'TGNA', 'TGT', 'TGTX', 'THC', 'THG', 'THO', 'TJX', 'TKO', 'TKR', 'TLN', 'TMDX', 'TME', 'TMHC', 'TMO', 'TMUS', 'TNET', 'TNL', 'TOL', 'TOST', 'TOWN', 'TPG', 'TPGXL', 'TPH', 'TPL', 'TPR', 'TR', 'TREX', 'TRGP', 'TRI', 'TRMB', 'TRN', 'TRNO', 'TROW', 'TRU', 'TRV', 'TSCO', 'TSLA', 'TSN', 'TTAN', 'TTC', 'TTD', 'TTEK', 'TTWO', 'TW', 'TWLO', 'TWST', 'TXN', 'TXNM', 'TXRH', 'TXT', 'TYL', 'U', 'UA', 'UAA', 'UAL', 'UBER', 'UBSI', 'UCB', 'UDR', 'UE', 'UFPI', 'UGI', 'UHAL', 'UHS', 'UI', 'ULS', 'ULTA', 'UMBF', 'UNF', 'UNH', 'UNM', 'UNMA', 'UNP', 'UPS', 'UPST', 'URBN', 'URI', 'USAC', 'USB', 'USFD', 'USLM', 'USM', 'UTHR', 'UWMC', 'V', 'VAL', 'VCTR', 'VCYT', 'VEEV', 'VERX', 'VFC', 'VIAV', 'VICI', 'VIK', 'VIRT', 'VKTX', 'VLO', 'VLTO', 'VLY', 'VLYPN', 'VLYPO', 'VLYPP', 'VMC', 'VMI', 'VNO', 'VNOM', 'VNT', 'VOYA', 'VRNS', 'VRRM', 'VRSK', 'VRSN', 'VRT', 'VRTX', 'VSEC', 'VST', 'VTR', 'VTRS', 'VVV', 'W', 'WAB', 'WAFD', 'WAL', 'WAT', 'WAY', 'WBA', 'WBD', 'WBS', 'WCC', 'WD', 'WDAY', 'WDC', 'WDFC', 'WEC', 'WELL', 'WEN', 'WES', 'WEX', 'WFC', 'WFRD', 'WGS', 'WH', 'WHD', 'WHR', 'WING', 'WK', 'WLK', 'WLY', 'WLYB', 'WM', 'WMB', 'WMG', 'WMK', 'WMS', 'WMT', 'WOR', 'WPC', 'WRB', 'WSC', 'WSFS', 'WSM', 'WSO', 'WST', 'WTFC', 'WTM', 'WTRG', 'WTS', 'WU', 'WWD', 'WY', 'WYNN', 'X', 'XEL', 'XOM', 'XPO', 'XRAY', 'XYL', 'XYZ', 'YELP', 'YETI', 'YOU', 'YUM', 'YUMC', 'Z', 'ZBH', 'ZBRA', 'ZETA', 'ZG', 'ZI', 'ZION', 'ZIONP', 'ZM', 'ZS', 'ZTS', 'ZWS']
+
+new_tickers_clean = [ticker for ticker in new_tickers if ticker not in sp500_tickers]
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+
+
+def xirr(cashflows, dates, guess=0.1, tol=1e-6, max_iter=100):
+    """
+    Annual internal rate of return of a single cash-flow vector dated by `dates`
+    (negative = money in, positive = money out). Returns NaN if no rate solves it.
+    """
+    return float(xirr_batch(np.asarray(cashflows, dtype=np.float64)[None, :], dates, guess, tol, max_iter)[0])
+
+
+def xirr_batch(cashflows, dates, guess=0.1, tol=1e-6, max_iter=100):
+    """
+    Solves XIRR for every row of a (k, n) cash-flow matrix sharing the same n dates.
+
+    Only dates with a non-zero flow in some row take part. Rows are solved together
+    with Newton's method using the analytic derivative; rows where Newton fails to
+    converge or leaves the domain (rate <= -100%) are finished by bisection on a
+    bracketing interval.
+    """
+    cashflows = np.atleast_2d(np.asarray(cashflows, dtype=np.float64))
+    dates = pd.DatetimeIndex(dates)
+
+    keep = np.any(cashflows != 0, axis=0)
+    cf = cashflows[:, keep]
+    t = (dates.values[keep] - dates.values[0]) / np.timedelta64(1, "D") / 365.25
+
+    k = cf.shape[0]
+    rates = np.full(k, np.nan)
+    if cf.shape[1] == 0:
+        return rates
+
+    r = np.full(k, float(guess))
+    active = np.ones(k, dtype=bool)
+    with np.errstate(all="ignore"):
+        for _ in range(max_iter):
+            if not active.any():
+                break
+            ra = r[active]
+            disc = (1 + ra)[:, None] ** -t
+            npv = (cf[active] * disc).sum(axis=1)
+            derivative = (-t * cf[active] * disc).sum(axis=1) / (1 + ra)
+            new_r = ra - npv / derivative
+
+            bad = ~np.isfinite(new_r) | (new_r <= -1)
+            done = ~bad & (np.abs(new_r - ra) < tol)
+
+            idx = np.flatnonzero(active)
+            rates[idx[done]] = new_r[done]
+            r[idx] = new_r
+            active[idx[bad | done]] = False
+
+    unsolved = np.isnan(rates)
+    if unsolved.any():
+        rates[unsolved] = _bisect(cf[unsolved], t, tol)
+    return rates
+
+
+def _npv(rates, cf, t):
+    with np.errstate(all="ignore"):
+        return (cf * (1 + rates)[:, None] ** -t).sum(axis=1)
+
+
+def _bisect(cf, t, tol):
+    k = cf.shape[0]
+    lo = np.full(k, -0.9999)
+    f_lo = _npv(lo, cf, t)
+
+    # Widen the upper end until the NPV changes sign.
+    hi = np.full(k, np.nan)
+    for candidate in (1.0, 10.0, 100.0, 1000.0):
+        open_rows = np.isnan(hi)
+        if not open_rows.any():
+            break
+        f = _npv(np.full(k, candidate), cf, t)
+        found = open_rows & (np.sign(f) != np.sign(f_lo)) & np.isfinite(f)
+        hi[found] = candidate
+
+    rates = np.full(k, np.nan)
+    ok = ~np.isnan(hi) & np.isfinite(f_lo)
+    if not ok.any():
+        return rates
+
+    lo, hi, f_lo = lo[ok], hi[ok], f_lo[ok]
+    cf = cf[ok]
+    while np.max(hi - lo) > tol:
+        mid = (lo + hi) / 2
+        f_mid = _npv(mid, cf, t)
+        same = np.sign(f_mid) == np.sign(f_lo)
+        lo = np.where(same, mid, lo)
+        f_lo = np.where(same, f_mid, f_lo)
+        hi = np.where(same, hi, mid)
+
+    rates[ok] = (lo + hi) / 2
+    return rates
@@ -1,13 +1,115 @@
-from fastapi import FastAPI
-from matplotlib import ticker
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict
-from classes.portfolio import Portfolio
-from functions.ticker_values import get_ticker_values, get_stats
+from starlette.exceptions import HTTPException
+from typing import Dict, Optional, Union
+from functions import compute
+from functions.serialize import render, render_async, wants_compact
+from functions.data import price_store, index_store, data_version, ticker_universe, check_tickers, common_range, search_tickers
+from classes.compute_pool import ComputePool, ComputeSaturated, ComputeTimeout
+from classes.result_cache import ResultCache
+from classes.single_flight import SingleFlight
+from classes.telemetry import Telemetry
+from classes.request_telemetry import RequestTelemetry
+from classes.sampling_profiler import SamplingProfiler
+from functions.log import configure_logging
+from functions.timing import timed, record
+import config
+import pandas as pd
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List
+import asyncio
+import logging
+import time
 
-app = FastAPI()
+configure_logging()
+logger = logging.getLogger(__name__)
+
+compute_pool = ComputePool(
+    config.COMPUTE_WORKERS,
+    config.COMPUTE_MAX_PENDING,
+    config.COMPUTE_TIMEOUT,
+    initializer=compute.init_worker,
+    initargs=(config.PRELOAD_TICKERS,),
+)
+
+# Set once the startup warm-up has finished; reported by /ready.
+ready = False
+
+async def warm_up():
+    """Warms every compute worker (each runs compute.warm_up once) and the serializer."""
+    global ready
+    started = time.perf_counter()
+    try:
+        # Submitted together so a process pool starts all of its workers.
+        results = await asyncio.gather(*(
+            compute_pool.run(compute.warm_up, config.PRELOAD_TICKERS) for _ in range(max(1, config.COMPUTE_WORKERS))
+        ))
+        for result in results:
+            if result is not None:
+                render(result)
+                render(result, compact=True)
+        logger.info("Warm-up finished in %.2fs", time.perf_counter() - started)
+    except Exception as e:
+        logger.warning("Warm-up failed, serving cold: %s", e)
+    ready = True
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global ready
+    ticker_universe()
+    compute_pool.start()
+    # Requests are served while warming up; /ready tells load balancers when to send them.
+    warming = asyncio.create_task(warm_up()) if config.WARMUP else None
+    ready = not config.WARMUP
+    yield
+    if warming is not None:
+        warming.cancel()
+    compute_pool.shutdown()
+
+class ApiRoute(APIRoute):
+    """
+    Answers every endpoint's errors in one place: a saturated compute pool with
+    503 and Retry-After, a computation timeout with 504, and any other error
+    with {"error": message}. HTTP and request validation errors keep FastAPI's
+    own responses. (A FastAPI exception handler for Exception would run in
+    Starlette's server-error middleware, which re-raises after responding.)
+    """
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def handle(request):
+            try:
+                return await handler(request)
+            except (HTTPException, RequestValidationError):
+                raise
+            except ComputeSaturated as e:
+                return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "1"})
+            except ComputeTimeout as e:
+                return JSONResponse({"error": str(e)}, status_code=504)
+            except Exception as e:
+                return JSONResponse({"error": str(e)})
+
+        return handle
+
+app = FastAPI(lifespan=lifespan)
+app.router.route_class = ApiRoute
+
+# Keyed on the canonicalized request; see PortfolioRequest/TickerChartRequest.cache_key.
+result_cache = ResultCache(
+    config.RESULT_CACHE_MAX_BYTES,
+    config.RESULT_CACHE_TTL,
+    config.RESULT_CACHE_DIR,
+    version=data_version,
+)
+
+# Concurrent requests with the same cache key wait on one in-flight computation.
+flights = SingleFlight()
 
 app.add_middleware(
     CORSMiddleware,
@@ -16,6 +118,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Outermost: times whole requests (Server-Timing header, /metrics, slow request log).
+telemetry = Telemetry()
+app.add_middleware(
+    RequestTelemetry,
+    telemetry=telemetry,
+    server_timing=config.SERVER_TIMING,
+    slow_seconds=config.SLOW_REQUEST_SECONDS,
+    profiler=SamplingProfiler(config.PROFILE_INTERVAL) if config.PROFILE_DIR else None,
+    profile_dir=config.PROFILE_DIR,
+)
+
+def canonical_date(value: str) -> str:
+    # Parsed exactly as functions.data parses request dates, so two dates share
+    # a key only when they select the same trading day.
+    return pd.to_datetime(value, utc=True).tz_convert(None).normalize().strftime("%Y-%m-%d")
 
 class PortfolioRequest(BaseModel):
     portfolio: Dict[str, float]
@@ -23,40 +142,367 @@ class PortfolioRequest(BaseModel):
     end_date: str    # format: YYYY-MM-DD
     initial: float
     addition: float
-    frequency: str  # "weekly", "monthly", or "yearly"
+    frequency: Union[str, List[str]]  # "weekly", "biweekly", "monthly", "quarterly", "yearly", or a list of YYYY-MM-DD dates
+    max_points: Optional[int] = None  # downsample chart series to at most this many points
+    rebalance: str = "none"  # "none", "monthly", "quarterly", "yearly" or "threshold"
+    rebalance_band: float = 0.05  # threshold mode: max absolute drift of any weight
+
+    def cache_key(self):
+        frequency = self.frequency
+        if not isinstance(frequency, str):
+            frequency = tuple(sorted(canonical_date(d) for d in frequency))
+        return (
+            "portfolio",
+            tuple(sorted((ticker, round(float(weight), 9)) for ticker, weight in self.portfolio.items())),
+            canonical_date(self.start_date),
+            canonical_date(self.end_date),
+            round(float(self.initial), 6),
+            round(float(self.addition), 6),
+            frequency,
+            self.max_points,
+            self.rebalance,
+            round(float(self.rebalance_band), 6) if self.rebalance == "threshold" else None,
+        )
     
+class Scenario(BaseModel):
+    weights: Dict[str, float]
+    initial: float
+    addition: float
+    frequency: Union[str, List[str]]
+    rebalance: str = "none"
+    rebalance_band: float = 0.05
+    series: bool = False  # also return this scenario's full series
+
+    def cache_key(self):
+        frequency = self.frequency
+        if not isinstance(frequency, str):
+            frequency = tuple(sorted(canonical_date(d) for d in frequency))
+        return (
+            tuple(sorted((ticker, round(float(weight), 9)) for ticker, weight in self.weights.items())),
+            round(float(self.initial), 6),
+            round(float(self.addition), 6),
+            frequency,
+            self.rebalance,
+            round(float(self.rebalance_band), 6) if self.rebalance == "threshold" else None,
+            self.series,
+        )
+
+class PortfolioBatchRequest(BaseModel):
+    tickers: List[str]
+    start_date: str
+    end_date: str
+    scenarios: List[Scenario]
+    max_points: Optional[int] = None
+
+    def cache_key(self):
+        return (
+            "portfolio_batch",
+            tuple(self.tickers),
+            canonical_date(self.start_date),
+            canonical_date(self.end_date),
+            tuple(scenario.cache_key() for scenario in self.scenarios),
+            self.max_points,
+        )
+
+class OptimizeRequest(BaseModel):
+    tickers: List[str]
+    start_date: str
+    end_date: str
+    min_weight: float = 0.0
+    max_weight: float = 1.0
+    bounds: Optional[Dict[str, List[float]]] = None  # per-ticker [min, max], overrides min/max_weight
+    points: int = 20  # frontier portfolios returned
+    initial: float = 10000
+    addition: float = 0
+    frequency: Union[str, List[str]] = "monthly"
+    rebalance: str = "none"
+
+    def weight_bounds(self):
+        bounds = self.bounds or {}
+        lower = [float(bounds.get(t, [self.min_weight, self.max_weight])[0]) for t in self.tickers]
+        upper = [float(bounds.get(t, [self.min_weight, self.max_weight])[1]) for t in self.tickers]
+        return lower, upper
+
+    def cache_key(self):
+        frequency = self.frequency
+        if not isinstance(frequency, str):
+            frequency = tuple(sorted(canonical_date(d) for d in frequency))
+        lower, upper = self.weight_bounds()
+        return (
+            "optimize",
+            tuple(self.tickers),
+            canonical_date(self.start_date),
+            canonical_date(self.end_date),
+            tuple(round(x, 9) for x in lower),
+            tuple(round(x, 9) for x in upper),
+            self.points,
+            round(float(self.initial), 6),
+            round(float(self.addition), 6),
+            frequency,
+            self.rebalance,
+        )
+
+class SimulationRequest(BaseModel):
+    portfolio: Dict[str, float]
+    start_date: str  # history the daily returns are sampled from
+    end_date: str
+    initial: float
+    addition: float
+    frequency: Union[str, List[str]]
+    rebalance: str = "none"
+    horizon_years: float = 10
+    paths: int = 2000
+    method: str = "bootstrap"  # "bootstrap" (block bootstrap) or "parametric"
+    block_size: int = 21  # bootstrap block length in trading days
+    seed: Optional[int] = None  # fixed seed: reproducible (and cached) results
+    percentiles: List[float] = [5, 25, 50, 75, 95]
+    points: int = 120  # dates reported per band
+
+    def cache_key(self):
+        frequency = self.frequency
+        if not isinstance(frequency, str):
+            frequency = tuple(sorted(canonical_date(d) for d in frequency))
+        return (
+            "simulate",
+            tuple(sorted((ticker, round(float(weight), 9)) for ticker, weight in self.portfolio.items())),
+            canonical_date(self.start_date),
+            canonical_date(self.end_date),
+            round(float(self.initial), 6),
+            round(float(self.addition), 6),
+            frequency,
+            self.rebalance,
+            round(float(self.horizon_years), 6),
+            self.paths,
+            self.method,
+            self.block_size,
+            self.seed,
+            tuple(self.percentiles),
+            self.points,
+        )
+
+class ScreenFilter(BaseModel):
+    metric: str
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+class ScreenRequest(BaseModel):
+    start_date: str
+    end_date: str
+    universe: Union[str, List[str]] = "sp500"  # "sp500", "all" (every cached ticker) or a ticker list
+    sort_by: str = "sharpe"  # any of functions.screen.METRICS
+    descending: bool = True
+    filters: List[ScreenFilter] = []
+    limit: int = 20
+
+    def cache_key(self):
+        universe = self.universe if isinstance(self.universe, str) else tuple(sorted(set(self.universe)))
+        return (
+            "screen",
+            universe,
+            canonical_date(self.start_date),
+            canonical_date(self.end_date),
+            self.sort_by,
+            self.descending,
+            tuple((f.metric, f.min, f.max) for f in self.filters),
+            self.limit,
+        )
+
 class TickerChartRequest(BaseModel):
     tickers: List[str]
     start_date: str
     end_date: str
+    max_points: Optional[int] = None  # downsample each ticker's series to at most this many points
+
+    def cache_key(self):
+        return (
+            "ticker_chart",
+            tuple(sorted(set(self.tickers))),
+            canonical_date(self.start_date),
+            canonical_date(self.end_date),
+            self.max_points,
+        )
+
+class TickerStatsRequest(BaseModel):
+    tickers: List[str]
+    start_date: str
+    end_date: str
+
+    def cache_key(self):
+        return (
+            "ticker_stats",
+            tuple(sorted(set(self.tickers))),
+            canonical_date(self.start_date),
+            canonical_date(self.end_date),
+        )
 
 @app.get("/")
 def root():
     return {"message": "Backend up and running!"}
 
+@app.get("/stats")
+def stats():
+    return {
+        "price_store": price_store.stats(),
+        "index_store": index_store.stats(),
+        "result_cache": result_cache.stats(),
+        "single_flight": flights.stats(),
+        "compute_pool": compute_pool.stats(),
+    }
+
+@app.get("/ready")
+def readiness():
+    """200 once the startup warm-up is done, 503 before; for load balancer health checks."""
+    if not ready:
+        return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True}
+
+@app.get("/metrics")
+def metrics():
+    """Request latency, stage and size histograms plus the /stats figures, in Prometheus text format."""
+    return PlainTextResponse(telemetry.render(stats()), media_type="text/plain; version=0.0.4")
+
+@app.get("/tickers")
+def tickers(prefix: str = "", limit: int = 20):
+    """Ticker autocomplete from the in-memory manifest; no price data is read."""
+    return {"tickers": search_tickers(prefix, max(0, min(limit, 500)))}
+
 @app.post("/portfolio")
-def calculate_portfolio(data: PortfolioRequest):
-    try:
-        portfolio_obj = Portfolio.get_portfolio(data.portfolio, data.start_date, data.end_date)
-        portfolio_obj.apply_contributions(data.initial, data.addition, data.frequency)
-        portfolio_obj.analyze()
-        print(portfolio_obj.get_json()['data'])
-        return portfolio_obj.get_json()
-    except Exception as e:
-        return {"error": str(e)}
-    
+async def calculate_portfolio(data: PortfolioRequest, request: Request):
+    # Validated and clamped to the tickers' common dates before anything is loaded.
+    data.start_date, data.end_date = common_range(list(data.portfolio), data.start_date, data.end_date)
+    key = data.cache_key()
+    result = await result_cache.get_async(key)
+    if result is None:
+        result = await flights.do_async(key, lambda: run_cached(
+            key, compute.compute_portfolio,
+            data.portfolio, data.start_date, data.end_date, data.initial, data.addition, data.frequency,
+            data.max_points, data.rebalance, data.rebalance_band,
+        ))
+    return await render_async(result, wants_compact(request))
+
+@app.post("/portfolio/batch")
+async def calculate_portfolio_batch(data: PortfolioBatchRequest, request: Request):
+    """Metrics for many weight/contribution scenarios over one shared ticker set and date range."""
+    if len(data.scenarios) > config.BATCH_MAX_SCENARIOS:
+        raise ValueError(f"At most {config.BATCH_MAX_SCENARIOS} scenarios per request")
+    data.tickers = list(dict.fromkeys(data.tickers))
+    data.start_date, data.end_date = common_range(data.tickers, data.start_date, data.end_date)
+    key = data.cache_key()
+    result = await result_cache.get_async(key)
+    if result is None:
+        result = await flights.do_async(key, lambda: run_cached(
+            key, compute.compute_portfolio_batch,
+            data.tickers, data.start_date, data.end_date,
+            [scenario.model_dump() for scenario in data.scenarios], data.max_points,
+        ))
+    return await render_async(result, wants_compact(request))
+
+@app.post("/optimize")
+async def optimize(data: OptimizeRequest, request: Request):
+    """Efficient frontier, minimum-variance and maximum-Sharpe weights (long-only, bounded)."""
+    if not 2 <= data.points <= 200:
+        raise ValueError("points must be between 2 and 200")
+    data.tickers = list(dict.fromkeys(data.tickers))
+    data.start_date, data.end_date = common_range(data.tickers, data.start_date, data.end_date)
+    key = data.cache_key()
+    result = await result_cache.get_async(key)
+    if result is None:
+        lower, upper = data.weight_bounds()
+        result = await flights.do_async(key, lambda: run_cached(
+            key, compute.compute_optimization,
+            data.tickers, data.start_date, data.end_date, lower, upper, data.points,
+            data.initial, data.addition, data.frequency, data.rebalance,
+        ))
+    return await render_async(result, wants_compact(request))
+
+@app.post("/simulate")
+async def simulate(data: SimulationRequest, request: Request):
+    """Monte Carlo projection of the portfolio's dollar value: percentile bands and terminal distribution."""
+    data.start_date, data.end_date = common_range(list(data.portfolio), data.start_date, data.end_date)
+    args = (
+        data.portfolio, data.start_date, data.end_date, data.initial, data.addition, data.frequency,
+        data.rebalance, data.horizon_years, data.paths, data.method, data.block_size, data.seed,
+        data.percentiles, data.points,
+    )
+    if data.seed is None:
+        # Unseeded runs are random by request; the seed used is returned instead.
+        result = await run_simulation(args)
+    else:
+        key = data.cache_key()
+        result = await result_cache.get_async(key)
+        if result is None:
+            result = await flights.do_async(key, lambda: run_simulation(args, key))
+    return await render_async(result, wants_compact(request))
+
+@app.post("/screen")
+async def screen(data: ScreenRequest, request: Request):
+    """Ranks every cached ticker of a universe by any metric over a date range, with filters."""
+    if not 1 <= data.limit <= 1000:
+        raise ValueError("limit must be between 1 and 1000")
+    key = data.cache_key()
+    result = await result_cache.get_async(key)
+    if result is None:
+        result = await flights.do_async(key, lambda: run_cached(
+            key, compute.compute_screen,
+            data.universe, data.start_date, data.end_date, data.sort_by, data.descending,
+            [f.model_dump() for f in data.filters], data.limit,
+        ))
+    return await render_async(result, wants_compact(request))
+
 @app.post("/ticker_chart")
-def ticker_chart(data: TickerChartRequest):
-    try:
-        ticker_vals = get_ticker_values(data.tickers, data.start_date, data.end_date)
-        print(ticker_vals)
-        ticker_stats = get_stats(ticker_vals, data.start_date, data.end_date)
-        return {
-    "tickerVals": ticker_vals,
-    "tickerStats": ticker_stats
-}
+async def ticker_chart(data: TickerChartRequest, request: Request):
+    check_tickers(data.tickers)
+    key = data.cache_key()
+    result = await result_cache.get_async(key)
+    if result is None:
+        # Computed once per ticker set and re-ordered to match each request.
+        result = await flights.do_async(key, lambda: run_cached(
+            key, compute.compute_ticker_chart, list(key[1]), data.start_date, data.end_date, data.max_points,
+        ))
+    return await render_async({
+        field: {ticker: values[ticker] for ticker in data.tickers}
+        for field, values in result.items()
+    }, wants_compact(request))
 
-    except Exception as e:
-        return {"error": str(e)}
+@app.post("/ticker_stats")
+async def ticker_stats(data: TickerStatsRequest, request: Request):
+    """The tickerStats of /ticker_chart alone, answered from the range indexes."""
+    check_tickers(data.tickers)
+    key = data.cache_key()
+    result = await result_cache.get_async(key)
+    if result is None:
+        result = await flights.do_async(key, lambda: run_cached(
+            key, compute.compute_ticker_stats, list(key[1]), data.start_date, data.end_date,
+        ))
+    return await render_async({
+        field: {ticker: values[ticker] for ticker in data.tickers}
+        for field, values in result.items()
+    }, wants_compact(request))
+
+async def run_timed(fn, *args):
+    # The computation's own stages are measured where it runs and added to this request's.
+    started = time.perf_counter()
+    result, stages = await compute_pool.run(timed, fn, time.time(), *args)
+    for name, seconds in stages.items():
+        record(name, seconds)
+    record("compute", time.perf_counter() - started)
+    return result
 
+async def run_cached(key, fn, *args):
+    result = await run_timed(fn, *args)
+    await result_cache.put_async(key, result)
+    return result
 
+async def run_simulation(args, key=None):
+    # Planned in one job, its chunks spread over at most COMPUTE_WORKERS jobs
+    # (so one request holds no more of the pool's slots), summarized in one.
+    plan, jobs = await run_timed(compute.plan_simulation, *args)
+    n = min(len(jobs), max(1, config.COMPUTE_WORKERS))
+    parts = await asyncio.gather(*(
+        run_timed(compute.simulate_chunk_jobs, jobs[i * len(jobs) // n:(i + 1) * len(jobs) // n])
+        for i in range(n)
+    ))
+    result = await run_timed(compute.summarize_simulation, plan, list(parts))
+    if key is not None:
+        await result_cache.put_async(key, result)
+    return result
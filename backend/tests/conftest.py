@@ -0,0 +1,52 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import orjson
+import pytest
+
+# Tests that read market data run on a synthetic universe (benchmarks/synthetic.py)
+# written once per session: SYN000..SYN004 with four years of history, and LATE,
+# listed for the last year only. DATA_DIR is pointed at it before config is
+# imported, the way the benchmarks do.
+DATA_DIR = tempfile.mkdtemp(prefix="backtester-tests-")
+os.environ["DATA_DIR"] = DATA_DIR
+os.environ["COLUMNAR_DIR"] = os.path.join(DATA_DIR, "columnar")
+os.environ["WARMUP"] = "0"
+os.environ.pop("RESULT_CACHE_DIR", None)
+
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def universe():
+    import pandas as pd
+    from benchmarks.synthetic import END_DATE, synthetic_history, write_universe
+    from functions.ingest import FakeFetcher, ingest
+
+    names = write_universe(DATA_DIR, 5, 4)
+    ingest(["LATE"], FakeFetcher({"LATE": synthetic_history(5, 1)}), "2015-01-01",
+           pd.Timestamp(END_DATE) + pd.Timedelta(days=1), rate=0, data_dir=DATA_DIR,
+           columnar_dir=os.environ["COLUMNAR_DIR"])
+    return names
+
+
+@pytest.fixture(scope="session")
+def api(universe):
+    """post(path, body) -> (status, decoded body) against the app, served from one event loop."""
+    import main
+    from benchmarks.asgi import request
+
+    loop = asyncio.new_event_loop()
+    lifespan = main.app.router.lifespan_context(main.app)
+    loop.run_until_complete(lifespan.__aenter__())
+
+    def post(path, body):
+        status, _, content = loop.run_until_complete(request(main.app, "POST", path, body))
+        return status, orjson.loads(content)
+
+    yield post
+    loop.run_until_complete(lifespan.__aexit__(None, None, None))
+    loop.close()
@@ -0,0 +1,49 @@
+import asyncio
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from classes.compute_pool import ComputePool, ComputeSaturated, ComputeTimeout
+
+
+def fail():
+    raise ValueError("bad input")
+
+
+def test_outcomes_are_counted_apart():
+    pool = ComputePool(workers=0, max_pending=4, timeout=0.05)
+
+    async def scenario():
+        assert await pool.run(sum, [1, 2]) == 3
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+        with pytest.raises(ComputeTimeout):
+            await pool.run(time.sleep, 0.2)
+
+    asyncio.run(scenario())
+    time.sleep(0.3)  # the timed-out computation still runs to the end
+    pool.shutdown()
+    assert pool.stats() == {
+        "workers": 0, "pending": 0, "max_pending": 4, "completed": 2, "failed": 1,
+        "cancelled": 0, "rejected": 0, "timed_out": 1,
+    }
+
+
+def test_cancelled_and_failed_futures_are_not_completed():
+    pool = ComputePool(workers=0, max_pending=4, timeout=1)
+    futures = [Future() for _ in range(3)]
+    pool.pending = len(futures)
+    futures[0].set_result(1)
+    futures[1].set_exception(ValueError())
+    futures[2].cancel()
+    for future in futures:
+        pool._done(future)
+    assert (pool.completed, pool.failed, pool.cancelled, pool.pending) == (1, 1, 1, 0)
+
+
+def test_saturated_pool_rejects():
+    pool = ComputePool(workers=0, max_pending=0, timeout=1)
+    with pytest.raises(ComputeSaturated):
+        asyncio.run(pool.run(sum, [1]))
+    assert pool.stats()["rejected"] == 1
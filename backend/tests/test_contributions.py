@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions.contributions import FREQUENCIES, apply_contributions, contribution_schedule
+
+
+def loop_contributions(values, counts, initial, addition):
+    # The per-day recurrence apply_contributions replaces: V[i] = V[i-1] * g[i] + c[i].
+    dollars = [initial]
+    for i in range(1, len(values)):
+        dollars.append(dollars[-1] * values[i] / values[i - 1] + addition * counts[i])
+    return np.array(dollars)
+
+
+@pytest.mark.parametrize("frequency", FREQUENCIES)
+def test_matches_per_day_loop(frequency):
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2015-01-01", periods=1500)
+    values = 100 * np.cumprod(1 + rng.normal(0.0003, 0.012, len(dates)))
+
+    dollars, contributions = apply_contributions(values, dates, 10000, 250, frequency)
+
+    counts = contribution_schedule(dates, frequency)
+    np.testing.assert_allclose(dollars, loop_contributions(values, counts, 10000, 250), rtol=1e-9, atol=0.01)
+    assert contributions[0] == 10000
+    assert contributions[1:].sum() == 250 * counts[1:].sum()
+
+
+def test_matrix_matches_columns():
+    rng = np.random.default_rng(1)
+    dates = pd.bdate_range("2018-01-01", periods=600)
+    values = np.cumprod(1 + rng.normal(0.0002, 0.01, (len(dates), 3)), axis=0)
+    initial, addition = np.array([1000.0, 5000.0, 0.0]), np.array([100.0, 0.0, 50.0])
+
+    dollars, _ = apply_contributions(values, dates, initial, addition, "biweekly")
+
+    for j in range(3):
+        column, _ = apply_contributions(values[:, j], dates, initial[j], addition[j], "biweekly")
+        np.testing.assert_allclose(dollars[:, j], column)
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from functions.downsample import downsample_dates, lttb
+
+
+def reference_lttb(x, y, max_points):
+    # Straightforward LTTB: one bucket at a time, one candidate at a time.
+    n = len(y)
+    buckets = max_points - 2
+    edges = [int(1 + b * (n - 2) / buckets) for b in range(buckets + 1)]
+    picked, a = [0], 0
+    for b in range(buckets):
+        if b + 1 < buckets:
+            following = range(edges[b + 1], edges[b + 2])
+            cx = sum(x[i] for i in following) / len(following)
+            cy = sum(y[i] for i in following) / len(following)
+        else:
+            cx, cy = x[-1], y[-1]
+        best, best_area = None, -1.0
+        for i in range(edges[b], edges[b + 1]):
+            area = abs((x[a] - cx) * (y[i] - y[a]) - (x[a] - x[i]) * (cy - y[a]))
+            if area > best_area:
+                best, best_area = i, area
+        picked.append(best)
+        a = best
+    return np.array(picked + [n - 1])
+
+
+@pytest.mark.parametrize("n, max_points", [(1000, 50), (1001, 3), (5000, 997), (250, 249)])
+def test_matches_reference(n, max_points):
+    rng = np.random.default_rng(n)
+    x = np.cumsum(rng.integers(1, 4, n)).astype(np.float64)
+    y = np.cumsum(rng.normal(0, 1, n))
+
+    np.testing.assert_array_equal(lttb(x, y, max_points), reference_lttb(x, y, max_points))
+
+
+def test_endpoints_and_one_point_per_bucket():
+    rng = np.random.default_rng(7)
+    dates = np.datetime64("2000-01-03") + np.cumsum(rng.integers(1, 4, 3000)).astype("timedelta64[D]")
+    values = np.cumprod(1 + rng.normal(0, 0.01, 3000))
+
+    idx = downsample_dates(dates, values, 120)
+
+    assert len(idx) == 120
+    assert idx[0] == 0 and idx[-1] == len(values) - 1
+    assert np.all(np.diff(idx) > 0)
+    edges = (1 + np.arange(119) * (len(values) - 2) / 118).astype(np.int64)
+    np.testing.assert_array_equal(np.searchsorted(edges, idx[1:-1], side="right") - 1, np.arange(118))
+
+
+def test_short_series_and_bounds():
+    np.testing.assert_array_equal(lttb(np.arange(10), np.ones(10), 10), np.arange(10))
+    np.testing.assert_array_equal(lttb(np.arange(10), np.ones(10), None), np.arange(10))
+    with pytest.raises(ValueError):
+        lttb(np.arange(10), np.ones(10), 2)
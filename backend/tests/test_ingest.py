@@ -0,0 +1,93 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_history
+from functions.columnar import to_epoch_days
+from functions.ingest import FakeFetcher, ingest, read_manifest
+from functions.range_index import open_index
+from functions.trading_calendar import CALENDAR_NAME
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    return {"data_dir": str(tmp_path / "data"), "columnar_dir": str(tmp_path / "data" / "columnar")}
+
+
+def run(tickers, fetcher, end, dirs):
+    return ingest(tickers, fetcher, "2019-01-01", end, workers=2, rate=0, **dirs)
+
+
+def cached(ticker, dirs):
+    return pd.read_pickle(os.path.join(dirs["data_dir"], f"{ticker}.pkl"))
+
+
+def columnar_days(ticker, dirs):
+    return open_index(os.path.realpath(os.path.join(dirs["columnar_dir"], ticker))).days
+
+
+def test_first_run_writes_every_layer(dirs):
+    histories = {"AAA": synthetic_history(0, 2), "BBB": synthetic_history(1, 1)}
+    results = run(["AAA", "BBB", "NONE"], FakeFetcher(histories), "2025-01-01", dirs)
+
+    assert results["NONE"] is None
+    manifest = read_manifest(dirs["data_dir"])
+    assert sorted(manifest) == ["AAA", "BBB"]
+    calendar = np.load(os.path.join(dirs["columnar_dir"], CALENDAR_NAME))
+    for ticker, df in histories.items():
+        assert manifest[ticker]["rows"] == len(df)
+        days = columnar_days(ticker, dirs)
+        np.testing.assert_array_equal(days, to_epoch_days(df["Date"].dt.tz_convert(None).values))
+        assert calendar[manifest[ticker]["offset"]] == days[0]
+    assert not [name for name in os.listdir(dirs["data_dir"]) if name.startswith(".tmp-")]
+
+
+def test_second_run_fetches_only_new_bars(dirs):
+    full = synthetic_history(0, 2)
+    fetcher = FakeFetcher({"AAA": full})
+    run(["AAA"], fetcher, "2024-06-01", dirs)
+    before = read_manifest(dirs["data_dir"])["AAA"]
+
+    fetcher.calls.clear()
+    run(["AAA"], fetcher, "2025-01-01", dirs)
+
+    assert fetcher.calls == [("AAA", "2024-06-01", "2025-01-01")]
+    pd.testing.assert_frame_equal(cached("AAA", dirs), full)
+    after = read_manifest(dirs["data_dir"])["AAA"]
+    assert after["first_date"] == before["first_date"] and after["rows"] == len(full)
+    assert len(columnar_days("AAA", dirs)) == len(full)
+
+
+def test_dividend_refetches_the_full_history(dirs):
+    full = synthetic_history(0, 2)
+    fetcher = FakeFetcher({"AAA": full})
+    run(["AAA"], fetcher, "2024-06-01", dirs)
+
+    # The provider re-adjusts every earlier close when a dividend is paid.
+    adjusted = full.assign(Close=full["Close"] * 0.98)
+    adjusted.loc[len(adjusted) - 10, "Dividends"] = 0.5
+    fetcher.histories["AAA"] = adjusted
+    fetcher.calls.clear()
+    run(["AAA"], fetcher, "2025-01-01", dirs)
+
+    # The refetch goes back to the run's start date, before the first cached bar.
+    assert fetcher.calls == [("AAA", "2024-06-01", "2025-01-01"), ("AAA", "2019-01-01", "2025-01-01")]
+    pd.testing.assert_frame_equal(cached("AAA", dirs), adjusted)
+
+
+def test_short_refetch_keeps_the_cached_history(dirs):
+    full = synthetic_history(0, 2)
+    fetcher = FakeFetcher({"AAA": full, "BBB": synthetic_history(1, 2)})
+    run(["AAA", "BBB"], fetcher, "2024-06-01", dirs)
+    kept, entry = cached("AAA", dirs), read_manifest(dirs["data_dir"])["AAA"]
+
+    # Only the last year comes back, with a split in it.
+    recent = full[full["Date"].dt.tz_convert(None) >= "2024-01-01"].reset_index(drop=True)
+    fetcher.histories["AAA"] = recent.assign(**{"Stock Splits": np.r_[np.zeros(len(recent) - 1), 2.0]})
+    results = run(["AAA"], fetcher, "2025-01-01", dirs)
+
+    assert "error" in results["AAA"]
+    pd.testing.assert_frame_equal(cached("AAA", dirs), kept)
+    manifest = read_manifest(dirs["data_dir"])
+    assert manifest["AAA"] == entry and "BBB" in manifest
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from functions.optimize import efficient_frontier
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(3)
+    a = rng.normal(0, 0.1, (6, 6))
+    cov = a @ a.T / 6 + np.diag(rng.uniform(0.01, 0.05, 6))
+    mu = rng.uniform(0.02, 0.15, 6)
+    return mu, cov
+
+
+def check_optimal(w, mu, cov, lower, upper, tol=1e-5):
+    # KKT conditions of min w'Cw s.t. sum(w) = 1, mu'w = target, lower <= w <= upper:
+    # 2Cw = a + b * mu on free weights, >= on weights at the lower bound, <= at the upper.
+    gradient = 2 * cov @ w
+    at_lower, at_upper = w <= lower + 1e-7, w >= upper - 1e-7
+    free = ~at_lower & ~at_upper
+    if free.sum() < 2:
+        return
+    basis = np.column_stack([np.ones(free.sum()), mu[free]])
+    (a, b), *_ = np.linalg.lstsq(basis, gradient[free], rcond=None)
+    slack = gradient - a - b * mu
+    assert np.abs(slack[free]).max() < tol
+    assert (slack[at_lower] > -tol).all() and (slack[at_upper] < tol).all()
+
+
+def test_interior_min_variance_matches_closed_form(market):
+    mu, cov = market
+    result = efficient_frontier(mu, cov, np.zeros(6), np.ones(6))
+    ones = np.linalg.solve(cov, np.ones(6))
+    expected = ones / ones.sum()
+    assert (expected > 0).all()
+    np.testing.assert_allclose(result["min_variance"], expected, atol=1e-6)
+
+
+def test_frontier_runs_from_min_variance_to_max_return_corner(market):
+    mu, cov = market
+    lower, upper = np.full(6, 0.05), np.full(6, 0.4)
+    result = efficient_frontier(mu, cov, lower, upper, points=15)
+    frontier = result["frontier"]
+
+    assert frontier.shape == (6, 15)
+    np.testing.assert_allclose(frontier[:, 0], result["min_variance"], atol=1e-6)
+    # Highest return within the bounds: the two best assets at 0.4, the rest at 0.05.
+    corner = lower.copy()
+    corner[np.argsort(-mu)[:2]] = 0.4
+    np.testing.assert_allclose(frontier[:, -1], corner, atol=1e-9)
+
+    returns = mu @ frontier
+    np.testing.assert_allclose(np.diff(returns), (returns[-1] - returns[0]) / 14, rtol=1e-9)
+    np.testing.assert_allclose(frontier.sum(axis=0), 1)
+    assert (frontier >= lower[:, None] - 1e-12).all() and (frontier <= upper[:, None] + 1e-12).all()
+    for w in frontier.T:
+        check_optimal(w, mu, cov, lower, upper)
+
+
+def test_max_sharpe_beats_the_frontier(market):
+    mu, cov = market
+    result = efficient_frontier(mu, cov, np.zeros(6), np.ones(6), points=40, risk_free_rate=0.02)
+
+    def sharpe(w):
+        return (mu @ w - 0.02) / np.sqrt(w @ cov @ w)
+
+    assert sharpe(result["max_sharpe"]) >= max(sharpe(w) for w in result["frontier"].T) - 1e-6
+
+
+def test_infeasible_bounds():
+    with pytest.raises(ValueError):
+        efficient_frontier(np.ones(3), np.eye(3), np.full(3, 0.4), np.ones(3))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions.metrics import RISK_FREE_RATE, compute_metrics
+from functions.range_index import METRICS, build_index
+
+
+@pytest.fixture(scope="module")
+def index():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2003-06-16", "2021-03-12")
+    close = 50 * np.cumprod(1 + rng.normal(0.0003, 0.015, len(dates)))
+    close[rng.choice(len(close), 40, replace=False)] = np.nan
+    days = dates.values.astype("datetime64[D]").astype(np.int64)
+    return build_index(days, close)
+
+
+def ranges(index, count=300):
+    rng = np.random.default_rng(1)
+    n = len(index.close)
+    pairs = [tuple(sorted(rng.choice(n, 2, replace=False))) for _ in range(count)]
+    short = [(lo, lo + rng.integers(1, 30)) for lo in rng.integers(0, n - 30, 30)]
+    return pairs + short + [(0, n - 1), (0, 1), (n - 2, n - 1)]
+
+
+# The default rate is answered from the prefix sums, any other by scanning the slice.
+@pytest.mark.parametrize("risk_free_rate", [RISK_FREE_RATE, 0.0])
+def test_stats_match_compute_metrics(index, risk_free_rate):
+    for lo, hi in ranges(index):
+        dates = index.days[lo:hi + 1].astype("datetime64[D]")
+        expected = compute_metrics(index.close[lo:hi + 1], dates, risk_free_rate)
+        stats = index.stats(lo, hi, risk_free_rate)
+        for metric in METRICS:
+            np.testing.assert_allclose(stats[metric], expected[metric][0], rtol=1e-7, atol=1e-10, err_msg=metric)
+
+
+def scan_drawdown(close):
+    return float((close / np.maximum.accumulate(close) - 1).min())
+
+
+def scan_year_extremes(days, close):
+    year = days.astype("datetime64[D]").astype("datetime64[Y]")
+    returns = [close[year == y][-1] / close[year == y][0] - 1 for y in np.unique(year)]
+    return max(returns), min(returns)
+
+
+def test_drawdown_and_years_match_scan(index):
+    for lo, hi in ranges(index):
+        close, days = index.close[lo:hi + 1], index.days[lo:hi + 1]
+        assert index.max_drawdown(lo, hi) == pytest.approx(scan_drawdown(close), rel=1e-12, abs=1e-15)
+        assert index._year_extremes(lo, hi) == pytest.approx(scan_year_extremes(days, close), rel=1e-12)
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 8, 9, 255])
+def test_drawdown_tree_sizes(n):
+    rng = np.random.default_rng(n)
+    close = 10 * np.cumprod(1 + rng.normal(0, 0.05, n))
+    index = build_index(np.arange(n) * 7, close)
+    for lo in range(n):
+        for hi in range(lo, n):
+            assert index.max_drawdown(lo, hi) == pytest.approx(scan_drawdown(close[lo:hi + 1]), abs=1e-15)
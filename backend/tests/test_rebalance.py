@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from functions.rebalance import THRESHOLD_WINDOW, rebalance_points, rebalanced_values
+
+# Two assets held 50/50: A doubles on the second day and halves back on the
+# fourth, B stays flat. The third day opens February.
+DATES = pd.to_datetime(["2020-01-30", "2020-01-31", "2020-02-03", "2020-02-04"])
+MATRIX = np.array([[1.0, 1.0], [2.0, 1.0], [2.0, 1.0], [1.0, 1.0]])
+WEIGHTS = np.array([0.5, 0.5])
+
+
+def test_buy_and_hold():
+    np.testing.assert_array_equal(rebalance_points(MATRIX, WEIGHTS, DATES), [0])
+    np.testing.assert_allclose(rebalanced_values(MATRIX, WEIGHTS, DATES), [1.0, 1.5, 1.5, 1.0])
+
+
+def test_monthly_resets_weights_on_the_first_day_of_a_month():
+    # 0.75 in each asset from 2020-02-03; A's halving then costs 0.375.
+    np.testing.assert_array_equal(rebalance_points(MATRIX, WEIGHTS, DATES, "monthly"), [0, 2])
+    np.testing.assert_allclose(rebalanced_values(MATRIX, WEIGHTS, DATES, "monthly"), [1.0, 1.5, 1.5, 1.125])
+
+
+def test_threshold_rebalances_when_drift_exceeds_the_band():
+    # A's doubling moves it to 2/3 of the portfolio, 16.7 points off target.
+    np.testing.assert_array_equal(rebalance_points(MATRIX, WEIGHTS, DATES, "threshold", 0.1), [0, 1, 3])
+    np.testing.assert_array_equal(rebalance_points(MATRIX, WEIGHTS, DATES, "threshold", 0.2), [0])
+    np.testing.assert_allclose(rebalanced_values(MATRIX, WEIGHTS, DATES, "threshold", 0.1), [1.0, 1.5, 1.5, 1.125])
+
+
+def drifted_points(matrix, weights, band):
+    # Day-by-day reference: holdings drift until some weight leaves the band.
+    target = weights / weights.sum()
+    points, held = [0], target.copy()
+    for i in range(1, len(matrix)):
+        held = held * matrix[i] / matrix[i - 1]
+        if np.abs(held / held.sum() - target).max() > band:
+            points.append(i)
+            held = target * held.sum()
+    return points
+
+
+def test_threshold_matches_daily_reference_across_windows():
+    rng = np.random.default_rng(0)
+    matrix = np.cumprod(1 + rng.normal(0.0003, 0.01, (4 * THRESHOLD_WINDOW, 3)), axis=0)
+    weights = np.array([0.5, 0.3, 0.2])
+    points = rebalance_points(matrix, weights, pd.bdate_range("2010-01-01", periods=len(matrix)), "threshold", 0.03)
+    np.testing.assert_array_equal(points, drifted_points(matrix, weights, 0.03))
+
+
+def test_bad_mode_and_band():
+    with pytest.raises(ValueError):
+        rebalance_points(MATRIX, WEIGHTS, DATES, "weekly")
+    with pytest.raises(ValueError):
+        rebalance_points(MATRIX, WEIGHTS, DATES, "threshold", 0)
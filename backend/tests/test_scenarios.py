@@ -0,0 +1,42 @@
+import pytest
+
+RANGE = {"start_date": "2021-06-01", "end_date": "2024-12-31"}
+SCENARIOS = [
+    {"weights": {"SYN000": 0.6, "SYN001": 0.3, "SYN002": 0.1}, "initial": 10000, "addition": 500,
+     "frequency": "monthly", "series": True},
+    {"weights": {"SYN000": 0.2, "SYN001": 0.2, "SYN002": 0.6}, "initial": 5000, "addition": 0,
+     "frequency": "yearly", "rebalance": "quarterly"},
+    {"weights": {"SYN000": 1, "SYN001": 1, "SYN002": 1}, "initial": 1000, "addition": 250,
+     "frequency": ["2022-03-15", "2023-07-01"], "rebalance": "threshold", "rebalance_band": 0.02, "series": True},
+]
+
+
+def test_batch_matches_one_portfolio_request_per_scenario(api):
+    status, batch = api("/portfolio/batch", {"tickers": ["SYN000", "SYN001", "SYN002"], **RANGE, "scenarios": SCENARIOS})
+    assert status == 200 and len(batch["scenarios"]) == len(SCENARIOS)
+
+    for scenario, result in zip(SCENARIOS, batch["scenarios"]):
+        _, single = api("/portfolio", {
+            "portfolio": scenario["weights"], **RANGE,
+            **{key: value for key, value in scenario.items() if key not in ("weights", "series")},
+        })
+        assert result["data"] == pytest.approx(single["data"], rel=1e-9, nan_ok=True)
+        if scenario.get("series"):
+            assert result["dates"] == single["dates"]
+            assert result["portfolio"] == pytest.approx(single["portfolio"], rel=1e-9)
+        else:
+            assert "dates" not in result
+
+
+def test_batch_rejects_weights_outside_the_ticker_set(api):
+    scenario = dict(SCENARIOS[0], weights={"SYN003": 1})
+    _, body = api("/portfolio/batch", {"tickers": ["SYN000"], **RANGE, "scenarios": [scenario]})
+    assert "SYN003" in body["error"]
+
+
+def test_batch_scenario_limit(api, monkeypatch):
+    import config
+
+    monkeypatch.setattr(config, "BATCH_MAX_SCENARIOS", 2)
+    _, body = api("/portfolio/batch", {"tickers": ["SYN000", "SYN001", "SYN002"], **RANGE, "scenarios": SCENARIOS})
+    assert body["error"] == "At most 2 scenarios per request"
@@ -0,0 +1,37 @@
+import pytest
+
+from functions.screen import screen
+from functions.ticker_values import get_range_stats
+
+START, END = "2021-06-01", "2024-12-31"
+
+
+def test_years_filter_excludes_late_listers(universe):
+    everything = screen("all", START, END, limit=100)
+    assert everything["screened"] == len(universe) + 1
+    late = next(row for row in everything["results"] if row["ticker"] == "LATE")
+    assert late["years"] < 1.1
+
+    listed = screen("all", START, END, filters=[{"metric": "years", "min": 3}], limit=100)
+    assert sorted(row["ticker"] for row in listed["results"]) == universe
+    assert listed["matched"] == len(universe)
+
+
+def test_metrics_match_per_ticker_range_stats(universe):
+    result = screen([*universe, "LATE"], START, END, sort_by="cagr", limit=100)
+    stats = get_range_stats([*universe, "LATE"], START, END)
+    names = ["cagr", "volatility", "best_year", "worst_year", "max_drawdown", "sharpe", "sortino"]
+    for row in result["results"]:
+        assert [row[name] for name in names] == pytest.approx(stats[row["ticker"]], abs=1e-4)
+
+
+def test_sorting_and_limit(universe):
+    result = screen("all", START, END, sort_by="volatility", descending=False, limit=3)
+    volatilities = [row["volatility"] for row in result["results"]]
+    assert len(volatilities) == 3 and volatilities == sorted(volatilities)
+    assert result["matched"] == len(universe) + 1
+
+
+def test_endpoint_rejects_unknown_metrics(api):
+    _, body = api("/screen", {"start_date": START, "end_date": END, "universe": "all", "sort_by": "alpha"})
+    assert "sort_by" in body["error"]
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import config
+from functions.simulate import plan_projection, project_portfolio, simulate_chunks, summarize_projection
+
+PORTFOLIO = {"SYN000": 0.7, "SYN001": 0.3}
+ARGS = (PORTFOLIO, "2021-01-01", "2024-12-31", 10000, 500, "monthly")
+
+
+def assert_same(result, expected):
+    for name, band in expected["bands"].items():
+        np.testing.assert_array_equal(result["bands"][name], band)
+    assert result["terminal"]["percentiles"] == expected["terminal"]["percentiles"]
+    np.testing.assert_array_equal(result["terminal"]["histogram"]["counts"], expected["terminal"]["histogram"]["counts"])
+
+
+@pytest.mark.parametrize("method", ["bootstrap", "parametric"])
+def test_seed_reproduces_across_chunk_sizes(universe, monkeypatch, method):
+    results = []
+    for chunk_bytes in (64 * 1024 * 1024, 3_000_000, 200_000, 30_000):
+        monkeypatch.setattr(config, "MC_CHUNK_BYTES", chunk_bytes)
+        results.append(project_portfolio(*ARGS, horizon_years=5, paths=300, method=method, seed=11))
+
+    for other in results[1:]:
+        assert_same(other, results[0])
+
+
+def test_seed_reproduces_however_chunks_are_spread(universe, monkeypatch):
+    monkeypatch.setattr(config, "MC_CHUNK_BYTES", 100_000)
+    plan, jobs = plan_projection(*ARGS, horizon_years=3, paths=200, seed=5)
+    assert len(jobs) > 3
+
+    whole = summarize_projection(plan, [simulate_chunks(jobs)])
+    spread = summarize_projection(plan, [simulate_chunks(jobs[:1]), simulate_chunks(jobs[1:4]), simulate_chunks(jobs[4:])])
+    assert_same(spread, whole)
+
+
+def test_projection_shape(universe):
+    result = project_portfolio(*ARGS, horizon_years=2, paths=500, seed=1, percentiles=(10, 50, 90), points=30)
+
+    assert len(result["dates"]) == 30 and result["paths"] == 500 and result["seed"] == 1
+    p10, p50, p90 = (result["bands"][name] for name in ("p10", "p50", "p90"))
+    assert (p10 <= p50).all() and (p50 <= p90).all()
+    np.testing.assert_allclose(p50[0], 10000)
+    # Two years of monthly contributions after the initial investment.
+    assert 10000 + 23 * 500 <= result["contributed"] <= 10000 + 24 * 500
+    assert result["terminal"]["histogram"]["counts"].sum() == 500
+
+
+@pytest.mark.parametrize("bad, message", [
+    ({"horizon_years": 1e6}, "horizon_years"),
+    ({"horizon_years": 0}, "horizon_years"),
+    ({"points": 1}, "points"),
+    ({"points": 10 ** 6}, "points"),
+    ({"percentiles": (50, 101)}, "percentiles"),
+    ({"block_size": 0}, "block_size"),
+    ({"paths": 0}, "paths"),
+    ({"method": "garch"}, "Method"),
+])
+def test_rejects_bad_requests_before_simulating(universe, bad, message):
+    with pytest.raises(ValueError, match=message):
+        plan_projection(*ARGS, **bad)
+
+
+def test_endpoint_caches_seeded_runs(api):
+    body = {"portfolio": PORTFOLIO, "start_date": "2021-01-01", "end_date": "2024-12-31", "initial": 1000,
+            "addition": 0, "frequency": "monthly", "paths": 200, "horizon_years": 1, "seed": 3}
+    _, first = api("/simulate", body)
+    _, second = api("/simulate", body)
+    assert first == second and first["seed"] == 3
+    _, unseeded = api("/simulate", dict(body, seed=None))
+    assert isinstance(unseeded["seed"], int)
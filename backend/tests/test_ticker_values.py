@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from functions.ticker_values import get_stats, get_ticker_chart, get_ticker_values
+
+TICKERS = ["SYN001", "LATE", "SYN004"]
+START, END = "2022-01-01", "2024-12-31"
+
+
+def test_chart_matches_loaded_series_and_their_stats(universe):
+    chart = get_ticker_chart(TICKERS, START, END)
+    values = get_ticker_values(TICKERS, START, END)
+
+    assert list(chart["tickerVals"]) == TICKERS and "tickerDates" not in chart
+    for ticker, series in values.items():
+        np.testing.assert_allclose(chart["tickerVals"][ticker], series.to_numpy(), rtol=1e-12)
+    stats = get_stats(values)
+    for ticker in TICKERS:
+        assert chart["tickerStats"][ticker] == pytest.approx(stats[ticker], abs=1e-4)
+
+
+def test_downsampled_chart_keeps_stats_and_dates(universe):
+    full = get_ticker_chart(TICKERS, START, END)
+    small = get_ticker_chart(TICKERS, START, END, max_points=50)
+    values = get_ticker_values(TICKERS, START, END)
+
+    assert small["tickerStats"] == full["tickerStats"]
+    for ticker, series in values.items():
+        assert len(small["tickerVals"][ticker]) == 50
+        kept = series.loc[small["tickerDates"][ticker].astype("datetime64[ns]")]
+        np.testing.assert_allclose(small["tickerVals"][ticker], kept.to_numpy(), rtol=1e-12)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from functions.trading_calendar import align, calendar_rows
+
+nan = np.nan
+CALENDAR = np.arange(10)
+# A trades days 1, 2, 4; B trades days 2..5.
+COLUMNS = [
+    (np.array([1, 2, 4]), np.array([10.0, 11.0, 12.0]), 1),
+    (np.array([2, 3, 4, 5]), np.array([20.0, 21.0, 22.0, 23.0]), 2),
+]
+
+
+def test_intersection_keeps_days_every_ticker_traded():
+    days, matrix, observed = align(COLUMNS, "intersection", CALENDAR, observed=True)
+    np.testing.assert_array_equal(days, [2, 4])
+    np.testing.assert_array_equal(matrix, [[11, 20], [12, 22]])
+    assert observed.all()
+
+
+def test_ffill_spans_latest_start_to_earliest_end():
+    days, matrix, observed = align(COLUMNS, "ffill", CALENDAR, observed=True)
+    np.testing.assert_array_equal(days, [2, 3, 4])
+    np.testing.assert_array_equal(matrix, [[11, 20], [11, 21], [12, 22]])
+    np.testing.assert_array_equal(observed, [[True, True], [False, True], [True, True]])
+
+
+def test_per_ticker_fills_within_each_span_only():
+    days, matrix, observed = align(COLUMNS, "per_ticker", CALENDAR, observed=True)
+    np.testing.assert_array_equal(days, [1, 2, 3, 4, 5])
+    np.testing.assert_array_equal(matrix, [[10, nan], [11, 20], [11, 21], [12, 22], [nan, 23]])
+    np.testing.assert_array_equal(observed[:, 0], [True, True, False, True, False])
+
+
+@pytest.mark.parametrize("policy", ["intersection", "ffill", "per_ticker"])
+def test_calendar_missing_a_day_falls_back_to_the_union(policy):
+    expected = align(COLUMNS, policy, CALENDAR)
+    days, matrix = align(COLUMNS, policy, np.array([0, 1, 2, 4, 5, 6]))
+    np.testing.assert_array_equal(days, expected[0])
+    np.testing.assert_array_equal(matrix, expected[1])
+
+
+def test_calendar_rows_with_and_without_offset():
+    np.testing.assert_array_equal(calendar_rows(CALENDAR, np.array([3, 4, 5]), 3), [3, 4, 5])
+    np.testing.assert_array_equal(calendar_rows(CALENDAR, np.array([3, 5, 8]), 3), [3, 5, 8])
+    assert calendar_rows(CALENDAR, np.array([3, 12]), None) is None
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        align(COLUMNS, "outer", CALENDAR)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from functions.xirr import xirr, xirr_batch
+
+
+def newton_xirr(cashflows, dates, guess=0.1):
+    # Scalar reference: Newton's method on one row, one flow at a time, with
+    # steps halved until they stay above -100%.
+    t = [(d - dates[0]).days / 365.25 for d in dates]
+    r = guess
+    for _ in range(200):
+        npv = sum(c * (1 + r) ** -ti for c, ti in zip(cashflows, t))
+        derivative = sum(-ti * c * (1 + r) ** (-ti - 1) for c, ti in zip(cashflows, t))
+        step = npv / derivative
+        while r - step <= -1:
+            step /= 2
+        r -= step
+        if abs(step) < 1e-12:
+            return r
+    raise AssertionError("reference did not converge")
+
+
+def contribution_flows(rng, k, dates):
+    # Monthly deposits and a final withdrawal of the grown value, per row.
+    cashflows = np.zeros((k, len(dates)))
+    monthly = np.r_[True, dates.month[1:] != dates.month[:-1]]
+    cashflows[:, monthly] = -rng.uniform(50, 500, (k, 1))
+    cashflows[:, 0] = -rng.uniform(1000, 10000, k)
+    invested = -cashflows.sum(axis=1)
+    cashflows[:, -1] += invested * rng.uniform(0.6, 3.0, k)
+    return cashflows
+
+
+def test_batch_matches_scalar_newton():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2012-03-01", "2022-06-30")
+    cashflows = contribution_flows(rng, 40, dates)
+
+    rates = xirr_batch(cashflows, dates)
+
+    for row, rate in zip(cashflows, rates):
+        keep = row != 0
+        expected = newton_xirr(row[keep], dates[keep])
+        assert abs(rate - expected) < 1e-6
+
+
+def test_bisection_rows_solve_npv():
+    # From a far-off guess Newton leaves the domain; those rows are bisected.
+    dates = pd.to_datetime(["2020-01-01", "2020-02-01", "2021-01-01"])
+    cashflows = np.array([[-1000.0, 0.0, 5000.0], [-1000.0, -1000.0, 1500.0]])
+
+    rates = xirr_batch(cashflows, dates, guess=50.0)
+
+    t = (dates - dates[0]).days.values / 365.25
+    for row, rate in zip(cashflows, rates):
+        assert abs((row * (1 + rate) ** -t).sum()) < 1e-3 * np.abs(row).sum()
+
+
+def test_unsolvable_is_nan():
+    dates = pd.to_datetime(["2020-01-01", "2021-01-01"])
+    assert np.isnan(xirr([-100.0, -50.0], dates))
+    assert np.isnan(xirr_batch(np.zeros((1, 2)), dates)[0])